@@ -0,0 +1,312 @@
+"""Runs synthetic drafts through DraftLogic and reports how long each
+operation takes, and how much memory it allocates. Scryfall, the google
+sheet and the S3 bucket are swapped for in-process stand-ins, so only
+the bot's own work is measured.
+
+Run it from the repo root with 'python -m benchmark.draft_benchmark'.
+Use --save to write the results as a baseline, and --compare to check
+a run against one. A compare run exits with 1 if an operation got
+slower than the baseline by more than the tolerance."""
+
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+import tracemalloc
+import argparse
+import tempfile
+import random
+import json
+import time
+import sys
+import os
+
+from botBackend import draft_logic
+from botBackend.draft_logic import DraftLogic
+from botBackend.stats import percentile
+
+
+# the operations that are timed, in the order they are reported
+OPERATIONS = ["join", "fire", "pick", "pre_pick", "cancel_pre_pick", "reset"]
+
+
+###################################
+###         STAND-INS           ###
+###################################
+
+class ScryfallStandIn():
+
+    """Answers every lookup with a card named what was asked for,
+    the way scryfall answers for a real card."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_scryfall_json(self, card: tuple) -> dict:
+        self.calls += 1
+        name = " ".join(card)
+        return {"object": "card", "id": name, "name": name,
+                "legalities": {"vintage": "legal", "legacy": "legal"}}
+
+    def get_scryfall_collection(self, cards: list) -> list:
+        return [self.get_scryfall_json(card) for card in cards]
+
+
+class SheetStandIn():
+
+    """Counts the writes that would have gone to the google sheet."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cells = 0
+
+    def setup_sheet(self, players: list, picks: int, sheet_key: str = None):
+        self.calls += 1
+
+    def pick_many(self, picks: list, sheet_key: str = None):
+        self.calls += 1
+        self.cells += len(picks)
+
+    def reset_sheet(self, sheet_key: str = None):
+        self.calls += 1
+
+
+class WorkerStandIn():
+
+    """Runs backup tasks straight away, so the local part of a backup
+    is timed with the operation that asked for it."""
+
+    def submit(self, key: str, task):
+        task()
+
+
+class BackupStandIn():
+
+    """Counts the uploads that would have gone to the S3 bucket."""
+
+    def __init__(self):
+        self.uploads = 0
+        self.worker = WorkerStandIn()
+
+    def upload(self, file: str = 'storage.json'):
+        self.uploads += 1
+
+    def load(self, file_location: str = 'storage.json', missing_ok: bool = False) -> bool:
+        return os.path.exists(file_location)
+
+
+###################################
+###          RECORDING          ###
+###################################
+
+class Recorder():
+
+    """Collects the time taken, and optionally the memory allocated,
+    by every call of each operation."""
+
+    def __init__(self, allocations: bool = False):
+        self.allocations = allocations
+        self.times = {operation: [] for operation in OPERATIONS}
+        self.peaks = {operation: [] for operation in OPERATIONS}
+        self.blocks = {operation: [] for operation in OPERATIONS}
+
+    @contextmanager
+    def measure(self, operation: str):
+        if self.allocations:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            blocks = sys.getallocatedblocks()
+
+        start = time.perf_counter_ns()
+        yield
+        self.times[operation].append(time.perf_counter_ns() - start)
+
+        if self.allocations:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peaks[operation].append(peak - current)
+            self.blocks[operation].append(sys.getallocatedblocks() - blocks)
+
+
+###################################
+###          SIMULATION         ###
+###################################
+
+def run_draft(recorder: Recorder, players: int, picks: int, prepick_rate: float,
+              storm: int, cancel_rate: float, rng: random.Random):
+
+    """Runs one draft from setup to reset. After every pick made by
+    hand, a storm of pre-picks hits the draft with the given chance,
+    and some of the pre-picks are cancelled again."""
+
+    logic = DraftLogic("benchmark", docs_link="https://docs.google.com/spreadsheets/d/benchmark")
+    logic.setup_draft(str(players), str(picks), "freeform")
+
+    # integer user ids, as discord gives them
+    users = [(f"player_{i}", 100000000000000000 + i) for i in range(players)]
+    for username, user_id in users:
+        with recorder.measure("join"):
+            logic.join_draft(username, user_id)
+
+    with recorder.measure("fire"):
+        logic.fire_draft()
+
+    # twice as many cards as get picked, so some pre-picks miss
+    pool = [f"Card {i:05}" for i in range(players * picks * 2)]
+    rng.shuffle(pool)
+
+    while logic.picks_remaining > 0:
+
+        # the player up picks a card nobody has taken yet
+        player = logic.active_player
+        while pool[-1] in logic.taken:
+            pool.pop()
+        card = pool.pop()
+        with recorder.measure("pick"):
+            logic.pick(player.username, player.user_id, (card,))
+
+        if logic.picks_remaining == 0 or rng.random() >= prepick_rate:
+            continue
+
+        # a pre-pick storm from one player
+        username, user_id = rng.choice(users)
+        for _ in range(storm):
+            card = rng.choice(pool)
+            with recorder.measure("pre_pick"):
+                logic.pre_pick(username, user_id, (card,))
+
+            queue = logic.seat_prepicks[logic.seats[user_id]]
+            if queue and rng.random() < cancel_rate:
+                card = rng.choice(list(queue))
+                with recorder.measure("cancel_pre_pick"):
+                    logic.cancel_pre_pick(username, user_id, (card,))
+
+    with recorder.measure("reset"):
+        logic.reset()
+
+
+def run(players: int, picks: int, drafts: int, prepick_rate: float, storm: int,
+        cancel_rate: float, seed: int) -> dict:
+
+    """Runs the drafts with stand-ins for every backend, in a scratch
+    directory so no storage files are left behind. The drafts are run
+    once to time them, then once more while tracing allocations."""
+
+    results = {"settings": {"players": players, "picks": picks, "drafts": drafts,
+                            "prepick_rate": prepick_rate, "storm": storm,
+                            "cancel_rate": cancel_rate, "seed": seed},
+               "operations": {}}
+
+    timed = Recorder()
+    traced = Recorder(allocations=True)
+    scryfall, sheet, backup = ScryfallStandIn(), SheetStandIn(), BackupStandIn()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        os.chdir(directory)
+        stack.callback(os.chdir, cwd)
+        stack.enter_context(patch.object(draft_logic, "scryfallapi", scryfall))
+        stack.enter_context(patch.object(draft_logic, "sheetapi", sheet))
+        stack.enter_context(patch.object(draft_logic, "backup", backup))
+
+        rng = random.Random(seed)
+        random.seed(seed)
+        for _ in range(drafts):
+            run_draft(timed, players, picks, prepick_rate, storm, cancel_rate, rng)
+
+        rng = random.Random(seed)
+        random.seed(seed)
+        tracemalloc.start()
+        try:
+            run_draft(traced, players, picks, prepick_rate, storm, cancel_rate, rng)
+        finally:
+            tracemalloc.stop()
+
+    for operation in OPERATIONS:
+        times = sorted(ns / 1000 for ns in timed.times[operation])
+        results["operations"][operation] = {
+            "count": len(times),
+            "p50_us": percentile(times, 50),
+            "p95_us": percentile(times, 95),
+            "p99_us": percentile(times, 99),
+            "max_us": max(times, default=0),
+            "peak_bytes_p50": percentile(sorted(traced.peaks[operation]), 50),
+            "peak_bytes_max": max(traced.peaks[operation], default=0),
+            "blocks_mean": (sum(traced.blocks[operation]) / len(traced.blocks[operation])
+                            if traced.blocks[operation] else 0)}
+
+    results["backends"] = {"scryfall_calls": scryfall.calls, "sheet_calls": sheet.calls,
+                           "sheet_cells": sheet.cells, "uploads": backup.uploads}
+    return results
+
+
+###################################
+###          REPORTING          ###
+###################################
+
+def report(results: dict) -> str:
+
+    """Formats the results as a table."""
+
+    lines = [f"{'operation':<16}{'count':>7}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}"
+             f"{'max us':>10}{'peak B':>10}{'blocks':>9}"]
+    for operation, stats in results["operations"].items():
+        lines.append(f"{operation:<16}{stats['count']:>7}{stats['p50_us']:>10.1f}"
+                     f"{stats['p95_us']:>10.1f}{stats['p99_us']:>10.1f}{stats['max_us']:>10.1f}"
+                     f"{stats['peak_bytes_p50']:>10}{stats['blocks_mean']:>9.1f}")
+    lines.append(", ".join(f"{name}: {count}" for name, count in results["backends"].items()))
+    return "\n".join(lines)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+
+    """Returns a line for every operation whose p50 or p95 is more
+    than tolerance times the baseline's."""
+
+    regressions = []
+    for operation, stats in results["operations"].items():
+        before = baseline["operations"].get(operation)
+        if not before:
+            continue
+        for key in ("p50_us", "p95_us"):
+            if before[key] and stats[key] > before[key] * tolerance:
+                regressions.append(f"{operation} {key}: {before[key]:.1f} -> {stats[key]:.1f}")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Benchmark the draft pick pipeline.")
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--picks", type=int, default=100)
+    parser.add_argument("--drafts", type=int, default=3)
+    parser.add_argument("--prepick-rate", type=float, default=0.5,
+                        help="chance of a pre-pick storm after each pick")
+    parser.add_argument("--storm", type=int, default=15,
+                        help="pre-picks queued in one storm")
+    parser.add_argument("--cancel-rate", type=float, default=0.2,
+                        help="chance a pre-pick is followed by a cancel")
+    parser.add_argument("--seed", type=int, default=100)
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="check the results against a baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="slowdown against the baseline counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.players, args.picks, args.drafts, args.prepick_rate,
+                  args.storm, args.cancel_rate, args.seed)
+    print(report(results))
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
 import discord
 import asyncio
+import signal
 from discord.ext import commands
 from decouple import config
+from botBackend import scryfallasync, cardcache, backup, metrics
 
 
 async def main():
@@ -17,12 +19,41 @@ async def main():
             'cogs.scryfall_commands',
             'cogs.help_commands',
             'cogs.remind_commands',
+            'cogs.stats_commands',
             'cogs.draft_logic_commands']
 
     for cog in cogs:
         await bot.load_extension(cog)
 
-    await bot.start(config('BOT_TOKEN'))
+    # load the card cache from the previous run
+    cardcache.warm_start()
+
+    # serve metrics for prometheus to scrape, if a port is set
+    metrics_runner = None
+    if config('METRICS_PORT', default=None):
+        metrics_runner = await metrics.start_server()
+
+    # heroku stops a dyno with SIGTERM, which would otherwise end the
+    # process before the backups below are sent. closing the bot ends
+    # bot.start, so the shutdown below runs. windows has no such signal.
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, lambda: asyncio.ensure_future(bot.close()))
+    except NotImplementedError:
+        pass
+
+    try:
+        await bot.start(config('BOT_TOKEN'))
+    finally:
+        # stop serving metrics
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+
+        # close pooled connections so shutdown is clean
+        await scryfallasync.close()
+
+        # send any backups still waiting on the backup worker
+        backup.worker.stop()
 
 
 if __name__ == "__main__":
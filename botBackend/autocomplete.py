@@ -0,0 +1,88 @@
+from array import array
+from bisect import bisect_left
+from botBackend import carddb, legality
+
+
+_card_index = None
+
+
+class PrefixIndex():
+
+    """This suggests card names for what a user has typed so far. Each
+    name is stored under its normalized name (see carddb.normalize_name)
+    and under the rest of that name from every later word, so 'bolt'
+    suggests 'Lightning Bolt'. The keys live in one sorted list searched
+    with bisect, which works like a flattened prefix trie: every key
+    under a prefix sits in one contiguous slice, without the memory
+    cost of a node per character."""
+
+    def __init__(self, cards: list):
+
+        # cards is a list of (name, legality mask) pairs
+        self.names = [name for name, _ in cards]
+        self.masks = array('L', (mask for _, mask in cards))
+
+        entries = []
+        for name_id, name in enumerate(self.names):
+            words = carddb.normalize_name(name).split()
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), name_id))
+
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.name_ids = array('L', (name_id for _, name_id in entries))
+
+    def complete(self, prefix: str, limit: int = 25, format: str = None,
+                 exclude: set = frozenset()) -> list:
+
+        """Returns up to limit card names that start with prefix, in
+        alphabetical order of the matched key. Cards not legal in
+        format, or named in exclude, are left out."""
+
+        prefix = carddb.normalize_name(prefix)
+
+        suggestions = []
+        seen = set()
+        for i in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if len(suggestions) == limit or not self.keys[i].startswith(prefix):
+                break
+
+            name_id = self.name_ids[i]
+            name = self.names[name_id]
+            if name_id in seen or name in exclude:
+                continue
+            if format and not legality.is_legal(self.masks[name_id], format):
+                continue
+
+            seen.add(name_id)
+            suggestions.append(name)
+
+        return suggestions
+
+    def __len__(self):
+        return len(self.names)
+
+
+def card_index() -> PrefixIndex:
+
+    """Builds the prefix index over the local card store the first
+    time it is needed, and reuses it afterwards. Returns None if no
+    card store has been ingested."""
+
+    global _card_index
+    if _card_index is None and carddb.available():
+        _card_index = PrefixIndex(carddb.name_masks())
+    return _card_index
+
+
+def suggest(prefix: str, format: str = None, exclude: set = frozenset()) -> list:
+
+    """Returns card names for an autocomplete prompt, at most as many
+    as discord will show. Nothing is suggested without a card store."""
+
+    index = card_index()
+    if index is None:
+        return []
+    if format and format.lower() not in legality.SHIFTS:
+        format = None
+    return index.complete(prefix, limit=25, format=format, exclude=exclude)
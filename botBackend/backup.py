@@ -1,35 +1,279 @@
 from decouple import config
+from botBackend import metrics
+import traceback
+import threading
+import tempfile
+import sqlite3
+import botocore
+import atexit
 import boto3
+import time
+import os
 
 
-def upload():
+# when the card cache was last sent to the bucket.
+_card_cache_uploaded = 0.0
+
+
+class BackupWorker():
+
+    """This sends backups to the S3 bucket from a background thread,
+    so a pick does not wait on an upload before it is answered.
+
+    A backup is handed over as a task under a key, such as a draft's
+    storage file. Once a task comes in the worker waits out the
+    interval and then runs every task it holds, so a burst of picks in
+    one draft becomes one upload. A task handed over again while it is
+    waiting is only run once. A backup is never more than about the
+    interval behind, and stop runs whatever is left straight away.
+    flush does the same for one key, such as before a draft is
+    reloaded from the bucket."""
+
+    def __init__(self, interval: float = None):
+
+        self.interval = (interval if interval is not None
+                         else float(config('BACKUP_INTERVAL', default=5)))
+
+        # key -> task, in the order they were first handed over
+        self.tasks = {}
+
+        # the key of the task being run, if one is
+        self.running = None
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def submit(self, key: str, task):
+
+        """Hands a backup task to the worker. Once the worker has been
+        stopped the task is run straight away instead."""
+
+        with self.condition:
+            if not self.stopped:
+                self.tasks.setdefault(key, task)
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name="backup", daemon=True)
+                    self.thread.start()
+                self.condition.notify_all()
+                return
+
+        task()
+
+    def run(self):
+
+        """Waits for tasks and runs them, at most once an interval."""
+
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.tasks or self.stopped)
+                if self.stopped:
+                    return
+
+                # let the burst build up, unless the worker is stopped
+                self.condition.wait_for(lambda: self.stopped, timeout=self.interval)
+                if self.stopped:
+                    return
+                keys = list(self.tasks)
+
+            # tasks are taken one at a time, so one can still be flushed
+            # while the ones before it run.
+            for key in keys:
+                with self.condition:
+                    task = self.tasks.pop(key, None)
+                    if task is None:
+                        continue
+                    self.running = key
+
+                try:
+                    task()
+                except Exception:
+                    # try again next interval, the changes are still held
+                    traceback.print_exc()
+                    with self.condition:
+                        self.tasks.setdefault(key, task)
+                finally:
+                    with self.condition:
+                        self.running = None
+                        self.condition.notify_all()
+
+    def flush(self, key: str):
+
+        """Runs the task waiting under a key straight away, or waits for
+        it if the worker is already running it. Once this returns,
+        everything handed over under the key has been backed up."""
+
+        with self.condition:
+            self.condition.wait_for(lambda: self.running != key)
+            task = self.tasks.pop(key, None)
+
+        if task is None:
+            return
+
+        try:
+            task()
+        except Exception:
+            with self.condition:
+                self.tasks.setdefault(key, task)
+            raise
+
+    def stop(self):
+
+        """Stops the worker and runs the tasks it was still holding,
+        so nothing waiting to be backed up is lost on shutdown."""
+
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+        if self.thread is not None:
+            self.thread.join()
+
+        with self.condition:
+            tasks, self.tasks = self.tasks, {}
+
+        for task in tasks.values():
+            try:
+                task()
+            except Exception:
+                traceback.print_exc()
+
+
+# the worker all drafts hand their backups to
+worker = BackupWorker()
+atexit.register(worker.stop)
+
+
+def upload(file: str = 'storage.json'):
 
     """This backs up the storage.json file to an S3 bucket
     on amazon. This is needed as heroku restarts dyno's every
     24 hours, causing local files to be erased. In order for
     the backup functionality to work, the storage.json file
-    cannot be randomly erased."""
+    cannot be randomly erased. Each draft has its own storage
+    file, which is kept under the same name in the bucket."""
 
     client = boto3.client('s3',
                           aws_access_key_id=config('ACCESS_KEY'),
                           aws_secret_access_key=config('SECRET_ACCESS_KEY'))
-    file = 'storage.json'
     bucket = 'discord-draft-bot'
-    file_location = '/storage/storage.json'
-    client.upload_file(file, bucket, file_location)
+    file_location = f'/storage/{file}'
+    with metrics.track("s3"):
+        client.upload_file(file, bucket, file_location)
+
+    # the card cache rides along, as a task of its own so a draft
+    # backup never fails or waits because of it.
+    if config('SYNC_CARD_CACHE', default=False, cast=bool):
+        worker.submit('card_cache.db', sync_card_cache)
 
 
-def load():
+def load(file_location: str = 'storage.json', missing_ok: bool = False) -> bool:
 
     """This downloads the storage.json file from the amazon
     s3 bucket, and allows for the draft to pick up from where
-    it left off."""
+    it left off. With missing_ok, a file that is not in the
+    bucket is fine, and any local copy of it is removed so a
+    stale one is not used. Returns True if the file was found."""
+
+    client = boto3.client('s3',
+                          aws_access_key_id=config('ACCESS_KEY'),
+                          aws_secret_access_key=config('SECRET_ACCESS_KEY'))
+
+    bucket = 'discord-draft-bot'
+    file = f'/storage/{file_location}'
+    metrics.backend_calls.inc("s3")
+    try:
+        client.download_file(bucket, file, file_location)
+    except botocore.exceptions.ClientError:
+        # a file that is not there yet is an answer, not a failure
+        if not missing_ok:
+            metrics.backend_errors.inc("s3")
+            raise
+        if os.path.exists(file_location):
+            os.remove(file_location)
+        return False
+
+    return True
+
+
+def delete(file: str):
+
+    """Removes a file from the S3 bucket, such as a backup
+    that has been moved over to a new one."""
+
+    client = boto3.client('s3',
+                          aws_access_key_id=config('ACCESS_KEY'),
+                          aws_secret_access_key=config('SECRET_ACCESS_KEY'))
+    bucket = 'discord-draft-bot'
+    file_location = f'/storage/{file}'
+    with metrics.track("s3"):
+        client.delete_object(Bucket=bucket, Key=file_location)
+
+
+def sync_card_cache():
+
+    """Sends the card cache to the S3 bucket, at most once an interval.
+    It changes rarely and is much larger than the draft state, and it
+    is only a cache, so a failed upload is printed and tried again
+    after the next interval rather than straight away."""
+
+    global _card_cache_uploaded
+    interval = float(config('CARD_CACHE_SYNC_INTERVAL', default=3600))
+    if time.monotonic() - _card_cache_uploaded < interval:
+        return
+
+    _card_cache_uploaded = time.monotonic()
+    try:
+        upload_card_cache()
+    except Exception:
+        traceback.print_exc()
+
+
+def upload_card_cache():
+
+    """This backs up the card cache file to the S3 bucket so
+    a restarted dyno does not start with a cold card cache. The
+    bot may be writing to the file, so a consistent copy of it
+    is taken with sqlite's backup and that is sent instead."""
+
+    file = config('CARD_CACHE_FILE', default='card_cache.db')
+    if not file:
+        return
+
+    client = boto3.client('s3',
+                          aws_access_key_id=config('ACCESS_KEY'),
+                          aws_secret_access_key=config('SECRET_ACCESS_KEY'))
+    bucket = 'discord-draft-bot'
+    file_location = '/storage/card_cache.db'
+
+    with tempfile.TemporaryDirectory() as directory:
+        copy = os.path.join(directory, 'card_cache.db')
+        source = sqlite3.connect(f"file:{file}?mode=ro", uri=True)
+        target = sqlite3.connect(copy)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+
+        with metrics.track("s3"):
+            client.upload_file(copy, bucket, file_location)
+
+
+def load_card_cache():
+
+    """This downloads the card cache file from the S3 bucket.
+    It is fine for the file to not exist yet, the cache just
+    starts out empty in that case."""
 
     client = boto3.client('s3',
                           aws_access_key_id=config('ACCESS_KEY'),
                           aws_secret_access_key=config('SECRET_ACCESS_KEY'))
 
     bucket = 'discord-draft-bot'
-    file = '/storage/storage.json'
-    file_location = 'storage.json'
-    client.download_file(bucket, file, file_location)
+    file = '/storage/card_cache.db'
+    file_location = config('CARD_CACHE_FILE', default='card_cache.db')
+    metrics.backend_calls.inc("s3")
+    try:
+        client.download_file(bucket, file, file_location)
+    except botocore.exceptions.ClientError:
+        pass
@@ -0,0 +1,242 @@
+from collections import OrderedDict
+from decouple import config
+from botBackend import backup, metrics
+import sqlite3
+import json
+import time
+import os
+
+
+class CardCache():
+
+    """This is a size bounded LRU cache for card lookups. Found cards
+    expire after the ttl, and cards scryfall could not find expire
+    after the shorter negative ttl so new spoilers show up quickly."""
+
+    def __init__(self, max_size: int = 2048, ttl: float = 86400,
+                 negative_ttl: float = 600, clock=time.monotonic, store=None):
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+
+        # optional DiskCardCache that every put is written through to
+        self.store = store
+
+        # key -> (expiry time, card json), oldest use first
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict:
+
+        """Returns the cached card json for a key, or None
+        if it is not cached or has expired."""
+
+        entry = self.entries.get(key)
+
+        # expired entries are kept until evicted, see get_stale
+        if entry is None or entry[0] <= self.clock():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def get_stale(self, key: str) -> dict:
+
+        """Returns the cached card json for a key even if it has expired,
+        or None if it was never cached or was evicted. This is a fallback
+        for when scryfall cannot be reached, so cards it could not find
+        are not returned."""
+
+        entry = self.entries.get(key)
+
+        if entry is None or entry[1]["object"] == "error":
+            return None
+        return entry[1]
+
+    def put(self, key: str, card_json: dict):
+
+        """Caches the card json for a key. Errors other than a card not
+        being found (rate limits, outages) are never cached."""
+
+        if card_json["object"] == "error":
+            if card_json.get("code") != "not_found":
+                return
+            ttl = self.negative_ttl
+        else:
+            ttl = self.ttl
+
+        self._insert(key, card_json, ttl)
+
+        if self.store is not None:
+            self.store.put(key, card_json, ttl)
+
+    def warm(self):
+
+        """Loads the unexpired entries of the disk store into memory,
+        so a restarted bot does not start with a cold cache."""
+
+        if self.store is None:
+            return
+
+        for key, card_json, ttl in self.store.entries(self.max_size):
+            self._insert(key, card_json, ttl)
+
+    def clear(self):
+
+        """Removes every entry and resets the counters."""
+
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _insert(self, key: str, card_json: dict, ttl: float):
+
+        """Adds an entry as the most recently used one."""
+
+        self.entries[key] = (self.clock() + ttl, card_json)
+        self.entries.move_to_end(key)
+
+        # evict the least recently used cards once we are over size
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+
+        """Returns the hit and miss counters for the cache."""
+
+        lookups = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+class DiskCardCache():
+
+    """This keeps cached card lookups in a single sqlite file so they
+    survive restarts. Expiry uses wall clock time since the monotonic
+    clock resets with the process. Once the stored json goes over
+    max_bytes the oldest entries are evicted."""
+
+    def __init__(self, path: str, max_bytes: int = 50_000_000):
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+                                    "expires REAL NOT NULL, stored REAL NOT NULL, "
+                                    "size INTEGER NOT NULL, data TEXT NOT NULL)")
+            self.connection.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+        self.total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def put(self, key: str, card_json: dict, ttl: float):
+
+        """Writes an entry to disk, evicting old entries if needed."""
+
+        data = json.dumps(card_json)
+        now = time.time()
+
+        with self.connection:
+            old = self.connection.execute("SELECT size FROM entries WHERE key = ?",
+                                          (key,)).fetchone()
+            self.connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                                    (key, now + ttl, now, len(data), data))
+            self.total_bytes += len(data) - (old[0] if old else 0)
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def entries(self, limit: int) -> list:
+
+        """Returns up to limit unexpired (key, card json, remaining ttl)
+        tuples, oldest first so the newest end up most recently used."""
+
+        now = time.time()
+        rows = self.connection.execute("SELECT key, data, expires FROM entries WHERE expires > ? "
+                                       "ORDER BY stored DESC, rowid DESC LIMIT ?",
+                                       (now, limit)).fetchall()
+        return [(key, json.loads(data), expires - now) for key, data, expires in reversed(rows)]
+
+    def close(self):
+
+        """Closes the sqlite file."""
+
+        self.connection.close()
+
+    def _evict(self):
+
+        """Deletes the oldest entries until we are back under
+        90% of the cap, so we do not evict on every put."""
+
+        target = self.max_bytes * 0.9
+        rows = self.connection.execute("SELECT key, size FROM entries "
+                                       "ORDER BY stored, rowid").fetchall()
+
+        evicted = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+
+def cache_key(card: tuple) -> str:
+
+    """Normalizes a card query so 'lightning  BOLT' and
+    'Lightning Bolt' share a cache entry."""
+
+    return " ".join(" ".join(card).lower().split())
+
+
+# shared by the blocking and the async scryfall clients.
+cache = CardCache(max_size=int(config('CARD_CACHE_SIZE', default=2048)),
+                  ttl=float(config('CARD_CACHE_TTL', default=86400)),
+                  negative_ttl=float(config('CARD_CACHE_NEGATIVE_TTL', default=600)))
+
+metrics.registry.counter("draftbot_card_cache_hits_total",
+                         "Card lookups answered by the card cache.",
+                         function=lambda: cache.hits)
+metrics.registry.counter("draftbot_card_cache_misses_total",
+                         "Card lookups the card cache could not answer.",
+                         function=lambda: cache.misses)
+metrics.registry.gauge("draftbot_card_cache_hit_ratio",
+                       "Share of card lookups answered by the card cache.",
+                       function=lambda: cache.stats()["hit_ratio"])
+
+
+def warm_start():
+
+    """Attaches the disk store to the shared cache and loads it into
+    memory. If SYNC_CARD_CACHE is on, the file is first pulled from the
+    S3 bucket so a fresh dyno starts with a hot card cache. A file that
+    cannot be read, such as one cut off part way through being written,
+    is deleted and the cache starts out cold instead."""
+
+    path = config('CARD_CACHE_FILE', default='card_cache.db')
+    if not path:
+        return
+
+    if config('SYNC_CARD_CACHE', default=False, cast=bool):
+        backup.load_card_cache()
+
+    max_bytes = int(config('CARD_CACHE_MAX_BYTES', default=50_000_000))
+    try:
+        cache.store = DiskCardCache(path, max_bytes)
+        cache.warm()
+    except (sqlite3.DatabaseError, ValueError):
+        if cache.store is not None:
+            cache.store.close()
+        cache.clear()
+        os.remove(path)
+        cache.store = DiskCardCache(path, max_bytes)
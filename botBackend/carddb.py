@@ -0,0 +1,201 @@
+import json
+import re
+import sqlite3
+import sys
+from decouple import config
+from botBackend.fuzzy import FuzzyIndex
+from botBackend import legality
+
+
+# layouts in the bulk file that are not draftable cards.
+SKIPPED_LAYOUTS = {"art_series", "token", "double_faced_token", "emblem"}
+
+# only the parts of the scryfall payload the bot actually uses are kept.
+KEPT_FIELDS = ["object", "id", "oracle_id", "name", "layout", "mana_cost",
+               "type_line", "legalities", "image_uris"]
+
+_connection = None
+_fuzzy_index = None
+
+
+def normalize_name(name: str) -> str:
+
+    """Normalizes a card name so lookups ignore case, punctuation
+    and extra whitespace. 'Fire // Ice' and 'fire ice' share a key,
+    and so do "Urza's Saga" and 'urzas saga'."""
+
+    name = re.sub(r"['’]", "", name.lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", name).split())
+
+
+def ingest(bulk_file: str, db_file: str = None) -> int:
+
+    """Loads a scryfall 'oracle cards' bulk data file into the local
+    card store. Any previous contents of the store are replaced.
+    Returns the number of cards that were stored."""
+
+    db_file = db_file or config('CARD_DB', default='cards.db')
+
+    with open(bulk_file, "r", encoding="utf-8") as file:
+        cards = json.load(file)
+
+    connection = sqlite3.connect(db_file)
+    with connection:
+        connection.execute("DROP TABLE IF EXISTS cards")
+        connection.execute("DROP TABLE IF EXISTS names")
+        connection.execute("CREATE TABLE cards (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+                           "legality INTEGER NOT NULL, data TEXT NOT NULL)")
+        connection.execute("CREATE TABLE names (key TEXT PRIMARY KEY, card_id TEXT NOT NULL)")
+
+        stored = 0
+        for card in cards:
+            if card.get("layout") in SKIPPED_LAYOUTS:
+                continue
+
+            mask = legality.encode(card.get("legalities", {}))
+            connection.execute("INSERT OR IGNORE INTO cards VALUES (?, ?, ?, ?)",
+                               (card["id"], card["name"], mask, json.dumps(_trim(card))))
+
+            # full names win over face names, so they are inserted first.
+            connection.execute("INSERT OR IGNORE INTO names VALUES (?, ?)",
+                               (normalize_name(card["name"]), card["id"]))
+            stored += 1
+
+        # split and double faced cards can also be found by either face.
+        for card in cards:
+            if card.get("layout") in SKIPPED_LAYOUTS:
+                continue
+            for face in card.get("card_faces", []):
+                connection.execute("INSERT OR IGNORE INTO names VALUES (?, ?)",
+                                   (normalize_name(face["name"]), card["id"]))
+
+    connection.close()
+    close()
+    return stored
+
+
+def lookup(name: str) -> dict:
+
+    """Returns the stored payload for a card name, or None
+    if the name is not in the local card store."""
+
+    row = _connect().execute("SELECT cards.data FROM names JOIN cards ON cards.id = names.card_id "
+                             "WHERE names.key = ?", (normalize_name(name),)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def get_card_json(name: str) -> dict:
+
+    """Returns the payload for a card name in the same shape the
+    scryfall API does, including its error object on a miss.
+    Misspelled and partial names are resolved like scryfall's
+    fuzzy endpoint resolves them."""
+
+    card_json = lookup(name)
+    if card_json is not None:
+        return card_json
+
+    matches = fuzzy_index().match(normalize_name(name))
+    if matches is None or len(matches) > 1:
+        return ambiguous(name)
+    elif len(matches) == 1:
+        return lookup(matches[0])
+    else:
+        return not_found(name)
+
+
+def not_found(name: str) -> dict:
+
+    """Builds the error object scryfall returns for unknown cards."""
+
+    return {"object": "error", "code": "not_found", "status": 404,
+            "details": f"No cards found matching “{name}”"}
+
+
+def ambiguous(name: str) -> dict:
+
+    """Builds the error object scryfall returns when a fuzzy
+    name matches more than one card."""
+
+    return {"object": "error", "code": "not_found", "status": 404, "type": "ambiguous",
+            "details": (f"Too many cards match ambiguous name “{name}”. "
+                        "Add more words to refine your search.")}
+
+
+def fuzzy_index() -> FuzzyIndex:
+
+    """Builds the fuzzy index over every name key the first time it
+    is needed, and reuses it afterwards."""
+
+    global _fuzzy_index
+    if _fuzzy_index is None:
+        _fuzzy_index = FuzzyIndex(_connect().execute(
+            "SELECT names.key, cards.name FROM names JOIN cards ON cards.id = names.card_id "
+            "ORDER BY names.rowid").fetchall())
+    return _fuzzy_index
+
+
+def names() -> list:
+
+    """Returns the name of every card in the local card store."""
+
+    return [row[0] for row in _connect().execute("SELECT name FROM cards")]
+
+
+def name_masks() -> list:
+
+    """Returns a (name, legality mask) pair for every stored card."""
+
+    return _connect().execute("SELECT name, legality FROM cards ORDER BY rowid").fetchall()
+
+
+def available() -> bool:
+
+    """Returns True if a local card store has been ingested."""
+
+    try:
+        _connect().execute("SELECT 1 FROM names LIMIT 1")
+        return True
+    except sqlite3.Error:
+        close()
+        return False
+
+
+def close():
+
+    """Closes the cached connection to the card store."""
+
+    global _connection, _fuzzy_index
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+    _fuzzy_index = None
+
+
+def _connect() -> sqlite3.Connection:
+
+    """Opens the card store once and reuses the connection
+    so lookups do not pay for opening the file each time."""
+
+    global _connection
+    if _connection is None:
+        db_file = config('CARD_DB', default='cards.db')
+        _connection = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True,
+                                      check_same_thread=False)
+    return _connection
+
+
+def _trim(card: dict) -> dict:
+
+    """Drops the fields of a bulk data card the bot never reads."""
+
+    trimmed = {field: card[field] for field in KEPT_FIELDS if field in card}
+    if "card_faces" in card:
+        trimmed["card_faces"] = [{key: face[key] for key in ("name", "image_uris") if key in face}
+                                 for face in card["card_faces"]]
+    return trimmed
+
+
+if __name__ == "__main__":
+    # usage: python -m botBackend.carddb oracle-cards.json
+    print(f"Stored {ingest(sys.argv[1])} cards.")
@@ -1,27 +1,72 @@
 from dataclasses import dataclass
 from decouple import config
 import random
-import json
-from botBackend import scryfallapi, sheetapi, backup
+import uuid
+import os
+from botBackend import scryfallapi, sheetapi, backup, legality, snapshot
+from botBackend.journal import Journal
+from botBackend.prepick_queue import PrepickQueue
+from botBackend.stats import timer
 
 
-@dataclass(frozen=True)
+# where the one draft was backed up before every channel had its own.
+LEGACY_STORAGE_FILE = "storage.json"
+
+
+@dataclass(frozen=True, slots=True)
 class Player():
 
     """This is the data class for the Player.
-    Contains their username, and their unique user id."""
+    Contains their username, and their unique user id.
+    A draft makes one when a player joins, and finds
+    their seat by user id from then on."""
 
     username: str
     user_id: str
 
 
+def snake_position(pick_number: int, player_count: int) -> tuple:
+
+    """Locates a pick in a snake draft, where the seat order reverses
+    every round [A, B, C, C, B, A]. Picks are numbered from 0. Returns
+    the (seat, round, row, column) of the pick, the row and column being
+    the pick's cell in the google sheet (names sit in row 1 and pick
+    numbers in column 1, so the first pick goes in row 2, column 2)."""
+
+    draft_round, position = divmod(pick_number, player_count)
+    seat = position if draft_round % 2 == 0 else player_count - 1 - position
+    return (seat, draft_round, draft_round + 2, seat + 2)
+
+
 class DraftLogic():
 
     """This class holds the setup drafting logic
     for the bot. This includes joining, leaving,
     and setting up attributes of the draft."""
 
-    def __init__(self):
+    def __init__(self, draft_id: str = None, sheet_key: str = None, docs_link: str = None):
+
+        # where this draft is stored and drawn. a draft without an id
+        # uses storage.snap and the sheet from the env settings. drafts
+        # backed up before the binary snapshots were stored as json.
+        self.draft_id = draft_id
+        self.storage_file = f"storage_{draft_id}.snap" if draft_id else "storage.snap"
+        self.json_storage_file = f"storage_{draft_id}.json" if draft_id else "storage.json"
+        self.journal_file = f"journal_{draft_id}.jsonl" if draft_id else "journal.jsonl"
+        self.sheet_key = sheet_key
+        self.docs_link = docs_link
+
+        # every change to the draft is written to the journal, and the
+        # whole draft is only written out (a snapshot) once the journal
+        # has this many records. see record and checkpoint.
+        self.journal = Journal(self.journal_file)
+        self.JOURNAL_COMPACT_EVERY = int(config('JOURNAL_COMPACT_EVERY', default=200))
+        self.checkpoint_id = None
+        self.snapshot_changed = False
+
+        # callbacks told when players join or leave the draft, called
+        # as observer(event, player). see DraftRegistry for one.
+        self.observers = []
 
         # constants for setup bounds
         self.PLAYER_COUNT_MIN = 1
@@ -30,30 +75,33 @@ class DraftLogic():
         self.PICK_COUNT_MAX = 100
 
         # list of legal formats users can play in
-        self.FORMATS = ["standard", "future", "historic", "gladiator",
-                        "pioneer", "modern", "legacy", "pauper",
-                        "vintage", "penny", "commander", "brawl",
-                        "duel", "oldschool", "premodern", "freeform"]
+        self.FORMATS = legality.FORMATS
 
         # setup values back to defaults
         self.player_count = 0
         self.pick_count = 0
-        self.players = []
         self.draft_fired = False
         self.setup = False
         self.format = None
 
-        # pick values and info to inform the google
-        # sheet api where to move.
-        self.picks = {}
-        self.prepicks = {}
-        self.active_player_index = 0
-        self.row = 2
-        self.column = 2
-        self.row_move = []
-        self.column_move = []
-        self.picks_remaining = 0
-        self.snake_player_list = []
+        # the players in seat order, and user id -> seat. everything
+        # else about a player is kept in a list indexed by their seat.
+        self.players = []
+        self.seats = {}
+
+        # pick values. the number of picks made so far is all that is
+        # needed to know whose turn it is and where the sheet goes next.
+        self.seat_picks = []
+        self.seat_prepicks = []
+        self.pick_number = 0
+
+        # names of every card picked so far, kept in step with picks
+        # so checking if a card is taken does not search every deck.
+        self.taken = set()
+
+        # card name -> seats with it in their pre-picks, kept in step
+        # with prepicks so a pick only touches the queues holding it.
+        self.prepickers = {}
 
     ###################################
     ###      DRAFT SETUP LOGIC      ###
@@ -74,7 +122,7 @@ class DraftLogic():
             return "All players must leave the draft for it to be cancelled."
 
         else:
-            self.setup = False
+            self.record("cancel_draft")
             return "The draft setup has been cancelled."
 
     def info_draft(self) -> str:
@@ -106,13 +154,12 @@ class DraftLogic():
         elif not self.setup:
             return "The draft has not been set up."
 
-        elif Player(username, user_id) in self.players:
+        elif user_id in self.seats:
             return f"{username} has already been added to the draft."
 
         elif len(self.players) < self.player_count:
-            self.players.append(Player(username, user_id))
-            self.picks[Player(username, user_id)] = []
-            self.prepicks[Player(username, user_id)] = []
+            self.record("join", username=username, user_id=user_id)
+            self.notify("join", self.players[self.seats[user_id]])
             return f"{username} has been added to the draft."
         else:
             return "The draft is full. Please join the next draft!"
@@ -124,10 +171,10 @@ class DraftLogic():
         if self.draft_fired:
             return "The draft has already fired and must be finished."
 
-        elif Player(username, user_id) in self.players:
-            self.players.remove(Player(username, user_id))
-            del self.picks[Player(username, user_id)]
-            del self.prepicks[Player(username, user_id)]
+        elif user_id in self.seats:
+            player = self.players[self.seats[user_id]]
+            self.record("leave", username=username, user_id=user_id)
+            self.notify("leave", player)
             return f"{username} has left the draft."
         else:
             return "You cannot leave the draft if you never joined."
@@ -153,10 +200,10 @@ class DraftLogic():
             return "Invalid parameters. Please use the '!help setup' command for details."
 
         else:
-            self.player_count = int(player_count)
-            self.pick_count = int(pick_count)
-            self.setup = True
-            self.format = format
+            # a new draft starts a new journal
+            self.record("setup", player_count=int(player_count),
+                        pick_count=int(pick_count), format=format)
+            self.checkpoint()
             return (f"The draft has been set up. We have {self.player_count} players, " +
                     f"{self.pick_count} picks, and the format is {self.format}. " +
                     "Use the !join command to be added to the draft.")
@@ -181,7 +228,7 @@ class DraftLogic():
             return ("The draft currently has too many players to go to " + player_count +
                     " players. Please have players leave before making the edit.")
         else:
-            self.player_count = int(player_count)
+            self.record("edit", player_count=int(player_count))
             return f"Player count is: {self.player_count}"
 
     def edit_pick(self, pick_count: str) -> str:
@@ -200,7 +247,7 @@ class DraftLogic():
             return "Invalid parameters. Please use the '!help edit_pick' command for details."
 
         else:
-            self.pick_count = int(pick_count)
+            self.record("edit", pick_count=int(pick_count))
             return f"Pick count is: {self.pick_count}"
 
     def edit_format(self, format: str) -> str:
@@ -217,9 +264,16 @@ class DraftLogic():
         elif (format.lower() not in self.FORMATS):
             return "Invalid parameters. Please use the '!help edit_format' command for details."
         else:
-            self.format = format.lower()
+            self.record("edit", format=format.lower())
             return f"Format is: {self.format}"
 
+    def notify(self, event: str, player: Player = None):
+
+        """Tells every observer that something happened in the draft."""
+
+        for observer in self.observers:
+            observer(event, player)
+
     ###################################
     ###       DRAFT PICK LOGIC      ###
     ###################################
@@ -239,65 +293,66 @@ class DraftLogic():
             return "Please ensure that the draft is full."
 
         else:
-            # fire the draft
-            self.draft_fired = True
-
-            # shuffle the player order to randomize it
-            random.shuffle(self.players)
-
-            # assign the snake order for the rotissare draft [A, B, C, C, B, A]
-            self.snake_player_list = self.players + self.players[::-1]
+            # shuffle the player order to randomize it. this is the seat
+            # order, see snake_position for how picks move around it.
+            order = list(self.players)
+            random.shuffle(order)
 
-            # use this to determine how many picks we have remaining
-            self.picks_remaining = self.pick_count * self.player_count
-
-            # instantiate the lists to inform the google sheet API how to move
-            self.row_move = (([0] * (self.player_count - 1)) + [1] +
-                             ([0] * (self.player_count - 1)) + [1])
-            self.column_move = (([1] * (self.player_count - 1)) + [0] +
-                                [-1] * ((self.player_count - 1)) + [0])
+            # fire the draft
+            self.record("fire", players=[[player.username, player.user_id] for player in order])
+            self.notify("fire")
 
             # append usernames to sheet
             player_names = [player.username for player in self.players]
-            sheetapi.setup_sheet(player_names, self.pick_count)
+            with timer("fire.sheet"):
+                sheetapi.setup_sheet(player_names, self.pick_count, self.sheet_key)
 
             # backup the state of the draft
-            self.backup()
+            with timer("fire.backup"):
+                self.backup()
 
             return ("Setup has been completed.\n\nSheet is available here: " +
-                    f"{config('DOCS_LINK')}\n\n" +
-                    f"{self.snake_player_list[0].username} is up first.")
+                    f"{self.docs_link or config('DOCS_LINK')}\n\n" +
+                    f"{self.active_player.username} is up first.")
 
-    def pick(self, username: str, user_id: str, card: tuple) -> str:
+    def pick(self, username: str, user_id: str, card: tuple, card_json: dict = None) -> str:
 
         """This functions as the pipeline for picking occurs.
         All others methods below are executed in series to execute a pick
-        in a proper fasion."""
+        in a proper fasion. The card json can be passed in if the
+        caller already looked it up. Each stage is timed into the
+        bot's stats (see the !stats command)."""
 
         # make 1 time call to scryfall
-        card_json = scryfallapi.get_scryfall_json(card)
+        if card_json is None:
+            with timer("pick.scryfall"):
+                card_json = scryfallapi.get_scryfall_json(card)
 
         # check if input is not valid
-        invalid = self.invalid_pick(username, user_id, card_json)
+        with timer("pick.validate"):
+            invalid = self.invalid_pick(username, user_id, card_json)
         if invalid:
             return invalid
 
-        # otherwise if valid make the pick and add to sheet
-        self.picks[Player(username, user_id)].append(card_json["name"])
-        sheetapi.pick(card_json["name"], self.row, self.column)
-
-        # pipeline to update after pick
-        self.row_update()
-        self.column_update()
-        self.active_player_update()
-        self.picks_remaining_update()
-        self.prepicks_update(card_json["name"])
+        # otherwise if valid make the pick. this also moves the draft
+        # on and drops the card from every pre-pick queue.
+        _, _, row, column = snake_position(self.pick_number, self.player_count)
+        with timer("pick.update"):
+            self.record("pick", user_id=user_id, card=card_json["name"])
+        cells = [(row, column, card_json["name"])]
 
         # see if there are any prepicks that can be made
-        pre_picks_made = self.iterate_prepicks()
+        with timer("pick.prepicks"):
+            pre_picks_made = self.iterate_prepicks(cells)
+
+        # add the pick and every pre-pick it set off to the
+        # sheet at once, so the board updates in one go.
+        with timer("pick.sheet"):
+            sheetapi.pick_many(cells, self.sheet_key)
 
         # backup the state of the draft
-        self.backup()
+        with timer("pick.backup"):
+            self.backup()
 
         # informs us about the picks and prepicks made
         statement = ""
@@ -306,17 +361,23 @@ class DraftLogic():
             statement += f"{pre_pick[0]} has chosen {pre_pick[1]}.\n"
 
         if self.picks_remaining > 0:
-            statement += f"{self.snake_player_list[self.active_player_index].username} is up."
+            statement += f"{self.active_player.username} is up."
         else:
             statement += ("Congrats! The draft has been finished! " +
                           "Decks and pictures will arrive shortly.")
 
         return statement
 
-    def iterate_prepicks(self):
+    def iterate_prepicks(self, cells: list = None):
 
         """This iterates through the prepicks until the active player
-        has no prepicks to make, or the draft is over."""
+        has no prepicks to make, or the draft is over. The sheet cells
+        of the picks are added to cells if it is given, for the caller
+        to write, otherwise they are written here."""
+
+        write_cells = cells is None
+        if write_cells:
+            cells = []
 
         more_prepicks = True
         more_picks = self.picks_remaining > 0
@@ -326,24 +387,19 @@ class DraftLogic():
         while more_prepicks and more_picks:
 
             # get the new active player
-            active_player = self.snake_player_list[self.active_player_index]
+            seat = self.active_seat
+            active_player = self.players[seat]
 
             # if they have no picks to make, we are done
-            if not self.prepicks[active_player]:
+            if not self.seat_prepicks[seat]:
                 more_prepicks = False
 
             else:
                 # make the pick for that player
-                pick = self.prepicks[active_player].pop(0)
-                self.picks[active_player].append(pick)
-                sheetapi.pick(pick, self.row, self.column)
-
-                # pipeline to update after pick
-                self.row_update()
-                self.column_update()
-                self.active_player_update()
-                self.picks_remaining_update()
-                self.prepicks_update(pick)
+                _, _, row, column = snake_position(self.pick_number, self.player_count)
+                pick = self.pop_prepick(seat)
+                self.record("pick", user_id=active_player.user_id, card=pick)
+                cells.append((row, column, pick))
 
                 # append the total picks so we know who did what.
                 total_picks.append((active_player.username, pick))
@@ -351,6 +407,9 @@ class DraftLogic():
                 # ensure we have more picks to make
                 more_picks = self.picks_remaining > 0
 
+        if write_cells:
+            sheetapi.pick_many(cells, self.sheet_key)
+
         return total_picks
 
     def invalid_pick(self, username: str, user_id: str, card_json: dict):
@@ -360,38 +419,81 @@ class DraftLogic():
         if not self.draft_fired:
             return "You cannot make picks until the draft has fired."
 
-        if Player(username, user_id) != self.snake_player_list[self.active_player_index]:
+        if self.seats.get(user_id) != self.active_seat:
             return "You are not the active drafter. Please wait until it is your turn."
 
+        if card_json.get("code") == "timeout":
+            return "Scryfall is not responding right now. Please try again in a moment."
+
         if card_json["object"] == "error":
             return "This card does not exist."
 
-        # used list comprehension here to combine all the lists
-        # in the dictionary into one list that can be searched.
-        if card_json["name"] in [cards for picks in self.picks.values() for cards in picks]:
+        if card_json["name"] in self.taken:
             return "That card has already been chosen. Please try again."
 
-        if (self.format != "freeform" and (card_json["legalities"][self.format] == "banned" or
-           card_json["legalities"][self.format] == "not_legal")):
+        if not self.legal_card(card_json):
             return f"This card is not legal in {self.format}."
 
         return None
 
+    def legal_card(self, card_json: dict) -> bool:
+
+        """Determines if a card can be played in the draft's format.
+        This is a shift on the card's packed legality mask."""
+
+        return legality.is_legal(legality.card_mask(card_json), self.format)
+
+    def add_pick(self, seat: int, card: str):
+
+        """Adds a card to a seat's picks and marks it as taken."""
+
+        self.seat_picks[seat].append(card)
+        self.taken.add(card)
+
     ###################################
     ###    PICK UPDATE PIPELINE     ###
     ###################################
 
-    def row_update(self):
-        self.row += self.row_move[self.active_player_index]
+    @property
+    def active_seat(self) -> int:
+
+        """The seat of the player whose turn it is to pick."""
+
+        seat, _, _, _ = snake_position(self.pick_number, self.player_count)
+        return seat
+
+    @property
+    def active_player(self) -> Player:
 
-    def column_update(self):
-        self.column += self.column_move[self.active_player_index]
+        """The player whose turn it is to pick."""
 
-    def active_player_update(self):
-        self.active_player_index = (self.active_player_index + 1) % len(self.snake_player_list)
+        return self.players[self.active_seat]
 
-    def picks_remaining_update(self):
-        self.picks_remaining -= 1
+    @property
+    def picks(self) -> dict:
+
+        """Every player's picks, by player."""
+
+        return dict(zip(self.players, self.seat_picks))
+
+    @property
+    def prepicks(self) -> dict:
+
+        """Every player's pre-pick queue, by player."""
+
+        return dict(zip(self.players, self.seat_prepicks))
+
+    @property
+    def picks_remaining(self) -> int:
+
+        """The number of picks left in a fired draft."""
+
+        if not self.draft_fired:
+            return 0
+        return self.pick_count * self.player_count - self.pick_number
+
+    def pick_number_update(self):
+        self.pick_number += 1
 
     def prepicks_update(self, card: str):
 
@@ -399,23 +501,21 @@ class DraftLogic():
         any prepicks that match the pick that was just made.
         This will ensure that there are no redundant picks made."""
 
-        # iterate through all of the players
-        for player in self.prepicks:
-
-            # if the most recent pick is in their prepicks, remove it
-            if card in self.prepicks[player]:
-                self.prepicks[player].remove(card)
+        # only the seats that pre-picked the card need updating
+        for seat in self.prepickers.pop(card, set()):
+            self.seat_prepicks[seat].remove(card)
 
     ###################################
     ###    DRAFT PRE-PICK LOGIC     ###
     ###################################
 
-    def pre_pick(self, username: str, user_id: str, card: tuple) -> str:
+    def pre_pick(self, username: str, user_id: str, card: tuple, card_json: dict = None) -> str:
 
         """"Allows users to pick cards in advance."""
 
         # make 1 time call to scryfall
-        card_json = scryfallapi.get_scryfall_json(card)
+        if card_json is None:
+            card_json = scryfallapi.get_scryfall_json(card)
 
         # check if input is not valid
         invalid = self.invalid_prepick(username, user_id, card_json)
@@ -423,19 +523,68 @@ class DraftLogic():
             return invalid
 
         # otherwise if valid make the pre pick
-        self.prepicks[Player(username, user_id)].append(card_json["name"])
+        self.record("prepick", username=username, user_id=user_id, card=card_json["name"])
 
         # backup the prepick list
         self.backup()
 
         return f"You have successfully pre-picked: {card_json['name']}."
 
-    def cancel_pre_pick(self, username: str, user_id: str, card: tuple) -> str:
+    def pre_pick_many(self, username: str, user_id: str, cards: list,
+                      card_jsons: list = None) -> str:
+
+        """Allows users to pick a list of cards in advance at once. Every
+        card is checked like a single pre-pick would be, the valid ones
+        are queued in order, and the draft is only backed up once."""
+
+        if not self.draft_fired:
+            return "You cannot make pre-picks until the draft has fired."
+
+        if user_id not in self.seats:
+            return "You are not in this draft and cannot make pre-picks."
+
+        if not cards:
+            return "Please list the cards you want to pre-pick."
+
+        # make 1 batched call to scryfall for the whole list
+        if card_jsons is None:
+            card_jsons = scryfallapi.get_scryfall_collection(cards)
+
+        added = []
+        rejected = ""
+
+        for card, card_json in zip(cards, card_jsons):
+
+            # check if input is not valid
+            invalid = self.invalid_prepick(username, user_id, card_json)
+            if invalid:
+                rejected += f"{' '.join(card)}: {invalid}\n"
+                continue
+
+            # otherwise if valid make the pre pick
+            self.record("prepick", username=username, user_id=user_id, card=card_json["name"])
+            added.append(card_json["name"])
+
+        # backup the prepick list once for the whole batch
+        if added:
+            self.backup()
+
+        statement = ""
+        if added:
+            statement += f"You have successfully pre-picked: {', '.join(added)}.\n"
+        if rejected:
+            statement += "These cards were not pre-picked:\n" + rejected
+
+        return statement.strip()
+
+    def cancel_pre_pick(self, username: str, user_id: str, card: tuple,
+                        card_json: dict = None) -> str:
 
         """"Allows users to cancel prepicks."""
 
         # make 1 time call to scryfall
-        card_json = scryfallapi.get_scryfall_json(card)
+        if card_json is None:
+            card_json = scryfallapi.get_scryfall_json(card)
 
         # check if input is not valid
         invalid = self.invalid_cancel_prepick(username, user_id, card_json)
@@ -443,27 +592,60 @@ class DraftLogic():
             return invalid
 
         # otherwise remove prepick
-        self.prepicks[Player(username, user_id)].remove(card_json["name"])
+        self.record("cancel", username=username, user_id=user_id, card=card_json["name"])
 
         # backup the prepick list
         self.backup()
 
         return f"You have successfully removed: {card_json['name']}."
 
+    def add_prepick(self, seat: int, card: str):
+
+        """Adds a card to the end of a seat's pre-picks."""
+
+        self.seat_prepicks[seat].append(card)
+        self.prepickers.setdefault(card, set()).add(seat)
+
+    def remove_prepick(self, seat: int, card: str):
+
+        """Removes a card from a seat's pre-picks."""
+
+        self.seat_prepicks[seat].remove(card)
+        self.discard_prepicker(seat, card)
+
+    def pop_prepick(self, seat: int) -> str:
+
+        """Removes and returns the first card of a seat's pre-picks."""
+
+        card = self.seat_prepicks[seat].popleft()
+        self.discard_prepicker(seat, card)
+        return card
+
+    def discard_prepicker(self, seat: int, card: str):
+
+        """Removes a seat from the seats which pre-picked a card."""
+
+        prepickers = self.prepickers.get(card)
+        if prepickers is not None:
+            prepickers.discard(seat)
+            if not prepickers:
+                del self.prepickers[card]
+
     def get_pre_picks(self, username, user_id) -> str:
 
         if not self.draft_fired:
             return "No pre-picks as draft has not fired."
 
-        if Player(username, user_id) not in self.prepicks:
+        seat = self.seats.get(user_id)
+        if seat is None:
             return "You are not in this draft and have no pre-picks."
 
-        if len(self.prepicks[Player(username, user_id)]) == 0:
+        if len(self.seat_prepicks[seat]) == 0:
             return "Pre-pick queue is empty."
 
         prepicks = "```"
 
-        for i, prepick in enumerate(self.prepicks[Player(username, user_id)], start=1):
+        for i, prepick in enumerate(self.seat_prepicks[seat], start=1):
             prepicks += f"{i}. {prepick}\n"
 
         prepicks += "```"
@@ -477,13 +659,17 @@ class DraftLogic():
         if not self.draft_fired:
             return "You cannot cancel pre-picks until the draft has fired."
 
-        if Player(username, user_id) not in self.prepicks:
+        seat = self.seats.get(user_id)
+        if seat is None:
             return "You are not in this draft and cannot cancel pre-picks."
 
+        if card_json.get("code") == "timeout":
+            return "Scryfall is not responding right now. Please try again in a moment."
+
         if card_json["object"] == "error":
             return "This card does not exist."
 
-        if card_json["name"] not in self.prepicks[Player(username, user_id)]:
+        if seat not in self.prepickers.get(card_json["name"], ()):
             return "Cannot remove cards you have not pre-picked."
 
         return None
@@ -495,22 +681,23 @@ class DraftLogic():
         if not self.draft_fired:
             return "You cannot make pre-picks until the draft has fired."
 
-        if Player(username, user_id) not in self.prepicks:
+        seat = self.seats.get(user_id)
+        if seat is None:
             return "You are not in this draft and cannot make pre-picks."
 
+        if card_json.get("code") == "timeout":
+            return "Scryfall is not responding right now. Please try again in a moment."
+
         if card_json["object"] == "error":
             return "This card does not exist."
 
-        if (self.format != "freeform" and (card_json["legalities"][self.format] == "banned" or
-           card_json["legalities"][self.format] == "not_legal")):
+        if not self.legal_card(card_json):
             return f"This card is not legal in {self.format}."
 
-        # used list comprehension here to combine all the lists
-        # in the dictionary into one list that can be searched.
-        if card_json["name"] in [cards for picks in self.picks.values() for cards in picks]:
+        if card_json["name"] in self.taken:
             return "That card has already been chosen in the draft. Please try again."
 
-        if card_json["name"] in self.prepicks[Player(username, user_id)]:
+        if seat in self.prepickers.get(card_json["name"], ()):
             return "You have already pre-picked this card. Please try again."
 
         return None
@@ -524,103 +711,301 @@ class DraftLogic():
         """Resets the class values back to default
         once the draft has been finished."""
 
-        # reset setup values back to defaults
-        self.player_count = 0
-        self.pick_count = 0
-        self.players = []
-        self.draft_fired = False
-        self.setup = False
-        self.format = None
+        # the players are about to be cleared, so they go first
+        for player in self.players:
+            self.notify("leave", player)
 
-        # reset pick / sheet api values to defaults
-        self.picks = {}
-        self.prepicks = {}
-        self.active_player_index = 0
-        self.row = 2
-        self.column = 2
-        self.row_move = []
-        self.column_move = []
-        self.picks_remaining = 0
-        self.snake_player_list = []
+        # reset the values back to defaults. nothing from the finished
+        # draft is needed again, so the journal starts over too.
+        self.record("reset")
+        self.checkpoint()
 
         # backup the state of the draft to being reset
-        self.backup()
+        with timer("reset.backup"):
+            self.backup()
 
         # call sheet api to reset
-        sheetapi.reset_sheet()
+        with timer("reset.sheet"):
+            sheetapi.reset_sheet(self.sheet_key)
+
+    ###################################
+    ###     DRAFT JOURNAL LOGIC     ###
+    ###################################
+
+    def record(self, event: str, **fields):
+
+        """Makes a change to the draft and writes it to the journal.
+        Every change goes through here, so replaying the journal
+        with apply rebuilds the draft exactly."""
+
+        entry = {"event": event, **fields}
+        self.apply(entry)
+        self.journal.append(entry)
+
+        # keep the journal short so reloading stays quick
+        if len(self.journal) >= self.JOURNAL_COMPACT_EVERY:
+            self.checkpoint()
+
+    def apply(self, entry: dict):
+
+        """Makes the change a journal record describes. This does not
+        call any apis or tell the observers, so it is safe to replay."""
+
+        event = entry["event"]
+
+        if event == "setup":
+            self.player_count = entry["player_count"]
+            self.pick_count = entry["pick_count"]
+            self.format = entry["format"]
+            self.setup = True
+
+        elif event == "edit":
+            self.player_count = entry.get("player_count", self.player_count)
+            self.pick_count = entry.get("pick_count", self.pick_count)
+            self.format = entry.get("format", self.format)
+
+        elif event == "cancel_draft":
+            self.setup = False
+
+        elif event == "join":
+            self.seats[entry["user_id"]] = len(self.players)
+            self.players.append(Player(entry["username"], entry["user_id"]))
+            self.seat_picks.append([])
+            self.seat_prepicks.append(PrepickQueue())
+
+        elif event == "leave":
+            seat = self.seats[entry["user_id"]]
+            del self.players[seat]
+            del self.seat_picks[seat]
+            del self.seat_prepicks[seat]
+            self.seat_players()
+
+        elif event == "fire":
+            # move everything about each player to their new seat
+            order = [self.seats[user_id] for _, user_id in entry["players"]]
+            self.players = [self.players[seat] for seat in order]
+            self.seat_picks = [self.seat_picks[seat] for seat in order]
+            self.seat_prepicks = [self.seat_prepicks[seat] for seat in order]
+            self.seat_players()
+            self.draft_fired = True
+            self.pick_number = 0
+
+        elif event == "pick":
+            # the pick belongs to whoever is up, and any pre-picks of
+            # the card, their own included, are dropped.
+            self.add_pick(self.active_seat, entry["card"])
+            self.pick_number_update()
+            self.prepicks_update(entry["card"])
+
+        elif event == "prepick":
+            self.add_prepick(self.seats[entry["user_id"]], entry["card"])
+
+        elif event == "cancel":
+            self.remove_prepick(self.seats[entry["user_id"]], entry["card"])
+
+        elif event == "reset":
+            self.player_count = 0
+            self.pick_count = 0
+            self.draft_fired = False
+            self.setup = False
+            self.format = None
+            self.players = []
+            self.seats = {}
+            self.seat_picks = []
+            self.seat_prepicks = []
+            self.pick_number = 0
+            self.taken = set()
+            self.prepickers = {}
+
+    def seat_players(self):
+
+        """Rebuilds the user id -> seat lookup after seats move."""
+
+        self.seats = {player.user_id: seat for seat, player in enumerate(self.players)}
 
     ###################################
     ###      BACKUP DRAFT LOGIC     ###
     ###################################
 
+    def checkpoint(self):
+
+        """Writes the whole draft to the storage file (a snapshot) and
+        starts an empty journal after it. The snapshot is sent to the
+        S3 bucket with the next backup."""
+
+        self.checkpoint_id = uuid.uuid4().hex
+
+        # the backup worker may be sending the old snapshot, so the
+        # new one is written aside and swapped in whole.
+        snapshot.write(self.storage_file + ".tmp", self.snapshot())
+        os.replace(self.storage_file + ".tmp", self.storage_file)
+
+        self.journal.start(self.checkpoint_id)
+        self.snapshot_changed = True
+
+    def snapshot(self) -> dict:
+
+        """This returns all values in cache as a json friendly dict,
+        the layout snapshot files are read back into. I will note that
+        this is a bit yucky / manual due to dataclasses not being
+        jsonable. As a result, I have to manual this a bit."""
+
+        return {"checkpoint": self.checkpoint_id,
+                "player_count": self.player_count,
+                "pick_count": self.pick_count,
+                "players": [{"username": player.username,
+                             "user_id": player.user_id}
+                            for player in self.players],
+                "draft_fired": self.draft_fired,
+                "setup": self.setup,
+                "format": self.format,
+                "picks": [{"username": player.username,
+                           "user_id": player.user_id,
+                           "picks": picks}
+                          for player, picks in zip(self.players, self.seat_picks)],
+                "prepicks": [{"username": player.username,
+                              "user_id": player.user_id,
+                              "prepicks": list(prepicks)}
+                             for player, prepicks in zip(self.players, self.seat_prepicks)],
+                "pick_number": self.pick_number}
+
+    def restore(self, data):
+
+        """Sets all values in cache from a snapshot. A binary snapshot
+        is already in seat order, so its sections are used as they are
+        decoded. Older snapshots in the json layout are put in seat order
+        by user id."""
+
+        if isinstance(data, snapshot.Snapshot):
+            header, players, picks, prepicks = data.header, data.players, data.picks, data.prepicks
+        else:
+            header = data
+            players = [(player["username"], player["user_id"]) for player in data["players"]]
+            seats = {user_id: seat for seat, (_, user_id) in enumerate(players)}
+            picks = [[] for _ in players]
+            for player in data["picks"]:
+                picks[seats[player["user_id"]]] = player["picks"]
+            prepicks = [[] for _ in players]
+            for player in data["prepicks"]:
+                prepicks[seats[player["user_id"]]] = player["prepicks"]
+
+        self.checkpoint_id = header.get("checkpoint")
+        self.player_count = header["player_count"]
+        self.pick_count = header["pick_count"]
+        self.draft_fired = header["draft_fired"]
+        self.setup = header["setup"]
+        self.format = header["format"]
+
+        self.players = [Player(username, user_id) for username, user_id in players]
+        self.seat_players()
+
+        self.seat_picks = picks
+        self.taken = {card for seat_picks in self.seat_picks for card in seat_picks}
+
+        self.seat_prepicks = [PrepickQueue(cards) for cards in prepicks]
+        self.prepickers = {}
+        for seat, seat_prepicks in enumerate(self.seat_prepicks):
+            for card in seat_prepicks:
+                self.prepickers.setdefault(card, set()).add(seat)
+
+        # backups from before the pick number was stored only have the
+        # picks remaining. players were already saved in seat order.
+        if "pick_number" in header:
+            self.pick_number = header["pick_number"]
+        elif self.draft_fired:
+            self.pick_number = self.pick_count * self.player_count - header["picks_remaining"]
+        else:
+            self.pick_number = 0
+
     def backup(self):
-        """This stores all values in cache into a backup
-        json file to cover the case where the bot crashes.
-        This ensures the bot can be reloaded and the draft
-        can pick up from where it left off. I will note
-        that this is a bit yucky / manual due to dataclasses
-        not being jsonable. As a result, I have to manual this a bit."""
-
-        with open("storage.json", "r") as file:
-            data = json.load(file)
-        data["player_count"] = self.player_count
-        data["pick_count"] = self.pick_count
-        data["players"] = [{"username": player.username,
-                            "user_id": player.user_id}
-                           for player in self.players]
-        data["draft_fired"] = self.draft_fired
-        data["setup"] = self.setup
-        data["format"] = self.format
-        data["picks"] = [{"username": player.username,
-                          "user_id": player.user_id,
-                          "picks": self.picks[player]}
-                         for player in self.picks]
-        data["prepicks"] = [{"username": player.username,
-                             "user_id": player.user_id,
-                             "prepicks": self.prepicks[player]}
-                            for player in self.prepicks]
-        data["active_player_index"] = self.active_player_index
-        data["row"] = self.row
-        data["column"] = self.column
-        data["row_move"] = self.row_move
-        data["column_move"] = self.column_move
-        data["picks_remaining"] = self.picks_remaining
-        data["snake_player_list"] = [{"username": player.username,
-                                      "user_id": player.user_id}
-                                     for player in self.snake_player_list]
-
-        with open("storage.json", "w") as file:
-            json.dump(data, file)
-
-        # back up the copy of the file to the S3 bucket
-        # as heroku files do not persist upon restart.
-        backup.upload()
+
+        """This backs up the draft to cover the case where the bot
+        crashes, so the bot can be reloaded and the draft can pick up
+        from where it left off. The upload is left to the backup worker,
+        which sends a burst of changes together a moment later."""
+
+        backup.worker.submit(self.storage_file, self.send_backup)
+
+    def send_backup(self):
+
+        """Sends the backup to the S3 bucket, as heroku files do not
+        persist upon restart. Changes are already in the journal, so
+        this only sends the changes made since the last backup, as a
+        journal segment, and the snapshot if a new one was taken. What
+        is sent per pick stays the same size however big the draft is.
+        This runs on the backup worker's thread."""
+
+        with timer("backup.send"):
+            if self.snapshot_changed:
+                self.snapshot_changed = False
+                try:
+                    backup.upload(self.storage_file)
+                except Exception:
+                    self.snapshot_changed = True
+                    raise
+
+            # a segment that fails to upload is cut again next time
+            segment_file = self.journal.cut()
+            if segment_file is not None:
+                backup.upload(segment_file)
+                self.journal.sent()
 
     def reload(self):
-        """This loads in stored data from a json file to
-        restore a draft to a previous stage."""
-
-        # load in the json object from the amazon s3 bucket.
-        backup.load()
-
-        with open("storage.json", "r") as file:
-            data = json.load(file)
-        self.player_count = data["player_count"]
-        self.pick_count = data["pick_count"]
-        self.players = [Player(player["username"], player["user_id"]) for player in data["players"]]
-        self.draft_fired = data["draft_fired"]
-        self.setup = data["setup"]
-        self.format = data["format"]
-
-        self.picks = {Player(player["username"], player["user_id"]): player["picks"]
-                      for player in data["picks"]}
-        self.prepicks = {Player(player["username"], player["user_id"]): player["prepicks"]
-                         for player in data["prepicks"]}
-        self.active_player_index = data["active_player_index"]
-        self.row = data["row"]
-        self.column = data["column"]
-        self.row_move = data["row_move"]
-        self.column_move = data["column_move"]
-        self.picks_remaining = data["picks_remaining"]
-        self.snake_player_list = [Player(player["username"], player["user_id"])
-                                  for player in data["snake_player_list"]]
+
+        """This restores a draft to a previous stage. The snapshot is
+        loaded, and the journal written after it is replayed on top."""
+
+        # send any changes still waiting on the backup worker first, or
+        # the bucket would be missing them and they would be lost.
+        backup.worker.flush(self.storage_file)
+
+        # load in the snapshot from the amazon s3 bucket. drafts backed
+        # up before the binary snapshots only have a json one.
+        file_name = self.storage_file
+        if not backup.load(file_name, missing_ok=True):
+            file_name = self.json_storage_file
+
+            # before every channel had a draft of its own, the one draft
+            # was kept in storage.json and drawn on the env settings'
+            # sheet, so a channel on that sheet can pick it up.
+            legacy = self.draft_id is not None and self.sheet_key is None
+            if not backup.load(file_name, missing_ok=legacy):
+                file_name = LEGACY_STORAGE_FILE
+                backup.load(file_name)
+        data = snapshot.load(file_name)
+
+        # then the journal segments. there is at most one segment per
+        # journal record, and backups from before the journal have none.
+        # segments left in the bucket from an older snapshot are not
+        # downloaded past the first one.
+        snapshot_checkpoint = snapshot.checkpoint(data)
+        segments = 0
+        while (snapshot_checkpoint is not None and segments < self.JOURNAL_COMPACT_EVERY and
+               backup.load(self.journal.segment_file(segments), missing_ok=True) and
+               self.journal.segment_checkpoint(segments) == snapshot_checkpoint):
+            segments += 1
+        self.journal.join(segments)
+
+        for player in self.players:
+            self.notify("leave", player)
+
+        self.restore(data)
+
+        # a journal left over from another snapshot is not replayed
+        checkpoint, entries = self.journal.read()
+        if checkpoint is not None and checkpoint == self.checkpoint_id:
+            for entry in entries:
+                self.apply(entry)
+        else:
+            self.checkpoint()
+
+        # the draft now has a backup of its own, so the old one is
+        # removed rather than picked up by another channel later.
+        if file_name == LEGACY_STORAGE_FILE and self.draft_id is not None:
+            self.send_backup()
+            backup.delete(LEGACY_STORAGE_FILE)
+
+        for player in self.players:
+            self.notify("join", player)
+        if self.draft_fired:
+            self.notify("fire")
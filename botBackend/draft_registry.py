@@ -0,0 +1,152 @@
+from decouple import config, Csv
+from botBackend.draft_logic import DraftLogic
+
+
+class DraftRegistry():
+
+    """This holds every draft the bot is running, one per discord
+    channel, keyed by (guild id, channel id). Each draft has its own
+    state, storage file and google sheet, so drafts in different
+    channels never see each other.
+
+    Sheets are given to channels with the DRAFT_SHEETS setting. A
+    channel without one uses the sheet from GOOGLE_SHEET_URL_KEY,
+    which only one draft can have set up at a time.
+
+    DM's have no channel, so the registry also keeps an index of which
+    drafts every user is in, kept up to date by observing the drafts.
+    A user in several drafts picks the one their DM's go to with select,
+    and a draft firing is selected for its players who have not chosen."""
+
+    def __init__(self, max_drafts: int = None, sheets: dict = None):
+
+        self.max_drafts = max_drafts or int(config('MAX_DRAFTS', default=50))
+        self.sheets = sheets if sheets is not None else parse_sheets(
+            config('DRAFT_SHEETS', default='', cast=Csv()))
+
+        # (guild id, channel id) -> DraftLogic
+        self.drafts = {}
+
+        # user id -> keys of the drafts they are in, and the key
+        # of the draft their DM's go to if they have chosen one.
+        self.user_drafts = {}
+        self.selected = {}
+
+    def get(self, guild_id: int, channel_id: int) -> DraftLogic:
+
+        """Returns the draft of a channel, making a new one if the
+        channel has none. Returns None if a new draft is needed but
+        the bot is already running as many as it is allowed."""
+
+        key = (guild_id, channel_id)
+        logic = self.drafts.get(key)
+
+        if logic is None:
+            if len(self.drafts) >= self.max_drafts:
+                return None
+
+            sheet_key = self.sheets.get(channel_id)
+            docs_link = f"https://docs.google.com/spreadsheets/d/{sheet_key}" if sheet_key else None
+            logic = DraftLogic(f"{guild_id}_{channel_id}", sheet_key, docs_link)
+            logic.observers.append(lambda event, player: self.update(key, event, player))
+            self.drafts[key] = logic
+
+        return logic
+
+    def find(self, guild_id: int, channel_id: int) -> DraftLogic:
+
+        """Returns the draft of a channel, or None if it has none."""
+
+        return self.drafts.get((guild_id, channel_id))
+
+    def release(self, guild_id: int, channel_id: int):
+
+        """Forgets a channel's draft once it is no longer set up, so
+        finished and cancelled drafts do not hold on to memory."""
+
+        logic = self.drafts.get((guild_id, channel_id))
+        if logic is not None and not logic.setup and not logic.draft_fired:
+            del self.drafts[(guild_id, channel_id)]
+
+    def route(self, guild_id: int, channel_id: int, user_id: int) -> tuple:
+
+        """Returns the key of the draft a command is for, or None if
+        there is no such draft. Commands in a server go to the draft of
+        their channel. DM's have no channel to go by, so they go to the
+        draft the user has selected, or the one draft they have joined.
+        Both are dict lookups however many drafts are running."""
+
+        if guild_id is None:
+            keys = self.user_drafts.get(user_id, ())
+            if self.selected.get(user_id) in keys:
+                return self.selected[user_id]
+            return next(iter(keys)) if len(keys) == 1 else None
+
+        key = (guild_id, channel_id)
+        return key if key in self.drafts else None
+
+    def drafts_for(self, user_id: int) -> list:
+
+        """Returns the keys of the drafts a user has joined."""
+
+        return sorted(self.user_drafts.get(user_id, ()))
+
+    def select(self, user_id: int, key: tuple) -> bool:
+
+        """Sends a user's DM's to one of the drafts they have joined.
+        Returns False if they are not in that draft."""
+
+        if key not in self.user_drafts.get(user_id, ()):
+            return False
+        self.selected[user_id] = key
+        return True
+
+    def update(self, key: tuple, event: str, player):
+
+        """Keeps the user index in step with a draft. Drafts call
+        this when a player joins or leaves, and when they fire."""
+
+        if event == "join":
+            self.user_drafts.setdefault(player.user_id, set()).add(key)
+
+        elif event == "leave":
+            keys = self.user_drafts.get(player.user_id, set())
+            keys.discard(key)
+            if not keys:
+                self.user_drafts.pop(player.user_id, None)
+            if self.selected.get(player.user_id) == key:
+                del self.selected[player.user_id]
+
+        elif event == "fire":
+            for seated in self.drafts[key].players:
+                self.selected.setdefault(seated.user_id, key)
+
+    def sheet_in_use(self, logic: DraftLogic) -> bool:
+
+        """Returns True if another set up draft is drawing
+        on the same sheet as this one."""
+
+        return any(other is not logic and other.setup and other.sheet_key == logic.sheet_key
+                   for other in self.drafts.values())
+
+    def queued_prepicks(self) -> int:
+
+        """Returns how many pre-picks are waiting in every draft."""
+
+        return sum(len(queue) for logic in list(self.drafts.values())
+                   for queue in logic.seat_prepicks)
+
+    def __len__(self):
+        return len(self.drafts)
+
+
+def parse_sheets(entries: list) -> dict:
+
+    """Reads DRAFT_SHEETS entries of the form CHANNEL_ID=SHEET_KEY
+    into a dict of channel id to sheet key."""
+
+    sheets = {}
+    for entry in entries:
+        channel_id, _, sheet_key = entry.partition("=")
+        sheets[int(channel_id.strip())] = sheet_key.strip()
+    return sheets
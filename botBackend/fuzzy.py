@@ -0,0 +1,162 @@
+from bisect import bisect_left
+from collections import Counter
+
+
+class FuzzyIndex():
+
+    """This resolves misspelled and partial card names the way scryfall's
+    fuzzy endpoint does, but locally. Keys are normalized names (see
+    carddb.normalize_name), and a card can have several keys, such as
+    its full name plus the name of each face.
+
+    Two precomputed indexes back it:
+    - a sorted word list, so 'jace mind' finds every name that has
+      a word starting with 'jace' and a word starting with 'mind'.
+    - character trigram postings, so 'lightnig bolt' finds the
+      names sharing the most trigrams with it."""
+
+    # how similar (dice coefficient of trigrams) a typo has to be.
+    MIN_SIMILARITY = 0.5
+
+    # how many of the names sharing the most trigrams get scored.
+    CANDIDATES = 64
+
+    # a query matching more names than this is ambiguous, so the
+    # search stops there instead of finding every one.
+    MAX_MATCHES = 8
+
+    # the most words a partial search looks at. a query whose words
+    # all start more words than this is too broad to tell apart.
+    PARTIAL_SCAN = 2000
+
+    # the most trigram postings counted for a typo. the rarest of the
+    # query's trigrams are counted first, the rest are only checked
+    # against the best candidates.
+    MAX_POSTINGS = 1000
+
+    def __init__(self, keys: list):
+
+        # keys is a list of (normalized key, card name) pairs
+        self.keys = [key for key, _ in keys]
+        self.card_names = [name for _, name in keys]
+        self.exact = {}
+        for key_id, key in enumerate(self.keys):
+            self.exact.setdefault(key, key_id)
+
+        # sorted (word, key id) pairs for prefix searches
+        self.words = sorted((word, key_id) for key_id, key in enumerate(self.keys)
+                            for word in set(key.split()))
+        self.word_list = [word for word, _ in self.words]
+
+        # trigram -> ids of the keys that contain it
+        self.postings = {}
+        self.sizes = []
+        for key_id, key in enumerate(self.keys):
+            trigrams = set(_trigrams(key))
+            self.sizes.append(len(trigrams))
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, []).append(key_id)
+
+    def match(self, key: str) -> list:
+
+        """Returns the card names a normalized query could mean. One name
+        is a match, more than one is ambiguous, and none is a miss. Only
+        the first few names of an ambiguous query are returned, and a
+        query too broad to search is ambiguous without any (None)."""
+
+        if not key:
+            return []
+
+        if key in self.exact:
+            return [self.card_names[self.exact[key]]]
+
+        partial = self._partial_matches(key)
+        if partial is None or partial:
+            return partial
+
+        return self._typo_matches(key)
+
+    def _partial_matches(self, key: str) -> list:
+
+        """Finds names where every query word starts a word of the name.
+        Returns None if the query is too broad to search."""
+
+        query_words = key.split()
+
+        # start from the most selective word to keep the work small
+        start, end = min((self._prefix_range(word) for word in query_words),
+                         key=lambda word_range: word_range[1] - word_range[0])
+
+        matches = set()
+        for _, key_id in self.words[start:min(end, start + self.PARTIAL_SCAN)]:
+            name_words = self.keys[key_id].split()
+            if all(any(name_word.startswith(word) for name_word in name_words)
+                   for word in query_words):
+                matches.add(self.card_names[key_id])
+                if len(matches) > self.MAX_MATCHES:
+                    break
+
+        # the scan was cut short before the query was shown to be
+        # ambiguous, so a lone match might not be the only one.
+        if end - start > self.PARTIAL_SCAN and len(matches) < 2:
+            return None
+
+        return sorted(matches)
+
+    def _typo_matches(self, key: str) -> list:
+
+        """Finds the most similar names by shared trigrams."""
+
+        query = set(_trigrams(key))
+
+        # trigrams found in a large share of names ('the', 'ing') say little
+        # about which card was meant, so candidates are found using the
+        # rarer ones, up to MAX_POSTINGS names counted. counting and
+        # picking the names that share the most both run in C, so only
+        # a handful of names are scored in python.
+        shared = Counter()
+        common = []
+        counted = 0
+        for trigram in sorted(query, key=lambda trigram: len(self.postings.get(trigram, ()))):
+            postings = self.postings.get(trigram, ())
+            if shared and counted + len(postings) > self.MAX_POSTINGS:
+                common.append(trigram)
+                continue
+            shared.update(postings)
+            counted += len(postings)
+
+        scores = {}
+        for key_id, count in shared.most_common(self.CANDIDATES):
+            padded = f" {self.keys[key_id]} "
+            count += sum(1 for trigram in common if trigram in padded)
+            score = 2 * count / (len(query) + self.sizes[key_id])
+            name = self.card_names[key_id]
+            if score >= self.MIN_SIMILARITY and score > scores.get(name, 0):
+                scores[name] = score
+
+        if not scores:
+            return []
+
+        best = max(scores.values())
+        return sorted(name for name, score in scores.items() if score == best)
+
+    def _prefix_range(self, word: str) -> tuple:
+
+        """Returns the (start, end) slice of the word list
+        holding the words that start with word."""
+
+        start = bisect_left(self.word_list, word)
+        end = bisect_left(self.word_list, word + "\uffff", start)
+        return (start, end)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def _trigrams(key: str) -> list:
+
+    """Splits a key into character trigrams. Padding the ends lets
+    the first and last letters count as much as the middle ones."""
+
+    padded = f" {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
@@ -0,0 +1,179 @@
+import threading
+import json
+import os
+
+
+class Journal():
+
+    """This is an append only log of what happened in a draft, one json
+    record per line. Writing a record costs the same however far into
+    the draft it is, unlike rewriting the whole draft every time.
+
+    The first line of the file names the snapshot (checkpoint) the
+    records follow on from, so a journal is only replayed on top of
+    the snapshot it was started for.
+
+    The records not backed up yet are also kept aside, so a backup can
+    be cut as a small segment file holding only those (a delta) rather
+    than the whole journal. Segments are numbered from 0 after every
+    snapshot, and each starts with the same checkpoint line. A segment
+    only counts as backed up once sent is called for it, so one whose
+    upload failed is cut again, with any newer records, under the same
+    number. Segments are cut on the backup worker's thread, so a lock
+    keeps that apart from records being written."""
+
+    def __init__(self, path: str):
+
+        self.path = path
+
+        # records written since the journal was started
+        self.length = 0
+
+        # the lines not sent in a segment yet, and how many of them
+        # the segment cut last holds, until it is sent.
+        self.checkpoint = None
+        self.pending = []
+        self.segment = 0
+        self.cut_length = None
+        self.lock = threading.Lock()
+
+    def start(self, checkpoint: str):
+
+        """Empties the journal and starts it after a new snapshot."""
+
+        with self.lock:
+            with open(self.path, "w") as file:
+                file.write(json.dumps({"checkpoint": checkpoint}) + "\n")
+            self.length = 0
+
+            self.checkpoint = checkpoint
+            self.pending = []
+            self.segment = 0
+            self.cut_length = None
+
+    def append(self, record: dict):
+
+        """Adds one record to the end of the journal."""
+
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            with open(self.path, "a") as file:
+                file.write(line)
+            self.length += 1
+            self.pending.append(line)
+
+    def segment_file(self, segment: int) -> str:
+        return f"{self.path}.{segment}"
+
+    def segment_checkpoint(self, segment: int) -> str:
+
+        """Returns the checkpoint a segment file was started for, or
+        None if it cannot be read."""
+
+        try:
+            with open(self.segment_file(segment), "r") as file:
+                return json.loads(file.readline()).get("checkpoint")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def cut(self) -> str:
+
+        """Writes the records not backed up yet to the next segment
+        file and returns its name, or None if there are none. The
+        records stay not backed up until sent is called."""
+
+        with self.lock:
+            if not self.pending:
+                return None
+
+            file_name = self.segment_file(self.segment)
+            with open(file_name, "w") as file:
+                file.write(json.dumps({"checkpoint": self.checkpoint}) + "\n")
+                file.writelines(self.pending)
+
+            self.cut_length = len(self.pending)
+            return file_name
+
+    def sent(self):
+
+        """Marks the segment cut last as backed up, so the next one is
+        cut from the records written after it. If the journal was
+        started again since, the new snapshot holds those records and
+        there is nothing to mark."""
+
+        with self.lock:
+            if self.cut_length is None:
+                return
+
+            self.pending = self.pending[self.cut_length:]
+            self.segment += 1
+            self.cut_length = None
+
+    def join(self, segments: int):
+
+        """Rebuilds the journal from its first segment files, such as
+        ones just downloaded. Segments left over from an older snapshot
+        are not part of this journal, so joining stops at the first
+        one started for a different checkpoint."""
+
+        checkpoint = None
+        lines = []
+        joined = 0
+
+        for segment in range(segments):
+            try:
+                with open(self.segment_file(segment), "r") as file:
+                    header, *records = file.read().splitlines(keepends=True)
+            except (FileNotFoundError, ValueError):
+                break
+
+            if segment == 0:
+                checkpoint = header
+            elif header != checkpoint:
+                break
+
+            lines.extend(records)
+            joined += 1
+
+        if checkpoint is not None:
+            with open(self.path, "w") as file:
+                file.write(checkpoint)
+                file.writelines(lines)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+        self.checkpoint = json.loads(checkpoint).get("checkpoint") if checkpoint else None
+        self.pending = []
+        self.segment = joined
+        self.cut_length = None
+
+    def read(self) -> tuple:
+
+        """Returns the checkpoint the journal follows and its records.
+        A missing journal has no checkpoint and no records. A record cut
+        off part way through being written, by a crash, is left out."""
+
+        try:
+            with open(self.path, "r") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return None, []
+
+        if not lines:
+            return None, []
+
+        records = []
+        for line in lines[1:]:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+
+        self.length = len(records)
+        try:
+            return json.loads(lines[0]).get("checkpoint"), records
+        except json.JSONDecodeError:
+            return None, []
+
+    def __len__(self):
+        return self.length
@@ -0,0 +1,126 @@
+from array import array
+
+
+# formats a draft can be played in. freeform is not a scryfall format,
+# every card is legal in it.
+FORMATS = ["standard", "future", "historic", "gladiator",
+           "pioneer", "modern", "legacy", "pauper",
+           "vintage", "penny", "commander", "brawl",
+           "duel", "oldschool", "premodern", "freeform"]
+
+# 2 bit legality codes, one per format, packed into a 32 bit mask.
+NOT_LEGAL = 0
+LEGAL = 1
+RESTRICTED = 2
+BANNED = 3
+
+CODES = {"not_legal": NOT_LEGAL, "legal": LEGAL, "restricted": RESTRICTED, "banned": BANNED}
+NAMES = {code: name for name, code in CODES.items()}
+
+# bit offset of each format inside a mask
+SHIFTS = {format: 2 * i for i, format in enumerate(FORMATS)}
+
+
+def encode(legalities: dict) -> int:
+
+    """Packs a scryfall legalities dict into a mask. Formats missing
+    from the dict are treated as not legal."""
+
+    mask = LEGAL << SHIFTS["freeform"]
+    for format, status in legalities.items():
+        if format in SHIFTS and format != "freeform":
+            mask |= CODES.get(status, NOT_LEGAL) << SHIFTS[format]
+    return mask
+
+
+def decode(mask: int) -> dict:
+
+    """Unpacks a mask back into a legalities dict."""
+
+    return {format: NAMES[code(mask, format)] for format in FORMATS if format != "freeform"}
+
+
+def code(mask: int, format: str) -> int:
+
+    """Returns the legality code of a format in a mask."""
+
+    return (mask >> SHIFTS[format.lower()]) & 0b11
+
+
+def is_legal(mask: int, format: str) -> bool:
+
+    """Returns True if a card can be played in the format.
+    Restricted cards can still be played, just not as many."""
+
+    return code(mask, format) in (LEGAL, RESTRICTED)
+
+
+class LegalityTable():
+
+    """This holds the legality of every card in one array of masks,
+    keyed by card id. Checking a card is a dict lookup and a shift,
+    and whole decklists or card pools can be filtered in one pass."""
+
+    def __init__(self):
+
+        self.rows = {}
+        self.masks = array('L')
+
+    def add(self, card_id: str, legalities):
+
+        """Adds a card from its legalities dict, or from its mask."""
+
+        mask = legalities if isinstance(legalities, int) else encode(legalities)
+
+        if card_id in self.rows:
+            self.masks[self.rows[card_id]] = mask
+        else:
+            self.rows[card_id] = len(self.masks)
+            self.masks.append(mask)
+
+    def mask(self, card_id: str) -> int:
+
+        """Returns the mask of a card, or None if it is unknown."""
+
+        row = self.rows.get(card_id)
+        return None if row is None else self.masks[row]
+
+    def is_legal(self, card_id: str, format: str) -> bool:
+
+        """Returns True if a known card can be played in the format."""
+
+        mask = self.mask(card_id)
+        return mask is not None and is_legal(mask, format)
+
+    def filter_legal(self, card_ids: list, format: str) -> list:
+
+        """Returns the cards from card_ids that can be played in the format."""
+
+        shift = SHIFTS[format.lower()]
+        playable = (LEGAL, RESTRICTED)
+        rows, masks = self.rows, self.masks
+        return [card_id for card_id in card_ids
+                if card_id in rows and ((masks[rows[card_id]] >> shift) & 0b11) in playable]
+
+    def __len__(self):
+        return len(self.masks)
+
+
+# shared table of every card checked so far.
+table = LegalityTable()
+
+
+def card_mask(card_json: dict) -> int:
+
+    """Returns the mask of a card's json and keeps the card's entry in
+    the shared table up to date with it. The mask is always encoded
+    from the json given, so a card banned since it was last checked
+    is not still treated as legal."""
+
+    mask = encode(card_json.get("legalities", {}))
+
+    card_id = card_json.get("id")
+    if card_id:
+        table.add(card_id, mask)
+
+    return mask
@@ -0,0 +1,247 @@
+from aiohttp import web
+from decouple import config
+import threading
+import asyncio
+import math
+
+
+# what prometheus expects a scrape to be served as
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# command latency buckets in seconds, from a cache hit to a slow sheet
+COMMAND_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metric():
+
+    """This is one metric, such as the number of scryfall calls, and its
+    value for every set of labels it has been given. A metric can also
+    be given a function instead, which is called for its value when the
+    metrics are scraped, for values the bot already keeps elsewhere.
+    Backends are called from the backup worker's thread as well as the
+    event loop, so the values are guarded by a lock."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), function=None):
+
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.function = function
+
+        # label values -> value
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def samples(self) -> list:
+
+        """Returns a (name, labels, value) for every line of the metric."""
+
+        if self.function is not None:
+            return [(self.name, (), self.function())]
+
+        with self.lock:
+            return [(self.name, tuple(zip(self.labels, label_values)), value)
+                    for label_values, value in sorted(self.values.items())]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+
+    """A count that only goes up, such as calls made to a backend."""
+
+    type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+
+    """A value that can go up and down, such as the event loop lag."""
+
+    type = "gauge"
+
+    def set(self, value: float, *label_values: str):
+        with self.lock:
+            self.values[label_values] = value
+
+
+class Histogram(Metric):
+
+    """Counts how many observations, such as how long a command took,
+    fell at or under each bucket, along with their count and sum."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = COMMAND_BUCKETS):
+
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, *label_values: str):
+        with self.lock:
+            counts = self.values.get(label_values)
+            if counts is None:
+                counts = self.values[label_values] = [0] * len(self.buckets) + [0.0]
+            for index, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> list:
+        with self.lock:
+            values = sorted((label_values, list(counts))
+                            for label_values, counts in self.values.items())
+
+        samples = []
+        for label_values, counts in values:
+            labels = tuple(zip(self.labels, label_values))
+            for bucket, count in zip(self.buckets, counts):
+                samples.append((f"{self.name}_bucket", labels + (("le", format_value(bucket)),),
+                                count))
+            samples.append((f"{self.name}_sum", labels, counts[-1]))
+            samples.append((f"{self.name}_count", labels, counts[len(self.buckets) - 1]))
+        return samples
+
+
+class Registry():
+
+    """This holds every metric the bot serves, by name. Adding a metric
+    under a name already taken replaces it, so a reloaded cog does not
+    serve its metrics twice."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = (), function=None) -> Counter:
+        return self.add(Counter(name, help, labels, function))
+
+    def gauge(self, name: str, help: str, labels: tuple = (), function=None) -> Gauge:
+        return self.add(Gauge(name, help, labels, function))
+
+    def histogram(self, name: str, help: str, labels: tuple = (),
+                  buckets: tuple = COMMAND_BUCKETS) -> Histogram:
+        return self.add(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+
+        """Returns every metric in the prometheus text format."""
+
+        return "".join(metric.render() for metric in list(self.metrics.values()))
+
+
+class Track():
+
+    """Counts one call to a backend, as a with block, and counts it as
+    an error too if it raises. A cancelled call, such as the slower of
+    two hedged scryfall requests, is not an error."""
+
+    __slots__ = ("backend",)
+
+    def __init__(self, backend: str):
+        self.backend = backend
+
+    def __enter__(self):
+        backend_calls.inc(self.backend)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and issubclass(exc_type, Exception):
+            backend_errors.inc(self.backend)
+        return False
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(str(value))}"' for name, value in labels) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# the metrics every part of the bot counts into
+registry = Registry()
+
+command_seconds = registry.histogram("draftbot_command_seconds",
+                                     "How long commands took to run, in seconds.", ("command",))
+backend_calls = registry.counter("draftbot_backend_calls_total",
+                                 "Calls made to scryfall, the google sheet and the S3 bucket.",
+                                 ("backend",))
+backend_errors = registry.counter("draftbot_backend_errors_total",
+                                  "Calls to scryfall, the google sheet and the S3 bucket "
+                                  "that failed.", ("backend",))
+event_loop_lag = registry.gauge("draftbot_event_loop_lag_seconds",
+                                "How late the event loop last woke up a sleeping task, "
+                                "in seconds.")
+
+
+def track(backend: str) -> Track:
+
+    """Counts a call to a backend, and whether it failed, as a with block."""
+
+    return Track(backend)
+
+
+###################################
+###           SERVER            ###
+###################################
+
+async def watch_event_loop(interval: float = 1.0):
+
+    """Sleeps for the interval over and over and keeps how much later
+    than asked the loop woke it up. A blocking call on the loop, such
+    as a slow sheet write, shows up as lag."""
+
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.set(max(0.0, loop.time() - start - interval))
+
+
+async def serve_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=registry.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def start_server(port: int = None, host: str = None) -> web.AppRunner:
+
+    """Serves the metrics on /metrics for prometheus to scrape, and
+    starts watching the event loop lag. Returns the runner, which
+    stops both when it is cleaned up."""
+
+    port = port if port is not None else int(config('METRICS_PORT'))
+    host = host or config('METRICS_HOST', default='127.0.0.1')
+
+    app = web.Application()
+    app.router.add_get("/metrics", serve_metrics)
+
+    async def stop_watching(app: web.Application):
+        watcher.cancel()
+
+    watcher = asyncio.ensure_future(watch_event_loop())
+    app.on_cleanup.append(stop_watching)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,93 @@
+from collections import deque
+
+
+class PrepickQueue():
+
+    """This is a player's queue of pre-picks. Taking the next card off
+    the front, adding one to the back and cancelling one are all
+    constant time. A cancelled card is only marked dead where it sits
+    (a tombstone) and skipped when the front reaches it. Once the dead
+    entries outnumber the live ones the queue is compacted.
+
+    Iterating, len and comparing to a list only see the live cards,
+    in the order they were pre-picked."""
+
+    # dead entries tolerated before compaction is considered.
+    COMPACT_MIN = 16
+
+    def __init__(self, cards: list = ()):
+
+        # each entry is a one item list, so a tombstone is that item
+        # set to None without moving anything in the deque.
+        self.entries = deque()
+        self.live = {}
+        self.dead = 0
+
+        for card in cards:
+            self.append(card)
+
+    def append(self, card: str):
+
+        """Adds a card to the back of the queue. A card can only be
+        queued once, so one already queued is moved to the back."""
+
+        if card in self.live:
+            self.remove(card)
+
+        entry = [card]
+        self.entries.append(entry)
+        self.live[card] = entry
+
+    def remove(self, card: str):
+
+        """Cancels a card. Raises a value error like a list
+        would if the card is not in the queue."""
+
+        entry = self.live.pop(card, None)
+        if entry is None:
+            raise ValueError(f"{card} is not pre-picked.")
+
+        entry[0] = None
+        self.dead += 1
+
+        if self.dead > self.COMPACT_MIN and self.dead > len(self.live):
+            self.compact()
+
+    def popleft(self) -> str:
+
+        """Removes and returns the card at the front of the queue.
+        Raises an index error if there are no live cards."""
+
+        while self.entries:
+            card = self.entries.popleft()[0]
+            if card is None:
+                self.dead -= 1
+            else:
+                del self.live[card]
+                return card
+
+        raise IndexError("pop from an empty pre-pick queue")
+
+    def compact(self):
+
+        """Drops every tombstone from the queue."""
+
+        self.entries = deque(entry for entry in self.entries if entry[0] is not None)
+        self.dead = 0
+
+    def __iter__(self):
+        return (entry[0] for entry in self.entries if entry[0] is not None)
+
+    def __len__(self):
+        return len(self.live)
+
+    def __contains__(self, card):
+        return card in self.live
+
+    def __eq__(self, other):
+        if isinstance(other, (PrepickQueue, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PrepickQueue({list(self)})"
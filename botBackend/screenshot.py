@@ -3,7 +3,7 @@ from selenium.webdriver.chrome.options import Options
 from decouple import config
 
 
-def take_screenshot():
+def take_screenshot(docs_link: str = None, file_name: str = "completed_draft.png"):
     """This takes a screenshot of the sheet after the draft is over.
     This will then be posted to the server for future reference."""
 
@@ -22,10 +22,10 @@ def take_screenshot():
 
     # let the driver wait a bit before requesting
     driver.implicitly_wait(5)
-    driver.get(config('DOCS_LINK'))
+    driver.get(docs_link or config('DOCS_LINK'))
 
     # wait for page to load then take the screenshot and quit
     driver.implicitly_wait(30)
-    driver.get_screenshot_as_file("completed_draft.png")
+    driver.get_screenshot_as_file(file_name)
     driver.close()
     driver.quit()
@@ -1,14 +1,171 @@
+import random
 import requests
+import time
+from decouple import config
+from botBackend import carddb, metrics
+from botBackend.cardcache import cache, cache_key
+
+
+# responses worth trying again, scryfall is overloaded or down
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 def get_scryfall_json(card: tuple) -> object:
 
     """Returns the json object of the card passed in.
-    Scryfall uses a fuzzy API so minor misspelings are allowed."""
+    Scryfall uses a fuzzy API so minor misspelings are allowed.
+    Answers are cached so repeat lookups never leave the process."""
+
+    key = cache_key(card)
+    card_json = cache.get(key)
+    if card_json is not None:
+        return card_json
+
+    card_json = get_local_json(card)
+    if card_json is None:
+        card_json = _request(card)
+
+    # scryfall did not answer in time, so don't cache the fallback
+    if card_json is None:
+        return fallback_json(card)
+
+    cache.put(key, card_json)
+    return card_json
+
+
+def get_scryfall_collection(cards: list) -> list:
+
+    """Returns the json object of each card passed in, in the same order,
+    using as few requests as possible. Names scryfall's collection
+    endpoint does not know exactly fall back to the fuzzy lookup."""
+
+    card_jsons, missing = get_known_jsons(cards)
+
+    for chunk in chunk_collection(missing):
+        identifiers = [{"name": " ".join(cards[i])} for i in chunk]
+        try:
+            with metrics.track("scryfall"):
+                response = requests.post("https://api.scryfall.com/cards/collection",
+                                         json={"identifiers": identifiers},
+                                         timeout=float(config('SCRYFALL_DEADLINE',
+                                                              default=5))).json()
+        except (requests.RequestException, ValueError):
+            # every card in the chunk falls back to the single lookup
+            response = {}
+        found = collection_names(response)
+
+        for i in chunk:
+            card_json = found.get(carddb.normalize_name(" ".join(cards[i])))
+            if card_json:
+                cache.put(cache_key(cards[i]), card_json)
+                card_jsons[i] = card_json
+            else:
+                card_jsons[i] = get_scryfall_json(cards[i])
+
+    return card_jsons
+
+
+def get_known_jsons(cards: list) -> tuple:
+
+    """Answers as many cards as possible from the cache and the local
+    card store. Returns the list of answers (None where unknown) and
+    the indexes of the cards scryfall still needs to be asked about."""
+
+    card_jsons = [None] * len(cards)
+    missing = []
+
+    for i, card in enumerate(cards):
+        card_json = cache.get(cache_key(card))
+        if card_json is None:
+            card_json = get_local_json(card)
+            if card_json is not None:
+                cache.put(cache_key(card), card_json)
+
+        if card_json is None:
+            missing.append(i)
+        else:
+            card_jsons[i] = card_json
+
+    return card_jsons, missing
+
+
+def chunk_collection(indexes: list) -> list:
+
+    """Splits indexes into chunks the size scryfall's collection
+    endpoint accepts in one request."""
+
+    return [indexes[i:i + 75] for i in range(0, len(indexes), 75)]
+
+
+def collection_names(response: dict) -> dict:
+
+    """Maps the normalized name, and face names, of every card in
+    a collection response to that card's json."""
+
+    found = {}
+    for card_json in response.get("data", []):
+        found[carddb.normalize_name(card_json["name"])] = card_json
+        for face in card_json.get("card_faces", []):
+            found.setdefault(carddb.normalize_name(face["name"]), card_json)
+    return found
+
+
+def get_local_json(card: tuple) -> object:
+
+    """Returns the json object of the card from the local card store,
+    or None if scryfall needs to be asked instead.
+
+    The SCRYFALL_MODE setting picks where the answer comes from:
+    'online' always asks scryfall, 'local' only uses the ingested
+    card store, and 'hybrid' asks scryfall only if the store misses.
+    Without an ingested store, hybrid asks scryfall and local finds
+    no cards."""
+
+    mode = config('SCRYFALL_MODE', default='online').lower()
+
+    if mode in ("local", "hybrid"):
+        if not carddb.available():
+            return carddb.not_found(" ".join(card)) if mode == "local" else None
+
+        card_json = carddb.get_card_json(" ".join(card))
+        if mode == "local" or card_json["object"] != "error":
+            return card_json
+
+    return None
 
-    card_url = "https://api.scryfall.com/cards/named?fuzzy=" + " ".join(card).title()
-    scryfall_json = requests.get(card_url)
-    return scryfall_json.json()
+
+def fallback_json(card: tuple) -> dict:
+
+    """Returns the best answer for a card when scryfall could not be
+    reached in time. That is a stale cached answer, then the local card
+    store if one was ingested, and otherwise a timeout error object."""
+
+    card_json = cache.get_stale(cache_key(card))
+
+    if card_json is None and carddb.available():
+        card_json = carddb.get_card_json(" ".join(card))
+        if card_json["object"] == "error":
+            card_json = None
+
+    return card_json or timed_out(card)
+
+
+def timed_out(card: tuple) -> dict:
+
+    """Builds an error object, shaped like scryfall's, for a
+    lookup that ran out of time."""
+
+    return {"object": "error", "code": "timeout", "status": 504,
+            "details": f"Scryfall did not respond in time for “{' '.join(card)}”"}
+
+
+def retry_delay(attempt: int) -> float:
+
+    """Returns how long to wait before retrying. The backoff doubles
+    each attempt, and is jittered so retries from many lookups do
+    not all land on scryfall at the same moment."""
+
+    return random.uniform(0, float(config('SCRYFALL_BACKOFF', default=0.25)) * 2 ** attempt)
 
 
 def get_card_image(card: tuple) -> tuple:
@@ -16,7 +173,21 @@ def get_card_image(card: tuple) -> tuple:
     """Returns the image of a card and the correct name.
     If the card does not exist, then it raises a value error."""
 
-    scryfall_json = get_scryfall_json(card)
+    return parse_card_image(get_scryfall_json(card))
+
+
+def get_card_legality(card: tuple) -> tuple:
+
+    """Returns the legality of a card and the correct name.
+    If the card does not exist, then it raises a value error."""
+
+    return parse_card_legality(get_scryfall_json(card))
+
+
+def parse_card_image(scryfall_json: dict) -> tuple:
+
+    """Pulls the image and the correct name out of a card's json.
+    If the card does not exist, then it raises a value error."""
 
     if scryfall_json["object"] == "error":
         raise ValueError("Card does not exist.")
@@ -26,16 +197,49 @@ def get_card_image(card: tuple) -> tuple:
         return (card_name, image_url)
 
 
-def get_card_legality(card: tuple) -> tuple:
+def parse_card_legality(scryfall_json: dict) -> tuple:
 
-    """Returns the legality of a card and the correct name.
+    """Pulls the legality and the correct name out of a card's json.
     If the card does not exist, then it raises a value error."""
 
-    scryfall_json = get_scryfall_json(card)
-
     if scryfall_json["object"] == "error":
         raise ValueError("Card does not exist.")
     else:
         card_name = scryfall_json["name"]
         legality_json = scryfall_json["legalities"]
         return (card_name, legality_json)
+
+
+def _request(card: tuple) -> dict:
+
+    """Sends the fuzzy lookup to scryfall, retrying failed attempts until
+    the deadline for the lookup runs out. Returns None if no answer
+    came back in time."""
+
+    card_url = "https://api.scryfall.com/cards/named?fuzzy=" + " ".join(card).title()
+    deadline = time.monotonic() + float(config('SCRYFALL_DEADLINE', default=5))
+    timeout = float(config('SCRYFALL_TIMEOUT', default=10))
+
+    for attempt in range(int(config('SCRYFALL_RETRIES', default=2)) + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        try:
+            with metrics.track("scryfall"):
+                response = requests.get(card_url, timeout=min(remaining, timeout))
+
+                # overloaded or down, so the lookup is worth retrying
+                if response.status_code in RETRY_STATUSES:
+                    response.raise_for_status()
+                return response.json()
+        except (requests.RequestException, ValueError):
+            pass
+
+        # give up now rather than sleep past the deadline
+        delay = retry_delay(attempt)
+        if time.monotonic() + delay >= deadline:
+            break
+        time.sleep(delay)
+
+    return None
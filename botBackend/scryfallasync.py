@@ -0,0 +1,277 @@
+import asyncio
+import aiohttp
+import time
+from decouple import config
+from botBackend import scryfallapi, carddb, metrics
+from botBackend.cardcache import cache, cache_key
+
+
+class TokenBucket():
+
+    """This is a token bucket rate limiter. Tokens refill at rate per
+    second up to capacity, and every request spends one. Waiters queue
+    on a lock, so a burst of lookups is spread out instead of all being
+    sent at once."""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+
+        """Waits until a token is available and spends it."""
+
+        async with self.lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# one pooled session, concurrency limit and rate limit for the whole process.
+_session = None
+_semaphore = None
+_bucket = None
+
+# lookups currently waiting on scryfall, keyed like the cache
+_in_flight = {}
+
+
+async def get_scryfall_json(card: tuple) -> object:
+
+    """Returns the json object of the card passed in without blocking
+    the event loop. Scryfall uses a fuzzy API so minor misspelings
+    are allowed. Answers are cached so repeat lookups never leave
+    the process, and concurrent lookups for the same card share one
+    request to scryfall."""
+
+    key = cache_key(card)
+    card_json = cache.get(key)
+    if card_json is not None:
+        return card_json
+
+    card_json = scryfallapi.get_local_json(card)
+    if card_json is not None:
+        cache.put(key, card_json)
+        return card_json
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(key, card))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    # shielded so one caller giving up does not cancel it for the others
+    return await asyncio.shield(task)
+
+
+async def get_scryfall_collection(cards: list) -> list:
+
+    """Returns the json object of each card passed in, in the same order,
+    using as few requests as possible. Names scryfall's collection
+    endpoint does not know exactly fall back to the fuzzy lookup."""
+
+    card_jsons, missing = scryfallapi.get_known_jsons(cards)
+
+    for chunk in scryfallapi.chunk_collection(missing):
+        identifiers = [{"name": " ".join(cards[i])} for i in chunk]
+        try:
+            response = await asyncio.wait_for(_request_collection(identifiers),
+                                              float(config('SCRYFALL_DEADLINE', default=5)))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            # every card in the chunk falls back to the single lookup
+            response = {}
+        found = scryfallapi.collection_names(response)
+
+        fuzzy = []
+        for i in chunk:
+            card_jsons[i] = found.get(carddb.normalize_name(" ".join(cards[i])))
+            if card_jsons[i] is None:
+                fuzzy.append(i)
+            else:
+                cache.put(cache_key(cards[i]), card_jsons[i])
+
+        # misspelled names still need scryfall's fuzzy matching
+        answers = await asyncio.gather(*(get_scryfall_json(cards[i]) for i in fuzzy))
+        for i, card_json in zip(fuzzy, answers):
+            card_jsons[i] = card_json
+
+    return card_jsons
+
+
+async def get_card_image(card: tuple) -> tuple:
+
+    """Returns the image of a card and the correct name.
+    If the card does not exist, then it raises a value error."""
+
+    return scryfallapi.parse_card_image(await get_scryfall_json(card))
+
+
+async def get_card_legality(card: tuple) -> tuple:
+
+    """Returns the legality of a card and the correct name.
+    If the card does not exist, then it raises a value error."""
+
+    return scryfallapi.parse_card_legality(await get_scryfall_json(card))
+
+
+async def close():
+
+    """Closes the pooled session. This should be called
+    when the bot shuts down."""
+
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _fetch(key: str, card: tuple) -> dict:
+
+    """Makes the one request for a card and caches the answer. If
+    scryfall does not answer in time, the fallback answer is returned
+    but not cached."""
+
+    card_json = await _request_with_deadline(card)
+    if card_json is None:
+        return scryfallapi.fallback_json(card)
+
+    cache.put(key, card_json)
+    return card_json
+
+
+async def _request_with_deadline(card: tuple) -> dict:
+
+    """Retries failed lookups with jittered backoff until the deadline
+    for the lookup runs out. Returns None if no answer came back in
+    time, so one slow lookup cannot hold up a pick indefinitely."""
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + float(config('SCRYFALL_DEADLINE', default=5))
+
+    for attempt in range(int(config('SCRYFALL_RETRIES', default=2)) + 1):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+
+        try:
+            return await asyncio.wait_for(_hedged_request(card), remaining)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass
+
+        # give up now rather than sleep past the deadline
+        delay = scryfallapi.retry_delay(attempt)
+        if loop.time() + delay >= deadline:
+            break
+        await asyncio.sleep(delay)
+
+    return None
+
+
+async def _hedged_request(card: tuple) -> dict:
+
+    """Sends the lookup, and if it is slower than the hedge delay sends
+    a second one. Whichever answers first wins and the other is cancelled.
+    Only the slowest few lookups pay for the extra request."""
+
+    tasks = [asyncio.ensure_future(_request(card))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=float(config('SCRYFALL_HEDGE_DELAY',
+                                                                 default=0.75)))
+        if not done:
+            tasks.append(asyncio.ensure_future(_request(card)))
+
+        # if one request fails, the other can still answer
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                return await next_done
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+                failure = error
+        raise failure
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _request(card: tuple) -> dict:
+
+    """Sends the fuzzy lookup to scryfall, staying under
+    both the concurrency limit and the rate limit."""
+
+    session = _get_session()
+    params = {"fuzzy": " ".join(card).title()}
+
+    async with _get_semaphore():
+        await _get_bucket().acquire()
+        with metrics.track("scryfall"):
+            async with session.get("https://api.scryfall.com/cards/named",
+                                   params=params) as response:
+
+                # overloaded or down, so the lookup is worth retrying
+                if response.status in scryfallapi.RETRY_STATUSES:
+                    response.raise_for_status()
+                return await response.json()
+
+
+async def _request_collection(identifiers: list) -> dict:
+
+    """Sends one batch of card names to scryfall's collection endpoint."""
+
+    session = _get_session()
+
+    async with _get_semaphore():
+        await _get_bucket().acquire()
+        with metrics.track("scryfall"):
+            async with session.post("https://api.scryfall.com/cards/collection",
+                                    json={"identifiers": identifiers}) as response:
+                return await response.json()
+
+
+def _get_session() -> aiohttp.ClientSession:
+
+    """Creates the long lived session on first use. Connections are
+    kept alive between requests so each lookup skips the TLS handshake."""
+
+    global _session
+    if _session is None or _session.closed:
+        timeout = aiohttp.ClientTimeout(total=float(config('SCRYFALL_TIMEOUT', default=10)))
+        connector = aiohttp.TCPConnector(limit=int(config('SCRYFALL_CONCURRENCY', default=4)),
+                                         keepalive_timeout=60)
+        _session = aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                         headers={"User-Agent": "DiscordDraftBot/1.0",
+                                                  "Accept": "application/json"})
+    return _session
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+
+    """Limits how many requests can be in flight to scryfall at once."""
+
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(int(config('SCRYFALL_CONCURRENCY', default=4)))
+    return _semaphore
+
+
+def _get_bucket() -> TokenBucket:
+
+    """Limits how many requests are sent to scryfall per second. Scryfall
+    asks for 50 - 100 milliseconds between requests, so by default
+    this allows 10 per second with no bursting."""
+
+    global _bucket
+    if _bucket is None:
+        _bucket = TokenBucket(float(config('SCRYFALL_RATE', default=10)),
+                              float(config('SCRYFALL_BURST', default=1)))
+    return _bucket
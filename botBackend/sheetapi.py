@@ -1,43 +1,62 @@
 import gspread
+from gspread.utils import rowcol_to_a1
 from decouple import config
+from botBackend import metrics
 from gspread_formatting import CellFormat, Color, format_cell_range, format_cell_ranges
 
 
-def setup_sheet(players: list, picks: int):
+def setup_sheet(players: list, picks: int, sheet_key: str = None):
 
     """Sets up default values for the sheet.
     This includes player names, pick count, and color."""
 
-    # grab the sheet object so we can use it
-    worksheet = _load_worksheet()
+    with metrics.track("sheets"):
+        # grab the sheet object so we can use it
+        worksheet = _load_worksheet(sheet_key)
 
-    # sheet setup pipeline
-    _add_picks_incrementer(worksheet, picks)
-    _add_players(worksheet, players)
-    _add_color(worksheet, players, picks)
+        # sheet setup pipeline
+        _add_picks_incrementer(worksheet, picks)
+        _add_players(worksheet, players)
+        _add_color(worksheet, players, picks)
 
 
-def pick(card_name: str, row: int, column: int):
+# worksheets already opened, by sheet key, so each
+# write does not have to log in and open the sheet again.
+_worksheets = {}
+
+
+def pick(card_name: str, row: int, column: int, sheet_key: str = None):
 
     """Adds pick to the sheet."""
 
-    worksheet = _load_worksheet()
-    worksheet.update_cell(row, column, card_name)
+    pick_many([(row, column, card_name)], sheet_key)
+
+
+def pick_many(picks: list, sheet_key: str = None):
+
+    """Adds several picks to the sheet in one request, so a pick
+    and the pre-picks it set off show up on the board together.
+    picks is a list of (row, column, card name)."""
+
+    if picks:
+        with metrics.track("sheets"):
+            _update_cells(_load_worksheet(sheet_key), picks)
 
 
-def reset_sheet():
+def reset_sheet(sheet_key: str = None):
 
     """This clears the data on the sheet so it can
     be ready for the next draft."""
 
-    worksheet = _load_worksheet()
+    with metrics.track("sheets"):
+        worksheet = _load_worksheet(sheet_key)
 
-    # remove all values
-    worksheet.clear()
+        # remove all values
+        worksheet.clear()
 
-    # remove color (set all to white)
-    fmt = CellFormat(backgroundColor=Color(1, 1, 1))
-    format_cell_ranges(worksheet, [('A:J', fmt)])
+        # remove color (set all to white)
+        fmt = CellFormat(backgroundColor=Color(1, 1, 1))
+        format_cell_ranges(worksheet, [('A:J', fmt)])
 
 
 def _add_picks_incrementer(worksheet: object, picks: int):
@@ -59,13 +78,15 @@ def _add_picks_incrementer(worksheet: object, picks: int):
     column = 1
 
     # save word "Picks" to (1,1) square
-    worksheet.update_cell(row_player, column, "Picks")
+    cells = [(row_player, column, "Picks")]
 
     # number the first column starting at row 2
     # from numbers 1 to n where n is the pick count
 
     for i in range(picks):
-        worksheet.update_cell(i + row_incrementer, column, i + 1)  # row column info
+        cells.append((i + row_incrementer, column, i + 1))  # row column info
+
+    _update_cells(worksheet, cells)
 
 
 def _add_players(worksheet: object, players: list):
@@ -77,8 +98,8 @@ def _add_players(worksheet: object, players: list):
     # shift over by 2 since index = 0 and we want to start at column 2
     columnShift = 2
 
-    for i, player in enumerate(players):
-        worksheet.update_cell(row, i + columnShift, str(player))  # row / column
+    _update_cells(worksheet, [(row, i + columnShift, str(player))  # row / column
+                              for i, player in enumerate(players)])
 
 
 def _add_color(worksheet: object, players: list, picks: int):
@@ -132,18 +153,36 @@ def _add_color(worksheet: object, players: list, picks: int):
         format_cell_range(worksheet, cardColumns[i], cellColor)
 
 
-def _load_worksheet():
+def _update_cells(worksheet: object, cells: list):
+
+    """Writes a list of (row, column, value) cells to the sheet
+    in one batch update request. Values are entered as if typed
+    in, the same as a single cell update."""
+
+    worksheet.batch_update([{"range": rowcol_to_a1(row, column), "values": [[value]]}
+                            for row, column, value in cells], raw=False)
+
+
+def _load_worksheet(sheet_key: str = None):
 
     """Gets the worksheet in our google doc
-    so we can start performing operations on it."""
+    so we can start performing operations on it.
+    Drafts without a sheet of their own use the
+    one from the env settings. The worksheet is
+    kept after the first time it is opened."""
+
+    sheet_key = sheet_key or config('GOOGLE_SHEET_URL_KEY')
+    worksheet = _worksheets.get(sheet_key)
 
-    # load in the credentials file / json
-    serviceAccount = gspread.service_account(filename='google-credentials.json')
+    if worksheet is None:
+        # load in the credentials file / json
+        serviceAccount = gspread.service_account(filename='google-credentials.json')
 
-    # grab the sheet I'm sharing by opening with the key in the url
-    sheet = serviceAccount.open_by_key(config('GOOGLE_SHEET_URL_KEY'))
+        # grab the sheet I'm sharing by opening with the key in the url
+        sheet = serviceAccount.open_by_key(sheet_key)
 
-    # grab the first sheet
-    worksheet = sheet.sheet1
+        # grab the first sheet
+        worksheet = sheet.sheet1
+        _worksheets[sheet_key] = worksheet
 
     return worksheet
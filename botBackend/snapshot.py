@@ -0,0 +1,254 @@
+from functools import cached_property
+from array import array
+import struct
+import sys
+import json
+
+
+# every snapshot file starts with these bytes and the format version.
+# a file without them is a snapshot from before, in the json layout.
+MAGIC = b"DDBS"
+VERSION = 2
+
+# the sections a snapshot is framed into. each is a tag byte and a
+# length, followed by that many bytes, so a section can be skipped
+# over without reading it.
+HEADER = 1
+PLAYERS = 2
+CARDS = 3
+PICKS = 4
+PREPICKS = 5
+
+# a string length that stands for None
+NONE_LENGTH = 0xFFFF
+
+# user ids are discord's integer ids, but drafts from before were
+# given string ones, so the type of each id is stored with it. version
+# 1 snapshots stored every id as a string.
+ID_STR = 0
+ID_INT = 1
+
+
+class Snapshot():
+
+    """This reads a binary draft snapshot. Players are stored once, in
+    seat order, and every card name is stored once and referred to by
+    its number (an interned id) in the picks and pre-picks. Only the
+    frame is read up front, each section is decoded the first time
+    it is asked for, so peeking at the header of a big draft does not
+    decode all of its picks."""
+
+    def __init__(self, buffer: bytes):
+
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a draft snapshot.")
+
+        self.version = buffer[len(MAGIC)]
+        if self.version > VERSION:
+            raise ValueError(f"Snapshot version {self.version} is newer than this bot.")
+
+        # tag -> (start, end) of the section in the buffer
+        self.buffer = memoryview(buffer)
+        self.sections = {}
+        offset = len(MAGIC) + 1
+        while offset < len(buffer):
+            tag, length = struct.unpack_from("<BI", buffer, offset)
+            offset += 5
+            self.sections[tag] = (offset, offset + length)
+            offset += length
+
+    def section(self, tag: int) -> memoryview:
+        start, end = self.sections[tag]
+        return self.buffer[start:end]
+
+    @cached_property
+    def header(self) -> dict:
+        buffer = self.section(HEADER)
+        player_count, pick_count, pick_number, draft_fired, setup = struct.unpack_from(
+            "<HHI??", buffer)
+        offset = struct.calcsize("<HHI??")
+        checkpoint, offset = unpack_str(buffer, offset)
+        format, offset = unpack_str(buffer, offset)
+        return {"checkpoint": checkpoint, "player_count": player_count,
+                "pick_count": pick_count, "pick_number": pick_number,
+                "draft_fired": draft_fired, "setup": setup, "format": format}
+
+    @cached_property
+    def players(self) -> list:
+
+        """The (username, user_id) of every player, in seat order."""
+
+        buffer = self.section(PLAYERS)
+        count, = struct.unpack_from("<H", buffer)
+        offset = 2
+        unpack_user_id = unpack_id if self.version >= 2 else unpack_str
+        players = []
+        for _ in range(count):
+            username, offset = unpack_str(buffer, offset)
+            user_id, offset = unpack_user_id(buffer, offset)
+            players.append((username, user_id))
+        return players
+
+    @cached_property
+    def cards(self) -> list:
+
+        """Every card name in the snapshot, indexed by its id. They are
+        stored as one block of names split by newlines, which card names
+        never have, so the block is split in one go."""
+
+        buffer = self.section(CARDS)
+        count, = struct.unpack_from("<I", buffer)
+        return str(buffer[4:], "utf-8").split("\n") if count else []
+
+    @cached_property
+    def picks(self) -> list:
+
+        """The card names picked from every seat."""
+
+        return self.card_lists(PICKS)
+
+    @cached_property
+    def prepicks(self) -> list:
+
+        """The card names pre-picked by every seat, in queue order."""
+
+        return self.card_lists(PREPICKS)
+
+    def card_lists(self, tag: int) -> list:
+        buffer = self.section(tag)
+        cards = self.cards
+        lists = []
+        offset = 0
+        for _ in range(len(self.players)):
+            count, = struct.unpack_from("<H", buffer, offset)
+            offset += 2
+            ids = array("I")
+            ids.frombytes(buffer[offset:offset + 4 * count])
+            if sys.byteorder == "big":
+                ids.byteswap()
+            lists.append([cards[card_id] for card_id in ids])
+            offset += 4 * count
+        return lists
+
+    def to_dict(self) -> dict:
+
+        """Returns the snapshot in the json layout DraftLogic restores."""
+
+        data = dict(self.header)
+        data["players"] = [{"username": username, "user_id": user_id}
+                           for username, user_id in self.players]
+        data["picks"] = [{"username": username, "user_id": user_id, "picks": picks}
+                         for (username, user_id), picks in zip(self.players, self.picks)]
+        data["prepicks"] = [{"username": username, "user_id": user_id, "prepicks": prepicks}
+                            for (username, user_id), prepicks in zip(self.players, self.prepicks)]
+        return data
+
+
+def encode(data: dict) -> bytes:
+
+    """Turns a snapshot in the json layout into the binary format.
+    Every player with picks or pre-picks must be in the players."""
+
+    seats = {(player["username"], player["user_id"]): seat
+             for seat, player in enumerate(data["players"])}
+
+    header = struct.pack("<HHI??", data["player_count"], data["pick_count"],
+                         data["pick_number"], data["draft_fired"], data["setup"])
+    header += pack_str(data["checkpoint"]) + pack_str(data["format"])
+
+    players = struct.pack("<H", len(seats))
+    for username, user_id in seats:
+        players += pack_str(username) + pack_id(user_id)
+
+    # the cards in order of first appearance, and their ids
+    card_ids = {}
+
+    def card_lists(entries: list, key: str) -> bytes:
+        lists = [[] for _ in seats]
+        for entry in entries:
+            lists[seats[(entry["username"], entry["user_id"])]] = entry[key]
+        section = b""
+        for cards in lists:
+            ids = [card_ids.setdefault(card, len(card_ids)) for card in cards]
+            section += struct.pack(f"<H{len(ids)}I", len(ids), *ids)
+        return section
+
+    picks = card_lists(data["picks"], "picks")
+    prepicks = card_lists(data["prepicks"], "prepicks")
+
+    cards = struct.pack("<I", len(card_ids)) + "\n".join(card_ids).encode()
+
+    buffer = MAGIC + bytes([VERSION])
+    for tag, section in [(HEADER, header), (PLAYERS, players), (CARDS, cards),
+                         (PICKS, picks), (PREPICKS, prepicks)]:
+        buffer += struct.pack("<BI", tag, len(section)) + section
+    return buffer
+
+
+def write(file_name: str, data: dict):
+
+    """Writes a snapshot file in the binary format."""
+
+    with open(file_name, "wb") as file:
+        file.write(encode(data))
+
+
+def load(file_name: str):
+
+    """Reads a snapshot file as a Snapshot, whose sections are decoded
+    as they are used. Snapshot files from before the binary format are
+    json, and are returned as a dict in the json layout."""
+
+    with open(file_name, "rb") as file:
+        buffer = file.read()
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        return json.loads(buffer)
+    return Snapshot(buffer)
+
+
+def checkpoint(data) -> str:
+
+    """Returns the checkpoint of a loaded snapshot, reading no more
+    of a binary one than its header."""
+
+    if isinstance(data, Snapshot):
+        return data.header["checkpoint"]
+    return data.get("checkpoint")
+
+
+def read(file_name: str) -> dict:
+
+    """Reads a snapshot file in the json layout."""
+
+    data = load(file_name)
+    return data.to_dict() if isinstance(data, Snapshot) else data
+
+
+def pack_str(text: str) -> bytes:
+    if text is None:
+        return struct.pack("<H", NONE_LENGTH)
+    encoded = text.encode()
+    return struct.pack("<H", len(encoded)) + encoded
+
+
+def unpack_str(buffer, offset: int) -> tuple:
+    length, = struct.unpack_from("<H", buffer, offset)
+    offset += 2
+    if length == NONE_LENGTH:
+        return None, offset
+    return str(buffer[offset:offset + length], "utf-8"), offset + length
+
+
+def pack_id(user_id) -> bytes:
+    if isinstance(user_id, int):
+        return struct.pack("<BQ", ID_INT, user_id)
+    return struct.pack("<B", ID_STR) + pack_str(user_id)
+
+
+def unpack_id(buffer, offset: int) -> tuple:
+    kind = buffer[offset]
+    if kind == ID_INT:
+        user_id, = struct.unpack_from("<Q", buffer, offset + 1)
+        return user_id, offset + 9
+    return unpack_str(buffer, offset + 1)
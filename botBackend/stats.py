@@ -0,0 +1,120 @@
+from collections import deque
+from decouple import config
+import threading
+import time
+
+
+class Timer():
+
+    """Times one run of a stage, as a with block. This is a plain
+    class rather than a contextmanager so timing a stage costs
+    no more than two clock reads and an append."""
+
+    __slots__ = ("stats", "stage", "start")
+
+    def __init__(self, stats, stage: str):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class StageStats():
+
+    """This keeps how long the stages of the draft pipeline took, such
+    as the scryfall lookup, the sheet write or the backup of a pick.
+    Each stage keeps its last window runs (a rolling window), so the
+    percentiles follow how the bot is doing now rather than since it
+    started. Backups are timed on the backup worker's thread, so the
+    windows are guarded by a lock."""
+
+    def __init__(self, window: int = None):
+
+        self.window = window or int(config('STATS_WINDOW', default=1000))
+
+        # stage -> durations in seconds, oldest first
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def timer(self, stage: str) -> Timer:
+        return Timer(self, stage)
+
+    def record(self, stage: str, seconds: float):
+
+        """Adds one run of a stage."""
+
+        with self.lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def summary(self) -> dict:
+
+        """Returns the count and the p50, p95 and p99 in milliseconds
+        of every stage, in alphabetical order of the stages."""
+
+        with self.lock:
+            samples = {stage: sorted(durations) for stage, durations in self.samples.items()}
+
+        return {stage: {"count": len(durations),
+                        "p50": percentile(durations, 50) * 1000,
+                        "p95": percentile(durations, 95) * 1000,
+                        "p99": percentile(durations, 99) * 1000}
+                for stage, durations in sorted(samples.items())}
+
+    def export(self) -> dict:
+
+        """Returns every duration kept, in seconds, for looking
+        at somewhere else."""
+
+        with self.lock:
+            return {"window": self.window,
+                    "exported": time.time(),
+                    "stages": {stage: list(durations) for stage, durations in self.samples.items()}}
+
+    def clear(self):
+        with self.lock:
+            self.samples = {}
+
+
+def percentile(ordered: list, percent: float) -> float:
+
+    """Returns the nearest rank percentile of a sorted list."""
+
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def format_summary(summary: dict) -> str:
+
+    """Lays the summary out as a table for discord."""
+
+    if not summary:
+        return "No stages have been timed yet."
+
+    width = max(len(stage) for stage in summary)
+    lines = [f"{'stage':<{width}} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+    for stage, stage_stats in summary.items():
+        lines.append(f"{stage:<{width}} {stage_stats['count']:>6} {stage_stats['p50']:>8.1f} "
+                     f"{stage_stats['p95']:>8.1f} {stage_stats['p99']:>8.1f}")
+    return "```" + "\n".join(lines) + "```"
+
+
+# the stats every part of the bot times its stages into
+stats = StageStats()
+
+
+def timer(stage: str) -> Timer:
+
+    """Times a stage into the bot's stats, as a with block."""
+
+    return stats.timer(stage)
@@ -1,5 +1,7 @@
 import discord
+import time
 from discord.ext import commands
+from botBackend import metrics
 
 
 class BotEvents(commands.Cog):
@@ -8,19 +10,38 @@ class BotEvents(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.synced = False
 
     @commands.Cog.listener()
     async def on_ready(self):
 
         """Message the bot sends on startup"""
 
+        # register the slash commands once, on_ready runs on every reconnect
+        if not self.synced:
+            await self.bot.tree.sync()
+            self.synced = True
+
         print("I am ready to draft! Notify me when you are ready!")
 
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+
+        """Notes when a command started, to time it."""
+
+        ctx.started = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        observe_command(ctx)
+
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
 
         """Handles various errors for user input."""
 
+        observe_command(ctx)
+
         if isinstance(error, commands.CommandNotFound):
             embed = discord.Embed(description="This command does not exist.",
                                   colour=discord.Color.blue())
@@ -31,10 +52,25 @@ class BotEvents(commands.Cog):
                                   colour=discord.Color.blue())
             await ctx.send(embed=embed)
 
+        elif isinstance(error, (commands.MissingPermissions, commands.NoPrivateMessage)):
+            embed = discord.Embed(description="Only server admins can use this command.",
+                                  colour=discord.Color.blue())
+            await ctx.send(embed=embed)
+
         else:
             # print(error)  # used for debugbing / testing
             return  # silent failure for anything else.
 
 
+def observe_command(ctx):
+
+    """Adds how long a command took to its latency histogram. Commands
+    that never started, such as ones that do not exist, are left out."""
+
+    started = getattr(ctx, "started", None)
+    if started is not None and ctx.command is not None:
+        metrics.command_seconds.observe(time.perf_counter() - started, ctx.command.qualified_name)
+
+
 async def setup(bot):
     await bot.add_cog(BotEvents(bot))
@@ -1,17 +1,33 @@
 import discord
+import io
+import re
+from discord import app_commands
 from discord.ext import commands
 from botBackend.draft_logic import DraftLogic
+from botBackend.draft_registry import DraftRegistry
+from botBackend import scryfallasync, autocomplete, metrics
+from botBackend.stats import timer
 from botBackend.screenshot import take_screenshot
 
 
 class DraftLogicCommands(commands.Cog):
 
     """This class holds all the commands related to the draft setup logic
-    and draft pick logic commands."""
+    and draft pick logic commands. Every channel can run its own draft,
+    and commands are sent to the draft of the channel they came from."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.logic = DraftLogic()
+        self.drafts = DraftRegistry()
+
+        metrics.registry.gauge("draftbot_active_drafts", "Drafts set up or running.",
+                               function=lambda: len(self.drafts))
+        metrics.registry.gauge("draftbot_queued_prepicks", "Pre-picks waiting in every draft.",
+                               function=self.drafts.queued_prepicks)
+
+        # stand in for channels without a draft. it is never set up,
+        # so every command sent to it is turned down.
+        self.no_draft = DraftLogic()
 
     @commands.command(aliases=['Cancel', 'cancel'])
     async def cancel_draft(self, ctx):
@@ -21,7 +37,9 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot cancel a draft over DM's."
         else:
-            description = self.logic.cancel_draft()
+            _, logic = self.draft_for(ctx)
+            description = logic.cancel_draft()
+            self.drafts.release(ctx.guild.id, ctx.channel.id)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -35,7 +53,17 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot setup a draft over DM's."
         else:
-            description = self.logic.setup_draft(players, picks, format)
+            logic = self.drafts.get(ctx.guild.id, ctx.channel.id)
+            if logic is None:
+                description = ("The bot is running as many drafts as it can. " +
+                               "Please wait for one to finish.")
+            elif self.drafts.sheet_in_use(logic):
+                description = ("Another draft is using this channel's sheet. " +
+                               "Please wait for it to finish, or give this channel " +
+                               "its own sheet.")
+            else:
+                description = logic.setup_draft(players, picks, format)
+            self.drafts.release(ctx.guild.id, ctx.channel.id)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -48,7 +76,8 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot edit a draft over DM's."
         else:
-            description = self.logic.edit_player(player_count)
+            _, logic = self.draft_for(ctx)
+            description = logic.edit_player(player_count)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -61,7 +90,8 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot edit a draft over DM's."
         else:
-            description = self.logic.edit_pick(pick_count)
+            _, logic = self.draft_for(ctx)
+            description = logic.edit_pick(pick_count)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -74,7 +104,8 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot edit a draft over DM's."
         else:
-            description = self.logic.edit_format(format)
+            _, logic = self.draft_for(ctx)
+            description = logic.edit_format(format)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -83,7 +114,8 @@ class DraftLogicCommands(commands.Cog):
     async def info(self, ctx):
 
         """Displays info on the current draft."""
-        embed = discord.Embed(description=self.logic.info_draft(), colour=discord.Color.blue())
+        _, logic = self.draft_for(ctx)
+        embed = discord.Embed(description=logic.info_draft(), colour=discord.Color.blue())
         await ctx.send(embed=embed)
 
     @commands.command(aliases=['Join'])
@@ -94,7 +126,8 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot join a draft over DM's."
         else:
-            description = self.logic.join_draft(ctx.message.author.name, ctx.author.id)
+            _, logic = self.draft_for(ctx)
+            description = logic.join_draft(ctx.message.author.name, ctx.author.id)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -107,7 +140,8 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot leave a draft over DM's."
         else:
-            description = self.logic.leave_draft(ctx.message.author.name, ctx.author.id)
+            _, logic = self.draft_for(ctx)
+            description = logic.leave_draft(ctx.message.author.name, ctx.author.id)
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
@@ -121,56 +155,99 @@ class DraftLogicCommands(commands.Cog):
             description = "Cannot fire a draft over DM's."
         else:
             await ctx.send("Attempting to fire the draft. Please wait a moment.")
-            description = self.logic.fire_draft()
+            _, logic = self.draft_for(ctx)
+            description = logic.fire_draft()
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
 
-    @commands.command(aliases=['Pick', 'P', 'p'])
-    async def pick(self, ctx, *card: str):
+    @commands.hybrid_command(aliases=['Pick', 'P', 'p'],
+                             description="Pick a card in the draft.")
+    async def pick(self, ctx, *, card: str):
 
         """Allows a user to pick a card from the draft.
         The draft needs to have fired for this to work."""
 
+        # slash commands have to be answered within 3 seconds
+        await ctx.defer()
+        card = tuple(card.split())
+        key, logic = self.draft_for(ctx)
+
         # don't love this but it's w/e (way to check if successful pick)
-        before = self.logic.picks_remaining
+        before = logic.picks_remaining
+
+        # look the card up without blocking other commands
+        with timer("pick.scryfall"):
+            card_json = await scryfallasync.get_scryfall_json(card)
 
         # try to make the pick
-        embed = discord.Embed(description=self.logic.pick(
-                              ctx.message.author.name, ctx.author.id, card),
+        embed = discord.Embed(description=logic.pick(
+                              ctx.message.author.name, ctx.author.id, card, card_json),
                               colour=discord.Color.blue())
 
         # send it to that channel (dm or public)
         await ctx.send(embed=embed)
 
-        # if it was in dm's and a sucessful pick, make sure it also goes public
+        # if it was in dm's and a sucessful pick, make sure it also goes
+        # public in the channel the draft is being run in
         if (isinstance(ctx.channel, discord.channel.DMChannel)
-                and self.logic.picks_remaining < before):
-            await ctx.send(embed=embed)
+                and logic.picks_remaining < before):
+            channel = self.bot.get_channel(key[1])
+            if channel is not None:
+                await channel.send(embed=embed)
 
         # if we have reached the end of the draft.
-        if self.logic.picks_remaining == 0 and self.logic.draft_fired:
+        if logic.picks_remaining == 0 and logic.draft_fired:
 
             # send deck files
-            await self.generate_text_files(ctx)
+            await self.generate_text_files(ctx, logic)
 
             # take a screenshot
-            take_screenshot()
-            with open('completed_draft.png', 'rb') as f:
-                picture = discord.File(f)
+            file_name = f"completed_{logic.draft_id}.png"
+            take_screenshot(logic.docs_link, file_name)
+            with open(file_name, 'rb') as f:
+                picture = discord.File(f, "completed_draft.png")
                 await ctx.send(file=picture)
 
             # reset logic for next draft
-            self.logic.reset()
+            logic.reset()
+            self.drafts.release(*key)
             await ctx.send("Thank you all for playing! Come back soon.")
 
-    @commands.command(aliases=['Pre_pick', 'Prepick', 'prepick', 'Pp', 'pp'])
-    async def pre_pick(self, ctx, *card: str):
+    @commands.hybrid_command(aliases=['Pre_pick', 'Prepick', 'prepick', 'Pp', 'pp'],
+                             description="Pre-pick a card in the draft. Only works over DM's.")
+    async def pre_pick(self, ctx, *, card: str):
 
         """Allows users to make pre-picks in the draft."""
 
         if isinstance(ctx.channel, discord.channel.DMChannel):
-            description = self.logic.pre_pick(ctx.message.author.name, ctx.author.id, card)
+            await ctx.defer()
+            card = tuple(card.split())
+            _, logic = self.draft_for(ctx)
+            card_json = await scryfallasync.get_scryfall_json(card)
+            description = logic.pre_pick(ctx.message.author.name, ctx.author.id,
+                                         card, card_json)
+        else:
+            description = "Please send pre-picks over DM's."
+
+        embed = discord.Embed(description=description, colour=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+    @commands.command(aliases=['Bulk_pre_pick',
+                               'Bulkprepick', 'bulkprepick',
+                               'Bulk_prepick', 'bulk_prepick',
+                               'Bpp', 'bpp'])
+    async def bulk_pre_pick(self, ctx, *, cards: str):
+
+        """Allows users to make many pre-picks in one message. Cards
+        are separated by new lines or semicolons."""
+
+        if isinstance(ctx.channel, discord.channel.DMChannel):
+            cards = [tuple(card.split()) for card in re.split(r"[;\n]", cards) if card.strip()]
+            _, logic = self.draft_for(ctx)
+            card_jsons = await scryfallasync.get_scryfall_collection(cards)
+            description = logic.pre_pick_many(ctx.message.author.name, ctx.author.id,
+                                              cards, card_jsons)
         else:
             description = "Please send pre-picks over DM's."
 
@@ -186,7 +263,10 @@ class DraftLogicCommands(commands.Cog):
         """Allows users to cancel pre-picks in the draft."""
 
         if isinstance(ctx.channel, discord.channel.DMChannel):
-            description = self.logic.cancel_pre_pick(ctx.message.author.name, ctx.author.id, card)
+            _, logic = self.draft_for(ctx)
+            card_json = await scryfallasync.get_scryfall_json(card)
+            description = logic.cancel_pre_pick(ctx.message.author.name, ctx.author.id,
+                                                card, card_json)
         else:
             description = "Please cancel pre-picks over DM's."
 
@@ -202,7 +282,8 @@ class DraftLogicCommands(commands.Cog):
         """Allows a user to see their prepicks in the draft."""
 
         if isinstance(ctx.channel, discord.channel.DMChannel):
-            description = self.logic.get_pre_picks(ctx.message.author.name, ctx.author.id)
+            _, logic = self.draft_for(ctx)
+            description = logic.get_pre_picks(ctx.message.author.name, ctx.author.id)
         else:
             description = "Please cancel pre-picks over DM's."
 
@@ -217,37 +298,97 @@ class DraftLogicCommands(commands.Cog):
         if isinstance(ctx.channel, discord.channel.DMChannel):
             description = "Cannot reload draft over DM's."
         else:
-            self.logic.reload()
-            description = "The draft has been reloaded to the previous save state."
+            logic = self.drafts.get(ctx.guild.id, ctx.channel.id)
+            try:
+                if logic is None:
+                    description = ("The bot is running as many drafts as it can. " +
+                                   "Please wait for one to finish.")
+                else:
+                    logic.reload()
+                    description = "The draft has been reloaded to the previous save state."
+            finally:
+                # a reload that fails must not leave the draft taking up a slot
+                self.drafts.release(ctx.guild.id, ctx.channel.id)
+
+        embed = discord.Embed(description=description, colour=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+    @commands.command(aliases=['Draft', 'Select_draft', 'select_draft'])
+    async def draft(self, ctx, number: str = None):
+
+        """Lists the drafts a user is in, or chooses which of
+        them the user's DM commands are sent to."""
+
+        keys = self.drafts.drafts_for(ctx.author.id)
+
+        if not keys:
+            description = "You have not joined any drafts."
+
+        elif number is None:
+            selected = self.drafts.route(None, None, ctx.author.id)
+            description = "You are in these drafts:\n"
+            for i, key in enumerate(keys, start=1):
+                marker = " (your DM's go here)" if key == selected else ""
+                description += f"{i}. <#{key[1]}>{marker}\n"
+            description += "Use !draft {number} to choose where your DM's go."
+
+        elif not number.isdigit() or not 1 <= int(number) <= len(keys):
+            description = "Invalid parameters. Please use the '!help draft' command for details."
+
+        else:
+            self.drafts.select(ctx.author.id, keys[int(number) - 1])
+            description = f"Your DM's will now go to the draft in <#{keys[int(number) - 1][1]}>."
 
         embed = discord.Embed(description=description, colour=discord.Color.blue())
         await ctx.send(embed=embed)
 
+    @pick.autocomplete("card")
+    @pre_pick.autocomplete("card")
+    async def card_autocomplete(self, interaction, current: str) -> list:
+
+        """Suggests card names as the user types them in. Only cards legal
+        in the draft's format and not already picked are suggested. This
+        is served from memory since discord only waits 3 seconds."""
+
+        key = self.drafts.route(interaction.guild_id, interaction.channel_id,
+                                interaction.user.id)
+        logic = self.drafts.find(*key) if key else self.no_draft
+
+        names = autocomplete.suggest(current, logic.format, logic.taken)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
     ############################
     ###   HELPER FUNCTIONS   ###
     ############################
 
-    async def generate_text_files(self, channel):
+    def draft_for(self, ctx) -> tuple:
+
+        """Returns the key and draft a command is for. If there is no
+        draft to send it to, the key is None and the stand in draft
+        is returned so the command is turned down."""
+
+        guild_id = ctx.guild.id if ctx.guild else None
+        key = self.drafts.route(guild_id, ctx.channel.id, ctx.author.id)
+        if key is None:
+            return None, self.no_draft
+        return key, self.drafts.find(*key)
+
+    async def generate_text_files(self, channel, logic: DraftLogic):
 
         """This generates the text file for the users. I am not a fan
         of having this logic outside of the  pick logic, but it is what
-        it is."""
+        it is. Decks are built in memory so drafts finishing at the
+        same time do not write over each other's files."""
 
-        for player in self.logic.picks:
+        for player, picks in zip(logic.players, logic.seat_picks):
 
             # populate the text file with their deck
-            with open("deck.txt", "w") as file:
-                for card in self.logic.picks[player]:
-                    file.write(f"1 {card}\n")
+            deck = "".join(f"1 {card}\n" for card in picks)
 
             # send them their text file
-            with open("deck.txt", "rb") as file:
-                await channel.send(f"{player.username}'s deck",
-                                   file=discord.File(file, "rotisserie_deck.txt"))
-
-            # clear the text file so we can refill it with the next deck.
-            with open('deck.txt', 'w'):
-                pass
+            await channel.send(f"{player.username}'s deck",
+                               file=discord.File(io.BytesIO(deck.encode()),
+                                                 "rotisserie_deck.txt"))
 
 
 async def setup(bot):
@@ -1,8 +1,9 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 import sys
 sys.path.append('..')
-from botBackend import scryfallapi
+from botBackend import scryfallasync, autocomplete
 
 
 class ScryfallCommands(commands.Cog):
@@ -12,13 +13,15 @@ class ScryfallCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(aliases=['Card'])
-    async def card(self, ctx, *card: str):
+    @commands.hybrid_command(aliases=['Card'], description="Shows the image of a card.")
+    async def card(self, ctx, *, card: str):
 
         """ returns a card image using scryfall API or notifies card does not exist"""
+        await ctx.defer()
+        card = tuple(card.split())
         try:
             # get the card_url and card_name from the API call
-            card_name, image_url = scryfallapi.get_card_image(card)
+            card_name, image_url = await scryfallasync.get_card_image(card)
             embed = discord.Embed(title=card_name, colour=discord.Color.blue())
             embed.set_image(url=image_url)
             await ctx.send(embed=embed)
@@ -28,13 +31,15 @@ class ScryfallCommands(commands.Cog):
                                   colour=discord.Color.blue())
             await ctx.send(embed=embed)
 
-    @commands.command(aliases=['Legal'])
-    async def legal(self, ctx, *card: str):
+    @commands.hybrid_command(aliases=['Legal'], description="States the legality of a card.")
+    async def legal(self, ctx, *, card: str):
 
         """States the legality of a card."""
+        await ctx.defer()
+        card = tuple(card.split())
         try:
             # get the url and card name from the API call
-            card_name, legality_json = scryfallapi.get_card_legality(card)
+            card_name, legality_json = await scryfallasync.get_card_legality(card)
             embed = discord.Embed(title=f"{card_name} Legality", colour=discord.Color.blue())
             for legality in legality_json:
                 embed.add_field(name=f"**{legality}**",
@@ -47,6 +52,15 @@ class ScryfallCommands(commands.Cog):
                                   colour=discord.Color.blue())
             await ctx.send(embed=embed)
 
+    @card.autocomplete("card")
+    @legal.autocomplete("card")
+    async def card_autocomplete(self, interaction, current: str) -> list:
+
+        """Suggests card names as the user types them in."""
+
+        names = autocomplete.suggest(current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
 
 async def setup(bot):
     await bot.add_cog(ScryfallCommands(bot))
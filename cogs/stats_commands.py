@@ -0,0 +1,46 @@
+import discord
+import io
+import json
+from discord.ext import commands
+from botBackend import stats
+
+
+class StatsCommands(commands.Cog):
+
+    """This class holds the commands for seeing how long the
+    stages of the draft pipeline are taking. They are for
+    server admins only."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(aliases=['Stats'])
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx, option: str = None):
+
+        """Shows the p50 / p95 / p99 time of every stage timed so far.
+        'export' sends every timing kept as a json file instead, and
+        'clear' starts the timings over."""
+
+        if option is None:
+            description = stats.format_summary(stats.stats.summary())
+
+        elif option.lower() == "export":
+            data = json.dumps(stats.stats.export()).encode()
+            await ctx.send(file=discord.File(io.BytesIO(data), "stats.json"))
+            return
+
+        elif option.lower() == "clear":
+            stats.stats.clear()
+            description = "The stage timings have been cleared."
+
+        else:
+            description = "Invalid parameters. Please use the '!help stats' command for details."
+
+        embed = discord.Embed(description=description, colour=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(StatsCommands(bot))
@@ -0,0 +1,76 @@
+from botBackend.autocomplete import PrefixIndex
+from botBackend import legality
+import unittest
+
+
+MODERN = legality.encode({"modern": "legal", "legacy": "legal"})
+LEGACY = legality.encode({"modern": "banned", "legacy": "legal"})
+
+CARDS = [("Lightning Bolt", MODERN), ("Lightning Helix", MODERN), ("Bolt Bend", MODERN),
+         ("Urza's Saga", MODERN), ("Black Lotus", LEGACY), ("Brainstorm", LEGACY)]
+
+
+class TestPrefixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PrefixIndex(CARDS)
+
+    def test_prefix(self):
+
+        """Tests the start of a card name."""
+
+        actual = self.index.complete("light")
+        expected = ["Lightning Bolt", "Lightning Helix"]
+        self.assertEqual(actual, expected)
+
+    def test_later_word(self):
+
+        """Tests the start of a later word in a card name."""
+
+        actual = self.index.complete("bol")
+        expected = ["Lightning Bolt", "Bolt Bend"]
+        self.assertCountEqual(actual, expected)
+
+    def test_punctuation(self):
+
+        """Tests a name typed without its apostrophe."""
+
+        actual = self.index.complete("URZAS")
+        expected = ["Urza's Saga"]
+        self.assertEqual(actual, expected)
+
+    def test_limit(self):
+
+        """Tests that no more suggestions than asked for are returned."""
+
+        actual = len(self.index.complete("", limit=4))
+        expected = 4
+        self.assertEqual(actual, expected)
+
+    def test_format(self):
+
+        """Tests that cards not legal in the format are left out."""
+
+        actual = self.index.complete("b", format="modern")
+        expected = ["Lightning Bolt", "Bolt Bend"]
+        self.assertCountEqual(actual, expected)
+
+    def test_exclude(self):
+
+        """Tests that cards already picked are left out."""
+
+        actual = self.index.complete("lightning", exclude={"Lightning Bolt"})
+        expected = ["Lightning Helix"]
+        self.assertEqual(actual, expected)
+
+    def test_no_match(self):
+
+        """Tests a prefix no card starts with."""
+
+        actual = self.index.complete("zzz")
+        expected = []
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+from botBackend.backup import BackupWorker
+from botBackend import backup
+from unittest.mock import patch
+import unittest
+import threading
+import tempfile
+import sqlite3
+import shutil
+import os
+
+
+class TestBackupWorker(unittest.TestCase):
+
+    def test_coalesce(self):
+
+        """Tests that a burst of backups for one key is sent once."""
+
+        sent = []
+        done = threading.Event()
+
+        def task():
+            sent.append("storage.json")
+            done.set()
+
+        worker = BackupWorker(interval=0.05)
+        for _ in range(5):
+            worker.submit("storage.json", task)
+
+        self.assertTrue(done.wait(1))
+        worker.stop()
+
+        actual = sent
+        expected = ["storage.json"]
+        self.assertEqual(actual, expected)
+
+    def test_stop_flushes(self):
+
+        """Tests that stopping sends the backups still waiting."""
+
+        sent = []
+        worker = BackupWorker(interval=60)
+        worker.submit("storage_1.json", lambda: sent.append(1))
+        worker.submit("storage_2.json", lambda: sent.append(2))
+        worker.stop()
+
+        actual = sent
+        expected = [1, 2]
+        self.assertEqual(actual, expected)
+
+    def test_flush(self):
+
+        """Tests that flushing sends one key's backup straight away, once."""
+
+        sent = []
+        worker = BackupWorker(interval=60)
+        worker.submit("storage_1.json", lambda: sent.append(1))
+        worker.submit("storage_2.json", lambda: sent.append(2))
+        worker.flush("storage_1.json")
+        self.assertEqual(sent, [1])
+
+        worker.stop()
+        actual = sent
+        expected = [1, 2]
+        self.assertEqual(actual, expected)
+
+    def test_flush_running(self):
+
+        """Tests that flushing a key being sent waits for it to finish."""
+
+        started = threading.Event()
+        release = threading.Event()
+        sent = []
+
+        def task():
+            started.set()
+            release.wait(1)
+            sent.append(1)
+
+        worker = BackupWorker(interval=0)
+        worker.submit("storage.json", task)
+        self.assertTrue(started.wait(1))
+
+        threading.Timer(0.05, release.set).start()
+        worker.flush("storage.json")
+        worker.stop()
+
+        actual = sent
+        expected = [1]
+        self.assertEqual(actual, expected)
+
+    def test_submit_after_stop(self):
+
+        """Tests that a backup after stopping is sent straight away."""
+
+        sent = []
+        worker = BackupWorker(interval=60)
+        worker.stop()
+        worker.submit("storage.json", lambda: sent.append(1))
+
+        actual = sent
+        expected = [1]
+        self.assertEqual(actual, expected)
+
+    def test_retry_failed(self):
+
+        """Tests that a backup that fails is tried again."""
+
+        attempts = []
+        done = threading.Event()
+
+        def task():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("bucket unreachable")
+            done.set()
+
+        worker = BackupWorker(interval=0.01)
+        worker.submit("storage.json", task)
+
+        self.assertTrue(done.wait(1))
+        worker.stop()
+        self.assertEqual(len(attempts), 2)
+
+
+class TestCardCacheSync(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "card_cache.db")
+        self.settings = {'CARD_CACHE_FILE': self.path, 'SYNC_CARD_CACHE': True,
+                         'CARD_CACHE_SYNC_INTERVAL': 3600}
+        self.config = patch('botBackend.backup.config',
+                            side_effect=lambda key, default=None, cast=None:
+                            self.settings.get(key, default))
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.directory.cleanup()
+
+    def test_upload_consistent_copy(self):
+
+        """Tests that the card cache is sent as a copy holding what was written."""
+
+        connection = sqlite3.connect(self.path)
+        with connection:
+            connection.execute("CREATE TABLE entries (key TEXT PRIMARY KEY)")
+            connection.execute("INSERT INTO entries VALUES ('gush')")
+
+        sent = os.path.join(self.directory.name, "sent.db")
+        with patch('botBackend.backup.boto3') as boto3:
+            boto3.client.return_value.upload_file.side_effect = (
+                lambda file, bucket, key: shutil.copy(file, sent))
+            backup.upload_card_cache()
+        connection.close()
+
+        copy = sqlite3.connect(sent)
+        actual = copy.execute("SELECT key FROM entries").fetchall()
+        copy.close()
+        expected = [('gush',)]
+        self.assertEqual(actual, expected)
+
+    def test_failed_sync_not_retried(self):
+
+        """Tests that a failed card cache upload does not raise and waits for the next interval."""
+
+        with patch.object(backup, "_card_cache_uploaded", -3600.0), \
+                patch('botBackend.backup.upload_card_cache',
+                      side_effect=ConnectionError("bucket unreachable")) as upload, \
+                patch('botBackend.backup.traceback'):
+            backup.sync_card_cache()
+            backup.sync_card_cache()
+
+        actual = upload.call_count
+        expected = 1
+        self.assertEqual(actual, expected)
+
+    def test_draft_upload_leaves_card_cache(self):
+
+        """Tests that a draft backup hands the card cache to its own task."""
+
+        with patch('botBackend.backup.boto3'), \
+                patch('botBackend.backup.worker') as worker, \
+                patch('botBackend.backup.upload_card_cache') as upload_card_cache:
+            backup.upload('storage.json')
+
+        worker.submit.assert_called_once_with('card_cache.db', backup.sync_card_cache)
+        upload_card_cache.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
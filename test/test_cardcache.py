@@ -0,0 +1,166 @@
+from botBackend.cardcache import CardCache, DiskCardCache, cache_key
+from botBackend import cardcache
+from unittest.mock import patch
+import unittest
+import tempfile
+import os
+
+
+class FakeClock():
+
+    """A clock that only moves when the test says so."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCardCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = CardCache(max_size=2, ttl=100, negative_ttl=10, clock=self.clock)
+
+    def test_cache_key_normalized(self):
+
+        """Tests that casing and spacing share a cache key."""
+
+        self.assertEqual(cache_key(("lightning", " BOLT")), cache_key(("Lightning", "Bolt")))
+
+    def test_get_hit_and_miss(self):
+
+        """Tests the hit and miss counters."""
+
+        self.assertIsNone(self.cache.get("gush"))
+        self.cache.put("gush", {"object": "card", "name": "Gush"})
+        self.assertEqual(self.cache.get("gush")["name"], "Gush")
+
+        actual = self.cache.stats()
+        expected = {"hits": 1, "misses": 1, "size": 1, "hit_ratio": 0.5}
+        self.assertEqual(actual, expected)
+
+    def test_ttl_expiry(self):
+
+        """Tests that found cards expire after the ttl."""
+
+        self.cache.put("gush", {"object": "card", "name": "Gush"})
+        self.clock.now = 99
+        self.assertIsNotNone(self.cache.get("gush"))
+        self.clock.now = 100
+        self.assertIsNone(self.cache.get("gush"))
+
+    def test_negative_ttl_expiry(self):
+
+        """Tests that missing cards expire after the shorter ttl."""
+
+        self.cache.put("gsh", {"object": "error", "code": "not_found"})
+        self.clock.now = 9
+        self.assertEqual(self.cache.get("gsh")["object"], "error")
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("gsh"))
+
+    def test_stale_entry(self):
+
+        """Tests that expired cards can still be read as a fallback."""
+
+        self.cache.put("gush", {"object": "card", "name": "Gush"})
+        self.clock.now = 100
+        self.assertIsNone(self.cache.get("gush"))
+        self.assertEqual(self.cache.get_stale("gush")["name"], "Gush")
+
+    def test_other_errors_not_cached(self):
+
+        """Tests that rate limit errors are not cached."""
+
+        self.cache.put("gush", {"object": "error", "code": "rate_limited"})
+        self.assertIsNone(self.cache.get("gush"))
+
+    def test_lru_eviction(self):
+
+        """Tests that the least recently used card is evicted."""
+
+        self.cache.put("gush", {"object": "card", "name": "Gush"})
+        self.cache.put("ponder", {"object": "card", "name": "Ponder"})
+        self.cache.get("gush")
+        self.cache.put("skred", {"object": "card", "name": "Skred"})
+
+        self.assertIsNone(self.cache.get("ponder"))
+        self.assertIsNotNone(self.cache.get("gush"))
+        self.assertIsNotNone(self.cache.get("skred"))
+
+
+class TestDiskCardCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "card_cache.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_survives_restart(self):
+
+        """Tests that a new cache warms up from the disk store."""
+
+        store = DiskCardCache(self.path)
+        CardCache(store=store).put("gush", {"object": "card", "name": "Gush"})
+        store.close()
+
+        cache = CardCache(store=DiskCardCache(self.path))
+        cache.warm()
+        self.assertEqual(cache.get("gush")["name"], "Gush")
+        cache.store.close()
+
+    def test_expired_entries_not_loaded(self):
+
+        """Tests that expired entries are dropped on startup."""
+
+        store = DiskCardCache(self.path)
+        store.put("gush", {"object": "card", "name": "Gush"}, -1)
+        store.close()
+
+        store = DiskCardCache(self.path)
+        self.assertEqual(store.entries(10), [])
+        self.assertEqual(store.total_bytes, 0)
+        store.close()
+
+    def test_size_cap_evicts_oldest(self):
+
+        """Tests that the oldest entries go once over the size cap."""
+
+        store = DiskCardCache(self.path, max_bytes=100)
+        store.put("gush", {"object": "card", "name": "Gush"}, 100)
+        store.put("ponder", {"object": "card", "name": "Ponder"}, 100)
+        store.put("skred", {"object": "card", "name": "Skred"}, 100)
+
+        actual = [key for key, _, _ in store.entries(10)]
+        expected = ["ponder", "skred"]
+        self.assertEqual(actual, expected)
+        self.assertLessEqual(store.total_bytes, 100)
+        store.close()
+
+    def test_corrupt_file_starts_cold(self):
+
+        """Tests that a cache file that is not a database is thrown away on startup."""
+
+        with open(self.path, "wb") as file:
+            file.write(b"not a sqlite database, cut off part way thr")
+
+        settings = {'CARD_CACHE_FILE': self.path, 'SYNC_CARD_CACHE': False}
+        with patch('botBackend.cardcache.config',
+                   side_effect=lambda key, default=None, cast=None: settings.get(key, default)):
+            with patch.object(cardcache, "cache", CardCache()):
+                cardcache.warm_start()
+                cardcache.cache.put("gush", {"object": "card", "name": "Gush"})
+                store = cardcache.cache.store
+
+                actual = [key for key, _, _ in store.entries(10)]
+                expected = ["gush"]
+                self.assertEqual(actual, expected)
+                store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
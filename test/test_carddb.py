@@ -0,0 +1,132 @@
+from botBackend import carddb, scryfallapi
+import unittest
+from unittest.mock import patch
+import tempfile
+import json
+import os
+
+
+BULK_CARDS = [
+    {"object": "card", "id": "1", "oracle_id": "a", "name": "Lightning Bolt",
+     "layout": "normal", "legalities": {"modern": "legal", "standard": "not_legal"},
+     "image_uris": {"normal": "bolt.jpg"}, "oracle_text": "Deals 3 damage."},
+    {"object": "card", "id": "2", "oracle_id": "b", "name": "Fire // Ice",
+     "layout": "split", "legalities": {"modern": "legal"},
+     "image_uris": {"normal": "fireice.jpg"},
+     "card_faces": [{"name": "Fire", "oracle_text": "..."}, {"name": "Ice"}]},
+    {"object": "card", "id": "3", "oracle_id": "c", "name": "Goblin",
+     "layout": "token", "legalities": {}},
+]
+
+
+class TestCardDB(unittest.TestCase):
+
+    def setUp(self):
+
+        """Ingests a tiny bulk file into a temporary card store."""
+
+        self.directory = tempfile.TemporaryDirectory()
+        bulk_file = os.path.join(self.directory.name, "oracle-cards.json")
+        self.db_file = os.path.join(self.directory.name, "cards.db")
+
+        with open(bulk_file, "w") as file:
+            json.dump(BULK_CARDS, file)
+
+        self.config = patch('botBackend.carddb.config', return_value=self.db_file)
+        self.config.start()
+        self.stored = carddb.ingest(bulk_file)
+
+    def tearDown(self):
+        carddb.close()
+        self.config.stop()
+        self.directory.cleanup()
+
+    def test_ingest_skips_tokens(self):
+
+        """Tests that tokens are left out of the card store."""
+
+        self.assertEqual(self.stored, 2)
+        self.assertIsNone(carddb.lookup("Goblin"))
+
+    def test_lookup_ignores_case_and_punctuation(self):
+
+        """Tests looking up a card with odd casing and punctuation."""
+
+        actual = carddb.lookup("  fire  ICE ")["name"]
+        expected = "Fire // Ice"
+        self.assertEqual(actual, expected)
+
+    def test_lookup_by_face_name(self):
+
+        """Tests looking up a split card by one of its faces."""
+
+        actual = carddb.lookup("ice")["name"]
+        expected = "Fire // Ice"
+        self.assertEqual(actual, expected)
+
+    def test_lookup_trims_payload(self):
+
+        """Tests that unused fields are not kept in the store."""
+
+        card_json = carddb.lookup("lightning bolt")
+        self.assertEqual(card_json["legalities"]["modern"], "legal")
+        self.assertEqual(card_json["image_uris"]["normal"], "bolt.jpg")
+        self.assertNotIn("oracle_text", card_json)
+
+    def test_get_card_json_not_found(self):
+
+        """Tests that a miss looks like the scryfall error object."""
+
+        actual = carddb.get_card_json("Nonexistent Card")
+        self.assertEqual(actual["object"], "error")
+        self.assertEqual(actual["code"], "not_found")
+
+    def test_get_card_json_too_broad(self):
+
+        """Tests that a name too broad to search is ambiguous."""
+
+        with patch.object(carddb.FuzzyIndex, "PARTIAL_SCAN", 0):
+            actual = carddb.get_card_json("li")
+        self.assertEqual(actual.get("type"), "ambiguous")
+
+    def test_available(self):
+
+        """Tests that an ingested store reports itself as available."""
+
+        self.assertTrue(carddb.available())
+
+
+class TestNoCardStore(unittest.TestCase):
+
+    def setUp(self):
+
+        """Points the card store at a file that was never ingested."""
+
+        self.directory = tempfile.TemporaryDirectory()
+        db_file = os.path.join(self.directory.name, "cards.db")
+        self.config = patch('botBackend.carddb.config', return_value=db_file)
+        self.config.start()
+
+    def tearDown(self):
+        carddb.close()
+        self.config.stop()
+        self.directory.cleanup()
+
+    def test_hybrid_asks_scryfall(self):
+
+        """Tests that hybrid mode asks scryfall when there is no card store."""
+
+        with patch('botBackend.scryfallapi.config', return_value='hybrid'):
+            self.assertIsNone(scryfallapi.get_local_json(("Lightning", "Bolt")))
+
+    def test_local_not_found(self):
+
+        """Tests that local mode finds no cards when there is no card store."""
+
+        with patch('botBackend.scryfallapi.config', return_value='local'):
+            actual = scryfallapi.get_local_json(("Lightning", "Bolt"))
+        self.assertEqual(actual["code"], "not_found")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+from benchmark import draft_benchmark
+import unittest
+
+
+class TestDraftBenchmark(unittest.TestCase):
+
+    def test_small_draft(self):
+
+        """Tests that a small benchmark run times every operation
+        and only talks to the stand-ins."""
+
+        results = draft_benchmark.run(players=2, picks=5, drafts=1, prepick_rate=1.0,
+                                      storm=3, cancel_rate=0.5, seed=100)
+
+        self.assertGreater(results["operations"]["pick"]["count"], 0)
+        self.assertEqual(results["operations"]["fire"]["count"], 1)
+        self.assertEqual(results["operations"]["reset"]["count"], 1)
+
+        # the draft is run once timed and once traced, 10 picks each
+        actual = results["backends"]["sheet_cells"]
+        expected = 20
+        self.assertEqual(actual, expected)
+
+    def test_compare(self):
+
+        """Tests that only a slowdown past the tolerance is a regression."""
+
+        baseline = {"operations": {"pick": {"p50_us": 100, "p95_us": 200}}}
+        results = {"operations": {"pick": {"p50_us": 140, "p95_us": 320}}}
+
+        actual = draft_benchmark.compare(results, baseline, tolerance=1.5)
+        expected = ["pick p95_us: 200.0 -> 320.0"]
+        self.assertEqual(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,40 @@
-from botBackend.draft_logic import DraftLogic, Player
+from botBackend.draft_logic import DraftLogic, Player, snake_position
 import unittest
 from unittest.mock import patch
 import random
+import json
 from decouple import config
+from botBackend.backup import BackupWorker
+import os
+
+
+class BucketStandIn():
+
+    """Keeps uploaded files in memory in place of the S3 bucket, and
+    hands backups to a worker that waits long enough to never run."""
+
+    def __init__(self):
+        self.files = {}
+        self.loaded = []
+        self.failures = 0
+        self.worker = BackupWorker(interval=60)
+
+    def upload(self, file: str):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("bucket unreachable")
+        with open(file, "rb") as local:
+            self.files[file] = local.read()
+
+    def load(self, file_location: str, missing_ok: bool = False) -> bool:
+        self.loaded.append(file_location)
+        if file_location not in self.files:
+            if os.path.exists(file_location):
+                os.remove(file_location)
+            return False
+        with open(file_location, "wb") as local:
+            local.write(self.files[file_location])
+        return True
 
 
 class TestDraftLogic(unittest.TestCase):
@@ -296,16 +328,9 @@ class TestDraftLogic(unittest.TestCase):
                 self.assertTrue(logic.setup)
                 self.assertEqual(logic.player_count, 3)
                 self.assertEqual(logic.pick_count, 45)
-                self.assertEqual(logic.active_player_index, 0)
-                self.assertEqual(logic.row, 2)
-                self.assertEqual(logic.column, 2)
+                self.assertEqual(logic.pick_number, 0)
                 self.assertEqual(logic.picks_remaining, 135)
-
-                expected_row_move = [0, 0, 1, 0, 0, 1]
-                self.assertEqual(logic.row_move, expected_row_move)
-
-                expected_column_move = [1, 1, 0, -1, -1, 0]
-                self.assertEqual(logic.column_move, expected_column_move)
+                self.assertEqual(logic.active_player, Player(username='player3', user_id='3'))
 
                 expected_picks = {Player(username="player1", user_id="1"): [],
                                   Player(username="player2", user_id="2"): [],
@@ -319,15 +344,6 @@ class TestDraftLogic(unittest.TestCase):
 
                 self.assertEqual(logic.prepicks, expected_prepicks)
 
-                expected_snake_player_list = [Player(username='player3', user_id='3'),
-                                              Player(username='player2', user_id='2'),
-                                              Player(username='player1', user_id='1'),
-                                              Player(username='player1', user_id='1'),
-                                              Player(username='player2', user_id='2'),
-                                              Player(username='player3', user_id='3')]
-
-                self.assertEqual(logic.snake_player_list, expected_snake_player_list)
-
                 expected_players = [Player(username="player3", user_id="3"),
                                     Player(username="player2", user_id="2"),
                                     Player(username="player1", user_id="1")]
@@ -490,6 +506,20 @@ class TestDraftLogic(unittest.TestCase):
     ###          LEAVE TESTS          ###
     #####################################
 
+    def test_join_draft_same_user_id(self):
+
+        """Ensures a player is known by their user id, so a changed
+        username cannot join the draft twice."""
+
+        logic = DraftLogic()
+        logic.setup_draft("4", "45", "freeform")
+        logic.join_draft("player_1", "1")
+
+        actual = logic.join_draft("player_1_renamed", "1")
+        expected = "player_1_renamed has already been added to the draft."
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(logic.players), 1)
+
     def test_leave_already_fired(self):
 
         """Tests trying to leave the draft when it has already fired."""
@@ -640,6 +670,23 @@ class TestDraftLogic(unittest.TestCase):
     ###       SETUP DRAFT TESTS       ###
     #####################################
 
+    def test_leave_draft_seats(self):
+
+        """Ensures the players after one who leaves move up a seat."""
+
+        logic = DraftLogic()
+        logic.setup_draft("4", "45", "freeform")
+        logic.join_draft("player_1", "1")
+        logic.join_draft("player_2", "2")
+        logic.join_draft("player_3", "3")
+        logic.leave_draft("player_1", "1")
+
+        actual = logic.seats
+        expected = {'2': 0, '3': 1}
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(logic.seat_picks), 2)
+        self.assertEqual(len(logic.seat_prepicks), 2)
+
     def test_setup_draft_already_fired(self):
 
         """Tests setting up a draft when it has already fired."""
@@ -995,145 +1042,34 @@ class TestDraftLogic(unittest.TestCase):
     ###      PICK PIPELINE TESTS      ###
     #####################################
 
-    def test_row_update(self):
-
-        """Ensures the row updates correctly."""
-
-        # use mock to ensure we don't call google sheet api
-        with patch('botBackend.draft_logic.sheetapi'):
-            with patch('botBackend.draft_logic.backup'):
-                logic = DraftLogic()
-                logic.setup_draft("4", "45", "freeform")
-                logic.join_draft("player_1", "1")
-                logic.join_draft("player_2", "2")
-                logic.join_draft("player_3", "3")
-                logic.join_draft("player_4", "4")
-                logic.fire_draft()
-
-                actual = logic.row
-                expected = 2
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 2
-                logic.active_player_update()
-                actual = logic.row
-                expected = 2
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 2
-                logic.active_player_update()
-                actual = logic.row
-                expected = 2
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 2
-                logic.active_player_update()
-                actual = logic.row
-                expected = 2
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 3
-                logic.active_player_update()
-                actual = logic.row
-                expected = 3
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 3
-                logic.active_player_update()
-                actual = logic.row
-                expected = 3
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 3
-                logic.active_player_update()
-                actual = logic.row
-                expected = 3
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 3
-                logic.active_player_update()
-                actual = logic.row
-                expected = 3
-                self.assertEqual(actual, expected)
-
-                logic.row_update()  # 4
-                logic.active_player_update()
-                actual = logic.row
-                expected = 4
-                self.assertEqual(actual, expected)
+    def test_snake_position_row(self):
 
-    def test_column_update(self):
+        """Ensures the sheet row moves down once every round."""
 
-        """Ensures the column updates correctly."""
-
-        # use mock to ensure we don't call google sheet api
-        with patch('botBackend.draft_logic.sheetapi'):
-            with patch('botBackend.draft_logic.backup'):
-                logic = DraftLogic()
-                logic.setup_draft("4", "45", "freeform")
-                logic.join_draft("player_1", "1")
-                logic.join_draft("player_2", "2")
-                logic.join_draft("player_3", "3")
-                logic.join_draft("player_4", "4")
-                logic.fire_draft()
-
-                actual = logic.column  # 2
-                expected = 2
-                self.assertEqual(actual, expected)
-
-                logic.column_update()  # 3
-                logic.active_player_update()
-                actual = logic.column
-                expected = 3
-                self.assertEqual(actual, expected)
-
-                logic.column_update()  # 4
-                logic.active_player_update()
-                actual = logic.column
-                expected = 4
-                self.assertEqual(actual, expected)
+        actual = [snake_position(pick_number, 4)[2] for pick_number in range(9)]
+        expected = [2, 2, 2, 2, 3, 3, 3, 3, 4]
+        self.assertEqual(actual, expected)
 
-                logic.column_update()  # 5
-                logic.active_player_update()
-                actual = logic.column
-                expected = 5
-                self.assertEqual(actual, expected)
+    def test_snake_position_column(self):
 
-                logic.column_update()  # 5
-                logic.active_player_update()
-                actual = logic.column
-                expected = 5
-                self.assertEqual(actual, expected)
+        """Ensures the sheet column snakes back and forth."""
 
-                logic.column_update()  # 4
-                logic.active_player_update()
-                actual = logic.column
-                expected = 4
-                self.assertEqual(actual, expected)
+        actual = [snake_position(pick_number, 4)[3] for pick_number in range(10)]
+        expected = [2, 3, 4, 5, 5, 4, 3, 2, 2, 3]
+        self.assertEqual(actual, expected)
 
-                logic.column_update()  # 3
-                logic.active_player_update()
-                actual = logic.column
-                expected = 3
-                self.assertEqual(actual, expected)
+    def test_snake_position_any_pick(self):
 
-                logic.column_update()  # 2
-                logic.active_player_update()
-                actual = logic.column
-                expected = 2
-                self.assertEqual(actual, expected)
+        """Ensures a pick deep in the draft is located without
+        stepping through the picks before it."""
 
-                logic.column_update()  # 2
-                logic.active_player_update()
-                actual = logic.column
-                expected = 2
-                self.assertEqual(actual, expected)
+        actual = snake_position(177, 4)  # round 44 is a forward round
+        expected = (1, 44, 46, 3)
+        self.assertEqual(actual, expected)
 
-                logic.column_update()  # 3
-                logic.active_player_update()
-                actual = logic.column
-                expected = 3
-                self.assertEqual(actual, expected)
+        actual = snake_position(179, 3)  # round 59 is a backward round
+        expected = (0, 59, 61, 2)
+        self.assertEqual(actual, expected)
 
     def test_active_player_update(self):
 
@@ -1155,47 +1091,47 @@ class TestDraftLogic(unittest.TestCase):
                 logic.join_draft("player_4", "4")
                 logic.fire_draft()
 
-                actual = logic.snake_player_list[logic.active_player_index]
+                actual = logic.active_player
                 expected = Player('player_1', '1')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 3
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 3
+                actual = logic.active_player
                 expected = Player('player_3', '3')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 4
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 4
+                actual = logic.active_player
                 expected = Player('player_4', '4')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 2
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 2
+                actual = logic.active_player
                 expected = Player('player_2', '2')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 2
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 2
+                actual = logic.active_player
                 expected = Player('player_2', '2')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 4
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 4
+                actual = logic.active_player
                 expected = Player('player_4', '4')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 3
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 3
+                actual = logic.active_player
                 expected = Player('player_3', '3')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 1
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 1
+                actual = logic.active_player
                 expected = Player('player_1', '1')
                 self.assertEqual(actual, expected)
 
-                logic.active_player_update()  # 1
-                actual = logic.snake_player_list[logic.active_player_index]
+                logic.pick_number_update()  # 1
+                actual = logic.active_player
                 expected = Player('player_1', '1')
                 self.assertEqual(actual, expected)
 
@@ -1218,14 +1154,14 @@ class TestDraftLogic(unittest.TestCase):
                 logic.join_draft("player_4", "4")
                 logic.fire_draft()
 
-                logic.picks_remaining_update()
-                logic.picks_remaining_update()
-                logic.picks_remaining_update()
-                logic.picks_remaining_update()
-                logic.picks_remaining_update()
+                logic.pick_number_update()
+                logic.pick_number_update()
+                logic.pick_number_update()
+                logic.pick_number_update()
+                logic.pick_number_update()
 
                 actual = logic.picks_remaining
-                expected = 175  # 45 * 4 - 4 = 175
+                expected = 175  # 45 * 4 - 5 = 175
 
                 self.assertEqual(actual, expected)
 
@@ -1285,6 +1221,30 @@ class TestDraftLogic(unittest.TestCase):
                 expected = "This card does not exist."
                 self.assertEqual(actual, expected)
 
+    def test_invalid_pick_scryfall_timeout(self):
+
+        """Tests a lookup that ran out of time is not reported as a missing card."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.join_draft("player_3", "3")
+                logic.join_draft("player_4", "4")
+                logic.fire_draft()
+
+                actual = logic.invalid_pick('player_1', '1', {'object': 'error',
+                                                              'code': 'timeout'})
+                expected = "Scryfall is not responding right now. Please try again in a moment."
+                self.assertEqual(actual, expected)
+
     def test_invalid_pick_card_already_picked(self):
 
         """Tests invalid input with a non unique card."""
@@ -1309,7 +1269,7 @@ class TestDraftLogic(unittest.TestCase):
                 # use mock to ensure we don't call scryfall api.
                 with patch('botBackend.draft_logic.scryfallapi'):
 
-                    logic.picks[Player('player_2', '2')].append("Gush")
+                    logic.add_pick(logic.seats['2'], "Gush")
                     actual = logic.invalid_pick('player_1', '1', {'object': 'card', 'name': 'Gush'})
 
                     expected = "That card has already been chosen. Please try again."
@@ -1434,6 +1394,386 @@ class TestDraftLogic(unittest.TestCase):
                     actual = logic.picks
                     self.assertEqual(actual, expected)
 
+                    actual = logic.taken
+                    expected = {'Gush', 'Ponder', 'Skred', 'Swamp'}
+                    self.assertEqual(actual, expected)
+
+    def test_pick_sheet_batched(self):
+
+        """Ensures a pick and the pre-picks it sets off are
+        written to the sheet in one call."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi') as mock_sheet:
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.join_draft("player_3", "3")
+                logic.join_draft("player_4", "4")
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+
+                    mock_api.return_value = {'object': 'card', 'name': 'Ponder'}
+                    logic.pre_pick('player_3', '3', ('Ponder',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Skred'}
+                    logic.pre_pick('player_4', '4', ('Skred',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick('player_1', '1', ('Gush',))
+
+                mock_sheet.pick_many.assert_called_once()
+                actual = mock_sheet.pick_many.call_args.args[0]
+                expected = [(2, 2, 'Gush'), (2, 3, 'Ponder'), (2, 4, 'Skred')]
+                self.assertEqual(actual, expected)
+
+    def test_pick_tracker_reload(self):
+
+        """Ensures the taken cards are rebuilt when a draft is reloaded."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.join_draft("player_3", "3")
+                logic.join_draft("player_4", "4")
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick('player_1', '1', ('Gush',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Ponder'}
+                    logic.pick('player_3', '3', ('Ponder',))
+
+                # the backup worker is mocked, so send the backup here
+                logic.send_backup()
+
+                reloaded = DraftLogic()
+                reloaded.reload()
+
+                actual = reloaded.taken
+                expected = {'Gush', 'Ponder'}
+                self.assertEqual(actual, expected)
+
+    def test_reload_old_backup(self):
+
+        """Ensures a backup from before the pick number was stored
+        resumes at the right pick."""
+
+        # use mock to ensure we don't call the s3 bucket. old
+        # backups only have the json storage file.
+        with patch('botBackend.draft_logic.backup') as mock_backup:
+            mock_backup.load.side_effect = lambda file, missing_ok=False: file == "storage.json"
+            with open("storage.json", "w") as file:
+                json.dump({"player_count": 2, "pick_count": 5,
+                           "players": [{"username": "player_2", "user_id": "2"},
+                                       {"username": "player_1", "user_id": "1"}],
+                           "draft_fired": True, "setup": True, "format": "freeform",
+                           "picks": [{"username": "player_2", "user_id": "2",
+                                      "picks": ["Gush", "Swamp"]},
+                                     {"username": "player_1", "user_id": "1",
+                                      "picks": ["Ponder"]}],
+                           "prepicks": [{"username": "player_2", "user_id": "2",
+                                         "prepicks": []},
+                                        {"username": "player_1", "user_id": "1",
+                                         "prepicks": []}],
+                           "active_player_index": 3, "row": 3, "column": 2,
+                           "row_move": [0, 1, 0, 1], "column_move": [1, 0, -1, 0],
+                           "picks_remaining": 7}, file)
+
+            logic = DraftLogic()
+            logic.reload()
+
+            self.assertEqual(logic.pick_number, 3)
+            self.assertEqual(logic.picks_remaining, 7)
+            self.assertEqual(logic.active_player, Player('player_2', '2'))
+
+    def test_reload_legacy_backup(self):
+
+        """Ensures a channel's draft picks up the draft backed up before
+        every channel had its own, and moves it to a backup of its own."""
+
+        # use mock to ensure we don't call the s3 bucket. only the
+        # backup from before drafts per channel is there.
+        with patch('botBackend.draft_logic.backup') as mock_backup:
+            mock_backup.load.side_effect = lambda file, missing_ok=False: file == "storage.json"
+            with open("storage.json", "w") as file:
+                json.dump({"player_count": 2, "pick_count": 5,
+                           "players": [{"username": "player_2", "user_id": 2},
+                                       {"username": "player_1", "user_id": 1}],
+                           "draft_fired": True, "setup": True, "format": "freeform",
+                           "picks": [{"username": "player_2", "user_id": 2, "picks": ["Gush"]},
+                                     {"username": "player_1", "user_id": 1, "picks": []}],
+                           "prepicks": [{"username": "player_2", "user_id": 2, "prepicks": []},
+                                        {"username": "player_1", "user_id": 1,
+                                         "prepicks": ["Ponder"]}],
+                           "pick_number": 1}, file)
+
+            logic = DraftLogic("1_10")
+            logic.reload()
+
+            self.assertEqual(logic.active_player, Player('player_1', 1))
+            self.assertEqual(logic.prepicks[Player('player_1', 1)], ['Ponder'])
+            mock_backup.upload.assert_called_once_with("storage_1_10.snap")
+            mock_backup.delete.assert_called_once_with("storage.json")
+
+    def test_reload_replays_journal(self):
+
+        """Ensures a reload replays the picks, pre-picks and cancels
+        written to the journal after the last snapshot."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.join_draft("player_3", "3")
+                logic.join_draft("player_4", "4")
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+
+                    mock_api.return_value = {'object': 'card', 'name': 'Ponder'}
+                    logic.pre_pick('player_3', '3', ('Ponder',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Skred'}
+                    logic.pre_pick('player_3', '3', ('Skred',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Swamp'}
+                    logic.pre_pick('player_3', '3', ('Swamp',))
+                    logic.cancel_pre_pick('player_3', '3', ('Swamp',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick('player_1', '1', ('Gush',))
+
+                # the backup worker is mocked, so send the backup here
+                logic.send_backup()
+
+                reloaded = DraftLogic()
+                reloaded.reload()
+
+                self.assertEqual(reloaded.players, logic.players)
+                self.assertEqual(reloaded.picks, logic.picks)
+                self.assertEqual(reloaded.prepicks, logic.prepicks)
+                self.assertEqual(reloaded.pick_number, 2)
+                self.assertEqual(reloaded.active_player, Player('player_4', '4'))
+
+    def test_reload_after_pick(self):
+
+        """Ensures a reload right after a pick keeps the pick, even
+        though the backup worker had not sent it yet."""
+
+        bucket = BucketStandIn()
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup', bucket):
+                logic = DraftLogic()
+                logic.setup_draft("2", "5", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.fire_draft()
+                bucket.worker.flush(logic.storage_file)
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick(logic.active_player.username, logic.active_player.user_id,
+                               ('Gush',))
+                expected = logic.seat_picks
+
+                logic.reload()
+                bucket.worker.stop()
+
+                actual = logic.seat_picks
+                self.assertEqual(actual, expected)
+                self.assertIn(['Gush'], actual)
+
+    def test_reload_after_failed_upload(self):
+
+        """Ensures a journal segment that failed to upload is sent
+        with the next backup, so no picks are missing from the bucket."""
+
+        bucket = BucketStandIn()
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup', bucket):
+                logic = DraftLogic()
+                logic.setup_draft("1", "5", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.fire_draft()
+                logic.send_backup()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+                    for card, failures in [("C1", 0), ("C2", 1), ("C3", 0)]:
+                        mock_api.return_value = {'object': 'card', 'name': card}
+                        logic.pick('player_1', '1', (card,))
+                        bucket.failures = failures
+                        try:
+                            logic.send_backup()
+                        except ConnectionError:
+                            pass
+
+                reloaded = DraftLogic()
+                reloaded.reload()
+                bucket.worker.stop()
+
+                actual = reloaded.seat_picks
+                expected = [['C1', 'C2', 'C3']]
+                self.assertEqual(actual, expected)
+
+    def test_reload_skips_old_segments(self):
+
+        """Ensures a reload stops downloading journal segments at the
+        first one left over from an older snapshot."""
+
+        bucket = BucketStandIn()
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup', bucket):
+                logic = DraftLogic()
+                logic.JOURNAL_COMPACT_EVERY = 4
+                logic.setup_draft("4", "45", "freeform")
+
+                # three segments, then a new snapshot leaves them behind
+                for user_id in range(1, 5):
+                    logic.join_draft(f"player_{user_id}", str(user_id))
+                    logic.send_backup()
+
+                bucket.loaded = []
+                logic.reload()
+                bucket.worker.stop()
+
+                actual = [file for file in bucket.loaded if file.startswith("journal")]
+                expected = ["journal.jsonl.0"]
+                self.assertEqual(actual, expected)
+                self.assertEqual(len(logic.players), 4)
+
+    def test_backup_sends_changes(self):
+
+        """Ensures a backup only sends the changes made since the
+        draft was set up, not the whole draft."""
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup') as mock_backup:
+                logic = DraftLogic()
+                logic.setup_draft("1", "5", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick('player_1', '1', ('Gush',))
+
+                # the pick is handed to the backup worker, not sent
+                actual = mock_backup.worker.submit.call_args.args
+                expected = ("storage.snap", logic.send_backup)
+                self.assertEqual(actual, expected)
+
+                mock_backup.upload.reset_mock()
+                logic.send_backup()
+                actual = mock_backup.upload.call_args.args[0]
+                expected = "journal.jsonl.0"
+                self.assertEqual(actual, expected)
+
+                with open(actual, "r") as file:
+                    actual = [json.loads(line) for line in file][1:]
+                expected = [{"event": "join", "username": "player_1", "user_id": "1"},
+                            {"event": "fire", "players": [["player_1", "1"]]},
+                            {"event": "pick", "user_id": "1", "card": "Gush"}]
+                self.assertEqual(actual, expected)
+
+    def test_journal_compaction(self):
+
+        """Ensures a full journal is folded into a new snapshot."""
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.JOURNAL_COMPACT_EVERY = 3
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                self.assertEqual(len(logic.journal), 2)
+
+                logic.join_draft("player_3", "3")
+                self.assertEqual(len(logic.journal), 0)
+
+                logic.join_draft("player_4", "4")
+                logic.send_backup()
+
+                reloaded = DraftLogic()
+                reloaded.reload()
+
+                actual = reloaded.players
+                expected = [Player('player_1', '1'), Player('player_2', '2'),
+                            Player('player_3', '3'), Player('player_4', '4')]
+                self.assertEqual(actual, expected)
+
+    def test_journal_compaction_int_ids(self):
+
+        """Ensures a draft with discord's integer user ids can be
+        snapshotted and reloaded, and is still found by those ids."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.JOURNAL_COMPACT_EVERY = 3
+                logic.setup_draft("4", "45", "freeform")
+                for user_id in range(1, 5):
+                    logic.join_draft(f"player_{user_id}", 123456789012345670 + user_id)
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick('player_1', 123456789012345671, ('Gush',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Ponder'}
+                    logic.pick('player_3', 123456789012345673, ('Ponder',))
+                logic.send_backup()
+
+                reloaded = DraftLogic()
+                reloaded.reload()
+
+                self.assertEqual(reloaded.players, logic.players)
+                self.assertEqual(reloaded.picks, logic.picks)
+                self.assertEqual(reloaded.active_player,
+                                 Player('player_4', 123456789012345674))
+
+                actual = reloaded.seats[123456789012345674]
+                expected = 2
+                self.assertEqual(actual, expected)
+
     #####################################
     ###        PRE PICK TESTS       ###
     #####################################
@@ -1477,6 +1817,67 @@ class TestDraftLogic(unittest.TestCase):
                     actual = logic.prepicks
                     self.assertEqual(actual, expected)
 
+    def test_pre_pick_many(self):
+
+        """Ensures a list of prepicks works as intended."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.join_draft("player_3", "3")
+                logic.join_draft("player_4", "4")
+                logic.fire_draft()
+
+                card_jsons = [{'object': 'card', 'name': 'Gush'},
+                              {'object': 'error'},
+                              {'object': 'card', 'name': 'Ponder'},
+                              {'object': 'card', 'name': 'Gush'}]
+
+                with patch.object(logic, 'backup') as mock_backup:
+                    actual = logic.pre_pick_many('player_1', '1',
+                                                 [('Gush',), ('Gsuh', 'x'), ('Ponder',), ('gush',)],
+                                                 card_jsons)
+                    mock_backup.assert_called_once()
+
+                expected = ("You have successfully pre-picked: Gush, Ponder.\n" +
+                            "These cards were not pre-picked:\n" +
+                            "Gsuh x: This card does not exist.\n" +
+                            "gush: You have already pre-picked this card. Please try again.")
+                self.assertEqual(actual, expected)
+
+                actual = logic.prepicks[Player('player_1', '1')]
+                expected = ['Gush', 'Ponder']
+                self.assertEqual(actual, expected)
+
+    def test_pre_pick_many_not_in_draft(self):
+
+        """Ensures a list of prepicks from someone outside the draft is rejected."""
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("2", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi') as mock_api:
+                    actual = logic.pre_pick_many('player_5', '5', [('Gush',)])
+                    mock_api.get_scryfall_collection.assert_not_called()
+
+                expected = "You are not in this draft and cannot make pre-picks."
+                self.assertEqual(actual, expected)
+
     def test_iterate_pre_pick_1(self):
 
         """Ensures prepick works as intended."""
@@ -1541,7 +1942,8 @@ class TestDraftLogic(unittest.TestCase):
                 # use mock to ensure we don't call scryfall api.
                 with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
 
-                    logic.picks_remaining = 3
+                    # 3 picks left (45 * 4 = 180), starting from the 2nd seat
+                    logic.pick_number = 177
 
                     mock_api.return_value = {'object': 'card', 'name': 'Gush'}
                     logic.pre_pick('player_1', '1', ('Gush',))
@@ -1553,9 +1955,49 @@ class TestDraftLogic(unittest.TestCase):
                     logic.pre_pick('player_2', '2', ('Swamp',))
 
                     actual = logic.iterate_prepicks()
-                    expected = [('player_1', 'Gush'),
-                                ('player_3', 'Ponder'),
-                                ('player_4', 'Skred')]
+                    expected = [('player_3', 'Ponder'),
+                                ('player_4', 'Skred'),
+                                ('player_2', 'Swamp')]
+                    self.assertEqual(actual, expected)
+
+    def test_prepicks_update_shared_card(self):
+
+        """Ensures a pick only removes the card from the queues holding it."""
+
+        # Use a seed to ensure the random call in the fire
+        # method is always the same. (1 3 4 2 2 4 3 1)
+        random.seed(100)
+
+        # use mock to ensure we don't call google sheet api
+        with patch('botBackend.draft_logic.sheetapi'):
+            with patch('botBackend.draft_logic.backup'):
+                logic = DraftLogic()
+                logic.setup_draft("4", "45", "freeform")
+                logic.join_draft("player_1", "1")
+                logic.join_draft("player_2", "2")
+                logic.join_draft("player_3", "3")
+                logic.join_draft("player_4", "4")
+                logic.fire_draft()
+
+                # use mock to ensure we don't call scryfall api.
+                with patch('botBackend.draft_logic.scryfallapi.get_scryfall_json') as mock_api:
+
+                    mock_api.return_value = {'object': 'card', 'name': 'Ponder'}
+                    logic.pre_pick('player_1', '1', ('Ponder',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pre_pick('player_2', '2', ('Gush',))
+                    mock_api.return_value = {'object': 'card', 'name': 'Ponder'}
+                    logic.pre_pick('player_2', '2', ('Ponder',))
+
+                    mock_api.return_value = {'object': 'card', 'name': 'Gush'}
+                    logic.pick('player_1', '1', ('Gush',))
+
+                    actual = logic.prepicks[Player('player_2', '2')]
+                    expected = ['Ponder']
+                    self.assertEqual(actual, expected)
+
+                    actual = logic.prepickers
+                    expected = {'Ponder': {logic.seats['1'], logic.seats['2']}}
                     self.assertEqual(actual, expected)
 
     #####################################
@@ -1814,7 +2256,7 @@ class TestDraftLogic(unittest.TestCase):
                 logic.join_draft("player_4", "4")
                 logic.fire_draft()
 
-                logic.picks[Player('player_2', '2')].append("Gush")
+                logic.add_pick(logic.seats['2'], "Gush")
                 actual = logic.invalid_prepick('player_1', '1', {'object': 'card', 'name': 'Gush'})
 
                 expected = "That card has already been chosen in the draft. Please try again."
@@ -1841,7 +2283,7 @@ class TestDraftLogic(unittest.TestCase):
                 logic.join_draft("player_4", "4")
                 logic.fire_draft()
 
-                logic.prepicks[Player('player_1', '1')].append("Gush")
+                logic.add_prepick(logic.seats['1'], "Gush")
                 actual = logic.invalid_prepick('player_1', '1', {'object': 'card', 'name': 'Gush'})
 
                 expected = "You have already pre-picked this card. Please try again."
@@ -2032,13 +2474,9 @@ class TestDraftLogic(unittest.TestCase):
                 self.assertEqual(logic.picks, {})
                 self.assertEqual(logic.prepicks, {})
                 self.assertEqual(logic.players, [])
-                self.assertEqual(logic.active_player_index, 0)
-                self.assertEqual(logic.row, 2)
-                self.assertEqual(logic.column, 2)
-                self.assertEqual(logic.row_move, [])
-                self.assertEqual(logic.column_move, [])
+                self.assertEqual(logic.pick_number, 0)
                 self.assertEqual(logic.picks_remaining, 0)
-                self.assertEqual(logic.snake_player_list, [])
+                self.assertEqual(logic.taken, set())
 
 
 if __name__ == "__main__":
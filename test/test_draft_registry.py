@@ -0,0 +1,126 @@
+from botBackend.draft_registry import DraftRegistry, parse_sheets
+from botBackend.prepick_queue import PrepickQueue
+import unittest
+
+
+class TestDraftRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = DraftRegistry(max_drafts=3, sheets={20: "sheet_b"})
+
+    def test_channels_isolated(self):
+
+        """Tests that each channel gets a draft of its own."""
+
+        first = self.registry.get(1, 10)
+        second = self.registry.get(1, 20)
+
+        self.assertIsNot(first, second)
+        self.assertIs(self.registry.get(1, 10), first)
+        self.assertNotEqual(first.storage_file, second.storage_file)
+
+    def test_sheet_targets(self):
+
+        """Tests that channels use their own sheet, or the default one."""
+
+        actual = (self.registry.get(1, 10).sheet_key, self.registry.get(1, 20).sheet_key)
+        expected = (None, "sheet_b")
+        self.assertEqual(actual, expected)
+
+    def test_max_drafts(self):
+
+        """Tests that no new drafts are made once at the limit."""
+
+        for channel_id in range(3):
+            self.registry.get(1, channel_id)
+
+        self.assertIsNone(self.registry.get(1, 99))
+        self.assertIsNotNone(self.registry.get(1, 0))
+
+    def test_release(self):
+
+        """Tests that only drafts that are not set up are forgotten."""
+
+        self.registry.get(1, 10).setup = True
+        self.registry.get(1, 30)
+
+        self.registry.release(1, 10)
+        self.registry.release(1, 30)
+
+        self.assertIsNotNone(self.registry.find(1, 10))
+        self.assertIsNone(self.registry.find(1, 30))
+
+    def test_sheet_in_use(self):
+
+        """Tests that two drafts cannot be set up on the same sheet."""
+
+        self.registry.get(1, 10).setup = True
+
+        self.assertTrue(self.registry.sheet_in_use(self.registry.get(2, 30)))
+        self.assertFalse(self.registry.sheet_in_use(self.registry.get(1, 20)))
+
+    def test_queued_prepicks(self):
+
+        """Tests that the pre-picks waiting in every draft are counted."""
+
+        self.registry.get(1, 10).seat_prepicks = [PrepickQueue(["Gush"]), PrepickQueue()]
+        self.registry.get(1, 20).seat_prepicks = [PrepickQueue(["Brainstorm", "Ponder"])]
+
+        actual = self.registry.queued_prepicks()
+        expected = 3
+        self.assertEqual(actual, expected)
+
+    def test_route(self):
+
+        """Tests that server commands go by channel and DM's go by player."""
+
+        self.registry.get(1, 10).setup_draft("2", "45", "freeform")
+        self.registry.find(1, 10).join_draft("player_1", 5)
+
+        self.assertEqual(self.registry.route(1, 10, 7), (1, 10))
+        self.assertIsNone(self.registry.route(1, 30, 7))
+        self.assertEqual(self.registry.route(None, 99, 5), (1, 10))
+        self.assertIsNone(self.registry.route(None, 99, 7))
+
+    def test_user_index(self):
+
+        """Tests that joining and leaving drafts keeps the user index up to date."""
+
+        self.registry.get(1, 10).setup_draft("2", "45", "freeform")
+        self.registry.get(1, 20).setup_draft("2", "45", "freeform")
+
+        self.registry.find(1, 10).join_draft("player_1", 5)
+        self.registry.find(1, 20).join_draft("player_1", 5)
+        self.assertEqual(self.registry.drafts_for(5), [(1, 10), (1, 20)])
+
+        self.registry.find(1, 10).leave_draft("player_1", 5)
+        self.assertEqual(self.registry.drafts_for(5), [(1, 20)])
+
+    def test_select_draft(self):
+
+        """Tests that a user in several drafts can choose where their DM's go."""
+
+        self.registry.get(1, 10).setup_draft("2", "45", "freeform")
+        self.registry.get(1, 20).setup_draft("2", "45", "freeform")
+        self.registry.find(1, 10).join_draft("player_1", 5)
+        self.registry.find(1, 20).join_draft("player_1", 5)
+
+        self.assertIsNone(self.registry.route(None, 99, 5))
+        self.assertFalse(self.registry.select(5, (1, 30)))
+        self.assertTrue(self.registry.select(5, (1, 20)))
+        self.assertEqual(self.registry.route(None, 99, 5), (1, 20))
+
+        self.registry.find(1, 20).leave_draft("player_1", 5)
+        self.assertEqual(self.registry.route(None, 99, 5), (1, 10))
+
+    def test_parse_sheets(self):
+
+        """Tests reading channel sheets from the env setting."""
+
+        actual = parse_sheets(["10=sheet_a", " 20 = sheet_b"])
+        expected = {10: "sheet_a", 20: "sheet_b"}
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
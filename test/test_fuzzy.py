@@ -0,0 +1,136 @@
+from botBackend.fuzzy import FuzzyIndex
+from botBackend.carddb import normalize_name
+import unittest
+import random
+import string
+import time
+
+
+CARD_NAMES = ["Lightning Bolt", "Lightning Helix", "Bolt Bend", "Jace, the Mind Sculptor",
+              "Fire // Ice", "Urza's Saga", "Black Lotus", "Ponder", "Gush"]
+
+
+class TestFuzzyIndex(unittest.TestCase):
+
+    def setUp(self):
+        keys = [(normalize_name(name), name) for name in CARD_NAMES]
+        keys += [("fire", "Fire // Ice"), ("ice", "Fire // Ice")]
+        self.index = FuzzyIndex(keys)
+
+    def test_exact(self):
+
+        """Tests an exact normalized name."""
+
+        actual = self.index.match("black lotus")
+        expected = ["Black Lotus"]
+        self.assertEqual(actual, expected)
+
+    def test_face_name(self):
+
+        """Tests a split card by the name of one face."""
+
+        actual = self.index.match("ice")
+        expected = ["Fire // Ice"]
+        self.assertEqual(actual, expected)
+
+    def test_partial(self):
+
+        """Tests a name with words left out and cut short."""
+
+        actual = self.index.match(normalize_name("jace mind sculpt"))
+        expected = ["Jace, the Mind Sculptor"]
+        self.assertEqual(actual, expected)
+
+    def test_punctuation(self):
+
+        """Tests a name typed without its apostrophe."""
+
+        actual = self.index.match(normalize_name("urzas saga"))
+        expected = ["Urza's Saga"]
+        self.assertEqual(actual, expected)
+
+    def test_typo(self):
+
+        """Tests a misspelled name."""
+
+        actual = self.index.match(normalize_name("lightnig bolt"))
+        expected = ["Lightning Bolt"]
+        self.assertEqual(actual, expected)
+
+    def test_ambiguous(self):
+
+        """Tests a partial name that fits more than one card."""
+
+        actual = self.index.match("lightning")
+        expected = ["Lightning Bolt", "Lightning Helix"]
+        self.assertEqual(actual, expected)
+
+    def test_too_broad(self):
+
+        """Tests that a partial name starting too many words is ambiguous
+        without every match being found."""
+
+        self.index.PARTIAL_SCAN = 1
+
+        actual = self.index.match("l")
+        expected = None
+        self.assertEqual(actual, expected)
+
+    def test_many_matches(self):
+
+        """Tests that the search stops once a name is clearly ambiguous."""
+
+        keys = [(f"goblin {i}", f"Goblin {i}") for i in range(100)]
+
+        actual = len(FuzzyIndex(keys).match("gob"))
+        expected = FuzzyIndex.MAX_MATCHES + 1
+        self.assertEqual(actual, expected)
+
+    def test_no_match(self):
+
+        """Tests a name that is nothing like any card."""
+
+        actual = self.index.match("wertyuiopoiuytr")
+        expected = []
+        self.assertEqual(actual, expected)
+
+
+class TestFuzzyIndexSpeed(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        """Builds an index about the size of every card there is,
+        from made up words."""
+
+        rng = random.Random(100)
+        letters = "eeeeeeetttttaaaaoooiiinnnsssrrrhhlldcumfpgwybvk"
+        vocab = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+                 for _ in range(4000)]
+        names = sorted({" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 4)))
+                        for _ in range(30000)})
+        cls.index = FuzzyIndex([(name, name) for name in names])
+
+        # a typo in every name picked, and short partial names
+        cls.queries = []
+        for name in rng.sample(names, 100):
+            i = rng.randrange(len(name))
+            cls.queries.append(name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:])
+        cls.queries += ["a", "t", "e", "the s", "st"]
+
+    def test_query_time(self):
+
+        """Tests that a query takes well under a millisecond on average."""
+
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for query in self.queries:
+                self.index.match(query)
+            best = min(best, (time.perf_counter() - start) / len(self.queries))
+
+        self.assertLess(best, 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
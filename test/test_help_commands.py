@@ -14,44 +14,52 @@ class TestHelpCommands(unittest.TestCase):
         actual = help_commands.help_draft(command)
         expected = ("```I am DraftBot! I let you do custom rotisserie drafts.\n" +
                     "Here are my commands and their parameters:\n\n" +
-                    "1. cancel\n" +
-                    "    - Cancels the draft during setup if no one joined.\n\n"
-                    "2. cancelprepick\n" +
+                    "1. bulkprepick\n" +
+                    "    - Allows the user to prepick a list of cards at once.\n\n" +
+                    "2. cancel\n" +
+                    "    - Cancels the draft during setup if no one joined.\n\n" +
+                    "3. cancelprepick\n" +
                     "    - Allows the user to cancel a prepick.\n\n" +
-                    "3. card\n" +
+                    "4. card\n" +
                     "    - Displays the image of the card provided it exists.\n\n" +
-                    "4. edit_format\n" +
+                    "5. draft\n" +
+                    "    - Lists your drafts, or chooses which one your DM's\n" +
+                    "      commands go to.\n\n" +
+                    "6. edit_format\n" +
                     "    - Edit the format of the draft during setup.\n\n" +
-                    "5. edit_pick\n" +
+                    "7. edit_pick\n" +
                     "    - Edit number of picks in the draft during setup.\n\n" +
-                    "6. edit_player\n" +
+                    "8. edit_player\n" +
                     "    - Edit number of players in the draft during setup.\n\n" +
-                    "7. fire\n" +
+                    "9. fire\n" +
                     "    - Fires the draft once setup is complete.\n\n" +
-                    "8. getprepicks\n" +
-                    "    - Allows the user to get a list of their prepicks.\n\n"
-                    "9. help\n" +
+                    "10. getprepicks\n" +
+                    "    - Allows the user to get a list of their prepicks.\n\n" +
+                    "11. help\n" +
                     "    - Displays the helpful message you are currently seeing.\n\n" +
-                    "10. info\n" +
+                    "12. info\n" +
                     "    - Displays information on the setup of the draft.\n\n" +
-                    "11. join\n" +
+                    "13. join\n" +
                     "    - Allows a user to join a draft.\n\n" +
-                    "12. leave\n" +
+                    "14. leave\n" +
                     "    - Allows a user to leave the draft during the setup\n" +
                     "      stage.\n\n" +
-                    "13. legal\n" +
+                    "15. legal\n" +
                     "    - States the legality of a card.\n\n" +
-                    "14. pick\n" +
+                    "16. pick\n" +
                     "    - Allows a user to pick a card during the draft.\n\n" +
-                    "15. prepick\n" +
+                    "17. prepick\n" +
                     "    - Allows the user to prepick a card.\n\n" +
-                    "16. remind\n" +
+                    "18. remind\n" +
                     "    - Reminds a user to pick a card when the draft\n" +
                     "      has fired and is running.\n\n" +
-                    "17. reload\n" +
+                    "19. reload\n" +
                     "    - Reloads in draft data.\n\n" +
-                    "18. setup\n" +
+                    "20. setup\n" +
                     "    - Sets up a draft with a specified player and pick count.\n\n" +
+                    "21. stats\n" +
+                    "    - Shows how long each stage of a pick is taking.\n" +
+                    "      Server admins only.\n\n" +
                     "Type !help {command} for more info on a command.```")
 
         self.assertEqual(actual, expected)
@@ -0,0 +1,179 @@
+from botBackend.journal import Journal
+import unittest
+import tempfile
+import os
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+
+        """Tests that records are read back in the order written."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "pick", "card": "Gush"})
+        journal.append({"event": "pick", "card": "Ponder"})
+
+        actual = Journal(self.path).read()
+        expected = ("abc", [{"event": "pick", "card": "Gush"},
+                            {"event": "pick", "card": "Ponder"}])
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(journal), 2)
+
+    def test_start_empties(self):
+
+        """Tests that starting a journal drops the old records."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "reset"})
+        journal.start("def")
+
+        actual = journal.read()
+        expected = ("def", [])
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(journal), 0)
+
+    def test_missing(self):
+
+        """Tests that a missing journal has no checkpoint or records."""
+
+        actual = Journal(self.path).read()
+        expected = (None, [])
+        self.assertEqual(actual, expected)
+
+    def test_torn_record(self):
+
+        """Tests that a record cut off by a crash is left out."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "pick", "card": "Gush"})
+        with open(self.path, "a") as file:
+            file.write('{"event": "pi')
+
+        actual = journal.read()
+        expected = ("abc", [{"event": "pick", "card": "Gush"}])
+        self.assertEqual(actual, expected)
+
+    def test_cut_only_new_records(self):
+
+        """Tests that each segment only holds the records written
+        since the last one was cut."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "pick", "card": "Gush"})
+        first = journal.cut()
+        journal.sent()
+        journal.append({"event": "pick", "card": "Ponder"})
+        second = journal.cut()
+        journal.sent()
+
+        self.assertEqual(journal.cut(), None)
+        with open(second, "r") as file:
+            actual = file.read().splitlines()
+        expected = ['{"checkpoint": "abc"}', '{"event":"pick","card":"Ponder"}']
+        self.assertEqual(actual, expected)
+        self.assertNotEqual(first, second)
+
+    def test_cut_again_until_sent(self):
+
+        """Tests that a segment not sent is cut again under the same
+        number, along with the records written since."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "pick", "card": "Gush"})
+        first = journal.cut()
+        journal.append({"event": "pick", "card": "Ponder"})
+        second = journal.cut()
+
+        self.assertEqual(first, second)
+        with open(second, "r") as file:
+            actual = file.read().splitlines()[1:]
+        expected = ['{"event":"pick","card":"Gush"}', '{"event":"pick","card":"Ponder"}']
+        self.assertEqual(actual, expected)
+
+    def test_sent_keeps_newer_records(self):
+
+        """Tests that records written while a segment was being sent
+        are left for the next one."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "pick", "card": "Gush"})
+        journal.cut()
+        journal.append({"event": "pick", "card": "Ponder"})
+        journal.sent()
+
+        actual = (journal.segment, journal.pending)
+        expected = (1, ['{"event":"pick","card":"Ponder"}\n'])
+        self.assertEqual(actual, expected)
+
+    def test_segment_checkpoint(self):
+
+        """Tests that a segment's checkpoint is read from its first line."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "reset"})
+        journal.cut()
+
+        actual = (journal.segment_checkpoint(0), journal.segment_checkpoint(1))
+        expected = ("abc", None)
+        self.assertEqual(actual, expected)
+
+    def test_join_segments(self):
+
+        """Tests that the journal is rebuilt from its segments, leaving
+        out one left over from an older snapshot."""
+
+        old = Journal(self.path)
+        old.start("old")
+        for card in ["Gush", "Ponder", "Skred"]:
+            old.append({"event": "pick", "card": card})
+            old.cut()
+            old.sent()
+
+        journal = Journal(self.path)
+        journal.start("new")
+        for card in ["Swamp", "Island"]:
+            journal.append({"event": "pick", "card": card})
+            journal.cut()
+            journal.sent()
+        os.remove(self.path)
+
+        journal = Journal(self.path)
+        journal.join(3)
+
+        actual = journal.read()
+        expected = ("new", [{"event": "pick", "card": "Swamp"},
+                            {"event": "pick", "card": "Island"}])
+        self.assertEqual(actual, expected)
+        self.assertEqual(journal.segment, 2)
+
+    def test_join_no_segments(self):
+
+        """Tests that joining without segments leaves no journal."""
+
+        journal = Journal(self.path)
+        journal.start("abc")
+        journal.append({"event": "reset"})
+        journal.join(0)
+
+        actual = journal.read()
+        expected = (None, [])
+        self.assertEqual(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
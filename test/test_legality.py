@@ -0,0 +1,91 @@
+from botBackend import legality
+from botBackend.legality import LegalityTable
+import unittest
+
+
+class TestLegality(unittest.TestCase):
+
+    def test_encode_decode(self):
+
+        """Tests that a legalities dict survives being packed."""
+
+        legalities = {format: "not_legal" for format in legality.FORMATS if format != "freeform"}
+        legalities.update({"modern": "legal", "legacy": "banned", "vintage": "restricted"})
+
+        actual = legality.decode(legality.encode(legalities))
+        self.assertEqual(actual, legalities)
+
+    def test_is_legal(self):
+
+        """Tests the legal, banned, restricted and not legal codes."""
+
+        mask = legality.encode({"modern": "legal", "legacy": "banned",
+                                "vintage": "restricted", "standard": "not_legal"})
+
+        self.assertTrue(legality.is_legal(mask, "modern"))
+        self.assertFalse(legality.is_legal(mask, "legacy"))
+        self.assertTrue(legality.is_legal(mask, "vintage"))
+        self.assertFalse(legality.is_legal(mask, "standard"))
+
+    def test_missing_format_not_legal(self):
+
+        """Tests that a format left out of the dict is not legal."""
+
+        mask = legality.encode({"modern": "legal"})
+        self.assertFalse(legality.is_legal(mask, "pauper"))
+
+    def test_freeform_always_legal(self):
+
+        """Tests that every card is legal in freeform."""
+
+        mask = legality.encode({})
+        self.assertTrue(legality.is_legal(mask, "freeform"))
+
+    def test_format_case_insensitive(self):
+
+        """Tests a format typed with capital letters."""
+
+        mask = legality.encode({"modern": "legal"})
+        self.assertTrue(legality.is_legal(mask, "Modern"))
+
+    def test_table_filter_legal(self):
+
+        """Tests filtering a card pool down to the legal cards."""
+
+        table = LegalityTable()
+        table.add("bolt", {"modern": "legal"})
+        table.add("lotus", {"modern": "not_legal", "vintage": "restricted"})
+        table.add("skred", {"modern": "legal"})
+
+        actual = table.filter_legal(["bolt", "lotus", "unknown", "skred"], "modern")
+        expected = ["bolt", "skred"]
+        self.assertEqual(actual, expected)
+        self.assertTrue(table.is_legal("lotus", "vintage"))
+
+    def test_table_update(self):
+
+        """Tests that adding a card twice replaces its mask."""
+
+        table = LegalityTable()
+        table.add("bolt", {"modern": "legal"})
+        table.add("bolt", {"modern": "banned"})
+
+        self.assertEqual(len(table), 1)
+        self.assertFalse(table.is_legal("bolt", "modern"))
+
+    def test_card_mask_after_ban(self):
+
+        """Tests that a card banned after it was first checked is no longer legal."""
+
+        card_json = {"id": "test-ban", "legalities": {"modern": "legal"}}
+        legality.card_mask(card_json)
+
+        card_json = {"id": "test-ban", "legalities": {"modern": "banned"}}
+        actual = (legality.is_legal(legality.card_mask(card_json), "modern"),
+                  legality.table.is_legal("test-ban", "modern"))
+        expected = (False, False)
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
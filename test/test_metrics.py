@@ -0,0 +1,103 @@
+from botBackend.metrics import Registry, Track
+from botBackend import metrics
+import unittest
+import aiohttp
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counter(self):
+
+        """Tests that a counter is rendered once for every set of labels."""
+
+        registry = Registry()
+        calls = registry.counter("calls_total", "Calls made.", ("backend",))
+        calls.inc("sheets")
+        calls.inc("scryfall")
+        calls.inc("scryfall")
+
+        actual = registry.render()
+        expected = ('# HELP calls_total Calls made.\n'
+                    '# TYPE calls_total counter\n'
+                    'calls_total{backend="scryfall"} 2\n'
+                    'calls_total{backend="sheets"} 1\n')
+        self.assertEqual(actual, expected)
+
+    def test_histogram(self):
+
+        """Tests that the buckets of a histogram add up as they go."""
+
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency.", ("command",), buckets=(0.1, 1))
+        for seconds in [0.05, 0.5, 5]:
+            latency.observe(seconds, "pick")
+
+        actual = registry.render().splitlines()[2:]
+        expected = ['latency_seconds_bucket{command="pick",le="0.1"} 1',
+                    'latency_seconds_bucket{command="pick",le="1"} 2',
+                    'latency_seconds_bucket{command="pick",le="+Inf"} 3',
+                    'latency_seconds_sum{command="pick"} 5.55',
+                    'latency_seconds_count{command="pick"} 3']
+        self.assertEqual(actual, expected)
+
+    def test_gauge_function(self):
+
+        """Tests that a gauge given a function is read when rendered."""
+
+        registry = Registry()
+        drafts = []
+        registry.gauge("drafts", "Drafts.", function=lambda: len(drafts))
+        drafts.append("draft")
+
+        actual = registry.render().splitlines()[-1]
+        expected = "drafts 1"
+        self.assertEqual(actual, expected)
+
+    def test_label_escaping(self):
+
+        """Tests that quotes in a label value are escaped."""
+
+        registry = Registry()
+        registry.counter("calls_total", "Calls made.", ("command",)).inc('say "hi"')
+
+        actual = registry.render().splitlines()[-1]
+        expected = 'calls_total{command="say \\"hi\\""} 1'
+        self.assertEqual(actual, expected)
+
+    def test_track(self):
+
+        """Tests that a backend call is counted, and counted as an error if it raises."""
+
+        calls = metrics.backend_calls.values.get(("test",), 0)
+        errors = metrics.backend_errors.values.get(("test",), 0)
+
+        with Track("test"):
+            pass
+        with self.assertRaises(ValueError):
+            with Track("test"):
+                raise ValueError()
+
+        actual = (metrics.backend_calls.values[("test",)] - calls,
+                  metrics.backend_errors.values[("test",)] - errors)
+        expected = (2, 1)
+        self.assertEqual(actual, expected)
+
+
+class TestMetricsServer(unittest.IsolatedAsyncioTestCase):
+
+    async def test_serve_metrics(self):
+
+        """Tests that the metrics are served for prometheus to scrape."""
+
+        runner = await metrics.start_server(0, "127.0.0.1")
+        try:
+            port = runner.addresses[0][1]
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    content_type = response.headers["Content-Type"]
+                    body = await response.text()
+        finally:
+            await runner.cleanup()
+
+        self.assertEqual(content_type, metrics.CONTENT_TYPE)
+        self.assertIn("# TYPE draftbot_backend_calls_total counter", body)
@@ -0,0 +1,84 @@
+from botBackend.prepick_queue import PrepickQueue
+import unittest
+
+
+class TestPrepickQueue(unittest.TestCase):
+
+    def test_order(self):
+
+        """Tests that cards come off the front in the order queued."""
+
+        queue = PrepickQueue(["Gush", "Ponder", "Skred"])
+        actual = [queue.popleft(), queue.popleft()]
+        expected = ["Gush", "Ponder"]
+        self.assertEqual(actual, expected)
+        self.assertEqual(queue, ["Skred"])
+
+    def test_remove_skipped_at_front(self):
+
+        """Tests that a cancelled card is skipped when it reaches the front."""
+
+        queue = PrepickQueue(["Gush", "Ponder", "Skred"])
+        queue.remove("Gush")
+
+        actual = queue.popleft()
+        expected = "Ponder"
+        self.assertEqual(actual, expected)
+        self.assertEqual(queue.dead, 0)
+
+    def test_live_view(self):
+
+        """Tests that len, in and iterating only see live cards."""
+
+        queue = PrepickQueue(["Gush", "Ponder", "Skred"])
+        queue.remove("Ponder")
+
+        self.assertEqual(list(queue), ["Gush", "Skred"])
+        self.assertEqual(len(queue), 2)
+        self.assertNotIn("Ponder", queue)
+
+    def test_requeue(self):
+
+        """Tests that a cancelled card can be queued again at the back."""
+
+        queue = PrepickQueue(["Gush", "Ponder"])
+        queue.remove("Gush")
+        queue.append("Gush")
+
+        actual = [queue.popleft(), queue.popleft()]
+        expected = ["Ponder", "Gush"]
+        self.assertEqual(actual, expected)
+
+    def test_remove_missing(self):
+
+        """Tests that cancelling a card not queued raises a value error."""
+
+        queue = PrepickQueue(["Gush"])
+        with self.assertRaises(ValueError):
+            queue.remove("Ponder")
+
+    def test_popleft_empty(self):
+
+        """Tests that taking from a queue of only tombstones raises an index error."""
+
+        queue = PrepickQueue(["Gush"])
+        queue.remove("Gush")
+        with self.assertRaises(IndexError):
+            queue.popleft()
+
+    def test_compaction(self):
+
+        """Tests that tombstones are dropped once they outnumber live cards."""
+
+        queue = PrepickQueue([f"Card {i}" for i in range(40)])
+        for i in range(1, 40, 2):
+            queue.remove(f"Card {i}")
+        self.assertEqual(len(queue.entries), 40)
+
+        queue.remove("Card 0")
+        self.assertEqual(len(queue.entries), len(queue))
+        self.assertEqual(list(queue), [f"Card {i}" for i in range(2, 40, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+from botBackend import scryfallasync
+from botBackend.scryfallasync import TokenBucket
+import unittest
+from unittest.mock import patch
+import aiohttp
+import asyncio
+
+
+def settings(**overrides):
+
+    """Builds a stand in for config that returns the overrides."""
+
+    def config(name, default=None):
+        return overrides.get(name, default)
+    return config
+
+
+class TestScryfallAsync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        scryfallasync.cache.clear()
+
+    def tearDown(self):
+        scryfallasync.cache.clear()
+
+    async def test_concurrent_lookups_share_request(self):
+
+        """Tests that lookups for the same card send one request."""
+
+        calls = []
+
+        async def request(card):
+            calls.append(card)
+            await asyncio.sleep(0.01)
+            return {"object": "card", "name": "Gush"}
+
+        with patch('botBackend.scryfallasync._request', side_effect=request):
+            results = await asyncio.gather(scryfallasync.get_scryfall_json(("gush",)),
+                                           scryfallasync.get_scryfall_json(("Gush",)),
+                                           scryfallasync.get_scryfall_json(("GUSH",)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([card_json["name"] for card_json in results], ["Gush"] * 3)
+        self.assertEqual(scryfallasync._in_flight, {})
+
+    async def test_different_cards_not_shared(self):
+
+        """Tests that lookups for different cards are not merged."""
+
+        async def request(card):
+            return {"object": "card", "name": card[0]}
+
+        with patch('botBackend.scryfallasync._request', side_effect=request) as mock_request:
+            await asyncio.gather(scryfallasync.get_scryfall_json(("Gush",)),
+                                 scryfallasync.get_scryfall_json(("Ponder",)))
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    async def test_slow_request_is_hedged(self):
+
+        """Tests that a second request answers when the first is slow."""
+
+        calls = []
+
+        async def request(card):
+            calls.append(card)
+            await asyncio.sleep(10 if len(calls) == 1 else 0)
+            return {"object": "card", "name": "Gush"}
+
+        with patch('botBackend.scryfallasync._request', side_effect=request), \
+                patch('botBackend.scryfallasync.config', side_effect=settings(
+                    SCRYFALL_HEDGE_DELAY=0.01)):
+            card_json = await scryfallasync.get_scryfall_json(("gush",))
+
+        self.assertEqual(card_json["name"], "Gush")
+        self.assertEqual(len(calls), 2)
+
+    async def test_failed_request_is_retried(self):
+
+        """Tests that a failed request is retried within the deadline."""
+
+        answers = [aiohttp.ClientConnectionError(), {"object": "card", "name": "Gush"}]
+
+        with patch('botBackend.scryfallasync._request', side_effect=answers), \
+                patch('botBackend.scryfallapi.retry_delay', return_value=0):
+            card_json = await scryfallasync.get_scryfall_json(("gush",))
+
+        self.assertEqual(card_json["name"], "Gush")
+
+    async def test_deadline_uses_stale_answer(self):
+
+        """Tests that an expired cached answer is used once the deadline passes."""
+
+        async def request(card):
+            await asyncio.sleep(10)
+
+        scryfallasync.cache._insert("gush", {"object": "card", "name": "Gush"}, -1)
+
+        with patch('botBackend.scryfallasync._request', side_effect=request), \
+                patch('botBackend.scryfallasync.config', side_effect=settings(
+                    SCRYFALL_DEADLINE=0.05, SCRYFALL_HEDGE_DELAY=0.01)):
+            card_json = await scryfallasync.get_scryfall_json(("gush",))
+
+        self.assertEqual(card_json["name"], "Gush")
+
+    async def test_deadline_without_fallback(self):
+
+        """Tests that a timeout error is returned when there is nothing
+        to fall back on, and that it is not cached."""
+
+        async def request(card):
+            await asyncio.sleep(10)
+
+        with patch('botBackend.scryfallasync._request', side_effect=request), \
+                patch('botBackend.scryfallapi.carddb.available', return_value=False), \
+                patch('botBackend.scryfallasync.config', side_effect=settings(
+                    SCRYFALL_DEADLINE=0.05, SCRYFALL_HEDGE_DELAY=0.01)):
+            card_json = await scryfallasync.get_scryfall_json(("gush",))
+
+        self.assertEqual(card_json["code"], "timeout")
+        self.assertIsNone(scryfallasync.cache.get("gush"))
+
+    async def test_token_bucket_spaces_requests(self):
+
+        """Tests that the bucket makes callers wait once it is empty."""
+
+        bucket = TokenBucket(rate=100, capacity=1)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        for _ in range(4):
+            await bucket.acquire()
+        elapsed = loop.time() - start
+
+        # first token is free, the other 3 take 10ms each
+        self.assertGreaterEqual(elapsed, 0.025)
+
+
+if __name__ == "__main__":
+    unittest.main()
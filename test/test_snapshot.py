@@ -0,0 +1,139 @@
+from botBackend import snapshot
+import unittest
+from unittest.mock import patch
+import tempfile
+import json
+import os
+
+
+def draft_data() -> dict:
+
+    """A fired two player draft in the json layout."""
+
+    return {"checkpoint": "abc", "player_count": 2, "pick_count": 5,
+            "players": [{"username": "player_2", "user_id": "2"},
+                        {"username": "player_1", "user_id": "1"}],
+            "draft_fired": True, "setup": True, "format": "freeform",
+            "picks": [{"username": "player_1", "user_id": "1", "picks": ["Ponder"]},
+                      {"username": "player_2", "user_id": "2", "picks": ["Gush", "Swamp"]}],
+            "prepicks": [{"username": "player_1", "user_id": "1", "prepicks": ["Gush", "Skred"]},
+                         {"username": "player_2", "user_id": "2", "prepicks": []}],
+            "pick_number": 3}
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "storage.snap")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+
+        """Tests that a snapshot reads back as the draft written,
+        with the picks in seat order."""
+
+        snapshot.write(self.path, draft_data())
+
+        actual = snapshot.read(self.path)
+        expected = draft_data()
+        expected["picks"].reverse()
+        expected["prepicks"].reverse()
+        self.assertEqual(actual, expected)
+
+    def test_int_user_ids(self):
+
+        """Tests that discord's integer user ids read back as integers."""
+
+        data = draft_data()
+        for entry in data["players"] + data["picks"] + data["prepicks"]:
+            entry["user_id"] = int(entry["user_id"]) + 123456789012345678
+        snapshot.write(self.path, data)
+
+        actual = [player["user_id"] for player in snapshot.read(self.path)["players"]]
+        expected = [123456789012345680, 123456789012345679]
+        self.assertEqual(actual, expected)
+
+    def test_read_version_1(self):
+
+        """Tests that a snapshot from before user ids had a type is read."""
+
+        with patch.object(snapshot, "VERSION", 1):
+            with patch.object(snapshot, "pack_id", snapshot.pack_str):
+                snapshot.write(self.path, draft_data())
+
+        actual = [player["user_id"] for player in snapshot.read(self.path)["players"]]
+        expected = ["2", "1"]
+        self.assertEqual(actual, expected)
+
+    def test_not_set_up(self):
+
+        """Tests that a draft with no format or checkpoint round trips."""
+
+        data = {"checkpoint": None, "player_count": 0, "pick_count": 0, "players": [],
+                "draft_fired": False, "setup": False, "format": None,
+                "picks": [], "prepicks": [], "pick_number": 0}
+        snapshot.write(self.path, data)
+
+        actual = snapshot.read(self.path)
+        expected = data
+        self.assertEqual(actual, expected)
+
+    def test_cards_interned(self):
+
+        """Tests that a card picked and pre-picked is stored once."""
+
+        actual = snapshot.Snapshot(snapshot.encode(draft_data())).cards
+        expected = ["Gush", "Swamp", "Ponder", "Skred"]
+        self.assertEqual(actual, expected)
+
+    def test_smaller_than_json(self):
+
+        """Tests that a snapshot is smaller than the same draft as json."""
+
+        data = draft_data()
+        self.assertLess(len(snapshot.encode(data)), len(json.dumps(data)))
+
+    def test_lazy_sections(self):
+
+        """Tests that reading the header does not decode the picks."""
+
+        loaded = snapshot.Snapshot(snapshot.encode(draft_data()))
+        self.assertEqual(loaded.header["pick_number"], 3)
+        self.assertNotIn("picks", vars(loaded))
+        self.assertNotIn("cards", vars(loaded))
+
+    def test_load_lazy(self):
+
+        """Tests that loading a snapshot file leaves its sections to be decoded."""
+
+        snapshot.write(self.path, draft_data())
+
+        loaded = snapshot.load(self.path)
+        self.assertIsInstance(loaded, snapshot.Snapshot)
+        self.assertNotIn("players", vars(loaded))
+
+    def test_read_json(self):
+
+        """Tests that a snapshot from before the binary format is read."""
+
+        with open(self.path, "w") as file:
+            json.dump(draft_data(), file)
+
+        actual = snapshot.read(self.path)
+        expected = draft_data()
+        self.assertEqual(actual, expected)
+
+    def test_newer_version(self):
+
+        """Tests that a snapshot from a newer bot is refused."""
+
+        buffer = snapshot.MAGIC + bytes([snapshot.VERSION + 1])
+        with self.assertRaises(ValueError):
+            snapshot.Snapshot(buffer)
+
+
+if __name__ == '__main__':
+    unittest.main()
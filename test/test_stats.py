@@ -0,0 +1,66 @@
+from botBackend.stats import StageStats, format_summary, percentile
+import unittest
+
+
+class TestStageStats(unittest.TestCase):
+
+    def test_percentiles(self):
+
+        """Tests the percentiles of a stage, in milliseconds."""
+
+        stats = StageStats(window=100)
+        for i in range(1, 101):
+            stats.record("pick.sheet", i / 1000)
+
+        actual = stats.summary()
+        expected = {"pick.sheet": {"count": 100, "p50": 50.0, "p95": 95.0, "p99": 99.0}}
+        self.assertEqual(actual, expected)
+
+    def test_percentile(self):
+
+        """Tests the nearest rank percentile of a sorted list."""
+
+        values = list(range(1, 101))
+        actual = [percentile(values, percent) for percent in (50, 95, 99)] + [percentile([], 50)]
+        expected = [50, 95, 99, 0.0]
+        self.assertEqual(actual, expected)
+
+    def test_rolling_window(self):
+
+        """Tests that only the last window runs of a stage are kept."""
+
+        stats = StageStats(window=3)
+        for seconds in [5.0, 0.001, 0.002, 0.003]:
+            stats.record("pick.backup", seconds)
+
+        actual = stats.export()["stages"]
+        expected = {"pick.backup": [0.001, 0.002, 0.003]}
+        self.assertEqual(actual, expected)
+
+    def test_timer(self):
+
+        """Tests that a with block is timed into its stage."""
+
+        stats = StageStats(window=10)
+        with stats.timer("fire.sheet"):
+            pass
+
+        actual = stats.summary()["fire.sheet"]["count"]
+        expected = 1
+        self.assertEqual(actual, expected)
+
+    def test_clear(self):
+
+        """Tests that clearing drops every stage."""
+
+        stats = StageStats(window=10)
+        stats.record("reset.sheet", 0.5)
+        stats.clear()
+
+        actual = format_summary(stats.summary())
+        expected = "No stages have been timed yet."
+        self.assertEqual(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()